@@ -8,13 +8,19 @@ from alembic import context
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from app.database.connection import Base
+from app.database.connection import Base, DATABASE_URL
 import app.models.candidate  
 import app.models.application
 import app.models.opening
 import app.models.role
 import app.models.stage
 import app.models.experience
+import app.models.attachment_text
+import app.models.candidate_duplicate
+import app.models.archived_application
+import app.models.archived_experience
+import app.models.outbox_event
+import app.models.application_attachment
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,9 +28,12 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
+# Migrate the same database the application uses
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -0,0 +1,51 @@
+"""Add attachment_texts table and full-text search index
+
+Revision ID: 3f1c9a2d8e47
+Revises: 7ec91f8b43fd
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a2d8e47'
+down_revision: Union[str, None] = '7ec91f8b43fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attachment_texts',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('media_type', sa.String(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('char_count', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('extracted_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # FTS5 keeps its own copy of the text; rows are added as files are extracted
+        op.execute("CREATE VIRTUAL TABLE attachment_search USING fts5(content_hash UNINDEXED, text)")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_attachment_texts_search ON attachment_texts "
+            "USING gin (to_tsvector('english', coalesce(text, '')))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE attachment_search")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX ix_attachment_texts_search")
+    op.drop_table('attachment_texts')
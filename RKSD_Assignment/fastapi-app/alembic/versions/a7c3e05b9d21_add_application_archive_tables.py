@@ -0,0 +1,73 @@
+"""Add archive tables for finalized applications and their experiences
+
+Revision ID: a7c3e05b9d21
+Revises: e2b94f7a6c13
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e05b9d21'
+down_revision: Union[str, None] = 'e2b94f7a6c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The applicationstatus type already exists on PostgreSQL
+    status_type = sa.Enum('PENDING', 'ACCEPTED', 'REJECTED', name='applicationstatus').with_variant(
+        postgresql.ENUM('PENDING', 'ACCEPTED', 'REJECTED', name='applicationstatus', create_type=False),
+        'postgresql'
+    )
+    op.create_table('applications_archive',
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('opening_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('application_date', sa.DateTime(), nullable=False),
+    sa.Column('attachments', sa.String(), nullable=True),
+    sa.Column('status', status_type, nullable=False),
+    sa.Column('current_stage', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('total_experience_years', sa.Float(), nullable=True),
+    sa.Column('experience_gap_years', sa.Float(), nullable=True),
+    sa.Column('latest_position', sa.String(), nullable=True),
+    sa.Column('has_current_position', sa.Boolean(), nullable=True),
+    sa.Column('experience_summary_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('application_id')
+    )
+    op.create_index(op.f('ix_applications_archive_candidate_id'), 'applications_archive', ['candidate_id'], unique=False)
+    op.create_index(op.f('ix_applications_archive_archived_at'), 'applications_archive', ['archived_at'], unique=False)
+    op.create_table('experiences_archive',
+    sa.Column('experience_id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=False),
+    sa.Column('position', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=False),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('duration', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('experience_id')
+    )
+    op.create_index(op.f('ix_experiences_archive_application_id'), 'experiences_archive', ['application_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_experiences_archive_application_id'), table_name='experiences_archive')
+    op.drop_table('experiences_archive')
+    op.drop_index(op.f('ix_applications_archive_archived_at'), table_name='applications_archive')
+    op.drop_index(op.f('ix_applications_archive_candidate_id'), table_name='applications_archive')
+    op.drop_table('applications_archive')
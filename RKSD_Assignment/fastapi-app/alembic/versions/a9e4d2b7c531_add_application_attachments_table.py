@@ -0,0 +1,52 @@
+"""Add application_attachments table linking applications to attachment content hashes
+
+Revision ID: a9e4d2b7c531
+Revises: f3b7c2e8d410
+Create Date: 2026-10-20 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.attachment_links import link_rows
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4d2b7c531'
+down_revision: Union[str, None] = 'f3b7c2e8d410'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Applications read per batch when filling the table
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    links = op.create_table('application_attachments',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash', 'application_id')
+    )
+    op.create_index(op.f('ix_application_attachments_application_id'), 'application_attachments', ['application_id'], unique=False)
+
+    # Archived applications are linked too, so they are found again once restored
+    connection = op.get_bind()
+    for table in ('applications', 'applications_archive'):
+        result = connection.execute(
+            sa.text(f"SELECT application_id, attachments FROM {table} WHERE attachments IS NOT NULL")
+            .execution_options(stream_results=True)
+        )
+        for batch in result.partitions(BACKFILL_BATCH_SIZE):
+            rows = [row for application_id, attachments in batch for row in link_rows(application_id, attachments)]
+            if rows:
+                connection.execute(links.insert(), rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_application_attachments_application_id'), table_name='application_attachments')
+    op.drop_table('application_attachments')
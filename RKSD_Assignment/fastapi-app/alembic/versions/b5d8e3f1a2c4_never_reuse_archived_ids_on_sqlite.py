@@ -0,0 +1,53 @@
+"""Never reuse application and experience IDs on SQLite
+
+Revision ID: b5d8e3f1a2c4
+Revises: a9e4d2b7c531
+Create Date: 2026-10-20 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e3f1a2c4'
+down_revision: Union[str, None] = 'a9e4d2b7c531'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (live table, archive table, ID column)
+TABLES = (
+    ('applications', 'applications_archive', 'application_id'),
+    ('experiences', 'experiences_archive', 'experience_id'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Without AUTOINCREMENT SQLite hands out the highest ID again once that row is deleted,
+    # so a row created after the newest one was archived took the archived row's ID.
+    # PostgreSQL sequences never go back, so only SQLite's tables are rebuilt.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for table, archive_table, id_column in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        # Start after every ID in use, archived ones included
+        highest = bind.exec_driver_sql(
+            f"SELECT max(coalesce((SELECT max({id_column}) FROM {table}), 0), "
+            f"coalesce((SELECT max({id_column}) FROM {archive_table}), 0))"
+        ).scalar()
+        bind.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        bind.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, highest))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for table, _, _ in reversed(TABLES):
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,45 @@
+"""Add candidate_duplicates table
+
+Revision ID: b84e2f6c1d09
+Revises: 3f1c9a2d8e47
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e2f6c1d09'
+down_revision: Union[str, None] = '3f1c9a2d8e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('candidate_duplicates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('duplicate_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('reasons', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['candidate_id'], ['candidates.candidate_id'], ),
+    sa.ForeignKeyConstraint(['duplicate_id'], ['candidates.candidate_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('candidate_id', 'duplicate_id')
+    )
+    op.create_index(op.f('ix_candidate_duplicates_id'), 'candidate_duplicates', ['id'], unique=False)
+    op.create_index(op.f('ix_candidate_duplicates_duplicate_id'), 'candidate_duplicates', ['duplicate_id'], unique=False)
+    op.create_index(op.f('ix_candidate_duplicates_score'), 'candidate_duplicates', ['score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_candidate_duplicates_score'), table_name='candidate_duplicates')
+    op.drop_index(op.f('ix_candidate_duplicates_duplicate_id'), table_name='candidate_duplicates')
+    op.drop_index(op.f('ix_candidate_duplicates_id'), table_name='candidate_duplicates')
+    op.drop_table('candidate_duplicates')
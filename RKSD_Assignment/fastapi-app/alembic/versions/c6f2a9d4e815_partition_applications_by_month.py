@@ -0,0 +1,33 @@
+"""Optionally partition applications by month of application_date
+
+Revision ID: c6f2a9d4e815
+Revises: a7c3e05b9d21
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.utils.partitions import PARTITION_APPLICATIONS, partition_applications, unpartition_applications
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a9d4e815'
+down_revision: Union[str, None] = 'a7c3e05b9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only on PostgreSQL with PARTITION_APPLICATIONS=true; elsewhere the table stays as it is.
+    # An existing database can be converted later with `python -m app.utils.partitions convert`.
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and PARTITION_APPLICATIONS:
+        partition_applications(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    unpartition_applications(op.get_bind())
@@ -0,0 +1,37 @@
+"""Add experience summary columns to applications
+
+Revision ID: d5a3c71e9f20
+Revises: b84e2f6c1d09
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a3c71e9f20'
+down_revision: Union[str, None] = 'b84e2f6c1d09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled in by `python -m app.utils.experience_summary` and kept up to date by the experience routes
+    op.add_column('applications', sa.Column('total_experience_years', sa.Float(), nullable=True))
+    op.add_column('applications', sa.Column('experience_gap_years', sa.Float(), nullable=True))
+    op.add_column('applications', sa.Column('latest_position', sa.String(), nullable=True))
+    op.add_column('applications', sa.Column('has_current_position', sa.Boolean(), nullable=True))
+    op.add_column('applications', sa.Column('experience_summary_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('applications', 'experience_summary_at')
+    op.drop_column('applications', 'has_current_position')
+    op.drop_column('applications', 'latest_position')
+    op.drop_column('applications', 'experience_gap_years')
+    op.drop_column('applications', 'total_experience_years')
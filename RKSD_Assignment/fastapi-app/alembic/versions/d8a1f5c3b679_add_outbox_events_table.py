@@ -0,0 +1,41 @@
+"""Add outbox_events table for the change feed
+
+Revision ID: d8a1f5c3b679
+Revises: c6f2a9d4e815
+Create Date: 2026-10-19 20:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a1f5c3b679'
+down_revision: Union[str, None] = 'c6f2a9d4e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_outbox_events_entity', 'outbox_events', ['entity', 'entity_id', 'seq'], unique=False)
+    op.create_index(op.f('ix_outbox_events_created_at'), 'outbox_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outbox_events_created_at'), table_name='outbox_events')
+    op.drop_index('ix_outbox_events_entity', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,33 @@
+"""Add partial index on the deadline of active openings
+
+Revision ID: e2b94f7a6c13
+Revises: d5a3c71e9f20
+Create Date: 2026-10-19 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b94f7a6c13'
+down_revision: Union[str, None] = 'd5a3c71e9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_openings_active_deadline', 'openings', ['deadline'],
+        postgresql_where=sa.text('is_active'),
+        postgresql_include=['opening_id'],
+        sqlite_where=sa.text('is_active = 1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_openings_active_deadline', table_name='openings')
@@ -0,0 +1,30 @@
+"""Add version column to applications for optimistic locking
+
+Revision ID: f3b7c2e8d410
+Revises: d8a1f5c3b679
+Create Date: 2026-10-19 21:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7c2e8d410'
+down_revision: Union[str, None] = 'd8a1f5c3b679'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('applications', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('applications_archive', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('applications_archive', 'version')
+    op.drop_column('applications', 'version')
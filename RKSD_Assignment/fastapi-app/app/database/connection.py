@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # Load environment variables from .env file
 load_dotenv()
@@ -28,10 +28,27 @@ def get_db():
     finally:
         db.close()
 
-# Function to initialize the database
-async def init_db():
-    # Import models here to avoid circular imports
-    from app.models import candidate, role, stage, application, experience, opening
-    
-    # Create all tables in the database
-    Base.metadata.create_all(bind=engine)
+def insert_for(db: Session, model):
+    """INSERT supporting ON CONFLICT for the database in use."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def should_init_db_on_startup():
+    # The gunicorn master migrates the schema before forking and sets this to "false"
+    return os.getenv("DB_INIT_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Open pooled connections up front so the first requests don't pay for them
+def warm_pool(size=None):
+    if size is None:
+        size = int(os.getenv("DB_POOL_WARM_CONNECTIONS", "2"))
+
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
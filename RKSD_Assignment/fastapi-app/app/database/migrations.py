@@ -0,0 +1,101 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+
+from sqlalchemy import inspect, text
+
+from app.database.connection import engine
+
+# alembic.ini lives next to the app package
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+
+# Revision matching the tables that init_db() used to build with create_all()
+BASELINE_REVISION = "7ec91f8b43fd"
+
+# Key of the PostgreSQL advisory lock held while the schema is migrated
+MIGRATION_LOCK_KEY = 727_110_027
+
+
+def get_alembic_config():
+    """Build an Alembic config bound to the application's database."""
+    # Alembic is imported lazily; it is only needed at startup and by the readiness probe
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    # Leave the server's logging alone when migrations run in-process
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@lru_cache(maxsize=1)
+def get_head_revision():
+    """Return the newest revision in alembic/versions."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+def get_current_revision():
+    """Return the revision the database is stamped with (None if unversioned)."""
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def is_schema_current():
+    """Check whether the database is at the latest Alembic revision."""
+    return get_current_revision() == get_head_revision()
+
+
+@contextmanager
+def migration_lock():
+    """
+    Let one process at a time migrate the schema. Without gunicorn's master
+    (e.g. `uvicorn --workers N`) every worker migrates on startup, all at
+    once. PostgreSQL uses an advisory lock; other databases a file lock,
+    which covers the processes of one host.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        return
+
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        yield
+        return
+    digest = hashlib.sha1(str(engine.url).encode()).hexdigest()[:16]
+    with open(os.path.join(tempfile.gettempdir(), f"recruitment-api-migrate-{digest}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def upgrade_schema():
+    """
+    Bring the database up to the latest revision.
+
+    Databases created by the old create_all() startup have the tables but no
+    alembic_version row; they are stamped at the baseline revision first so
+    only the newer migrations are applied to them. Processes migrating at
+    the same time take turns, and the ones that come later find the schema
+    current.
+    """
+    from alembic import command
+
+    config = get_alembic_config()
+    with migration_lock():
+        if get_current_revision() is None and inspect(engine).has_table("applications"):
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
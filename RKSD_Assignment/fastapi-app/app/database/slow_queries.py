@@ -0,0 +1,242 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.database.connection import engine
+from app.middleware.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# Statements that take longer than this are recorded, in milliseconds; 0 turns the log off
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Slow statements kept per worker process, the oldest are dropped first
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+# Capture the plan of slow statements with EXPLAIN, in a background thread
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# A statement's plan is reused for this many seconds before it is explained again
+SLOW_QUERY_PLAN_TTL = float(os.getenv("SLOW_QUERY_PLAN_TTL", "600"))
+# Statements waiting for EXPLAIN; slow statements beyond this are recorded without a plan
+SLOW_QUERY_EXPLAIN_QUEUE = 100
+# Characters of a statement and parameters of a statement kept in a record
+SLOW_QUERY_MAX_STATEMENT = 10000
+SLOW_QUERY_MAX_PARAMETERS = 50
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN (FORMAT JSON) ",
+}
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+# SQLite reports a table read without an index as "SCAN <table>" ("SCAN TABLE <table>" before 3.36)
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def redact(value):
+    """Parameters with text and binary values replaced by their type and length."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        redacted = [redact(item) for item in value[:SLOW_QUERY_MAX_PARAMETERS]]
+        if len(value) > SLOW_QUERY_MAX_PARAMETERS:
+            redacted.append(f"... {len(value) - SLOW_QUERY_MAX_PARAMETERS} more")
+        return redacted
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return value
+
+
+def _caller() -> Optional[str]:
+    """The innermost frame of the app that led to the statement, as "path:line (function)"."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(APP_DIR + os.sep) and frame.f_globals.get("__name__") != __name__:
+            path = os.path.relpath(filename, os.path.dirname(APP_DIR))
+            return f"{path}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return None
+
+
+def _full_scans(dialect: str, plan) -> Optional[List[str]]:
+    """Tables the plan reads in full, without an index."""
+    if dialect == "sqlite":
+        scans = []
+        for detail in plan:
+            match = SQLITE_SCAN.match(detail)
+            if match and "USING" not in match.group(2) and match.group(1) != "CONSTANT":
+                scans.append(match.group(1))
+        return list(dict.fromkeys(scans))
+    if dialect == "postgresql":
+        scans = []
+        nodes = [entry["Plan"] for entry in reversed(plan)]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(node.get("Relation Name"))
+            nodes.extend(reversed(node.get("Plans", [])))
+        return list(dict.fromkeys(scans))
+    return None
+
+
+class SlowQueryLog:
+    """
+    The most recent slow statements of this process, with their redacted
+    parameters, the route and the code that ran them, and their plan.
+
+    Plans are captured by a background thread on a connection of its own,
+    so the request that ran the statement doesn't wait for them. A plan is
+    reused for the same statement text for SLOW_QUERY_PLAN_TTL seconds.
+    """
+
+    def __init__(self, size: int = SLOW_QUERY_LOG_SIZE, explain: bool = SLOW_QUERY_EXPLAIN):
+        self.explain = explain
+        self.explained = 0
+        self.explains_dropped = 0
+        self._records = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._plans: Dict[str, tuple] = {}
+        self._waiting: Dict[str, List[dict]] = {}
+        self._queue = queue.Queue(SLOW_QUERY_EXPLAIN_QUEUE)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, dialect: str, statement: str, parameters, executemany: bool, duration_ms: float):
+        record = {
+            "id": next(self._ids),
+            "at": datetime.now(),
+            "duration_ms": round(duration_ms, 1),
+            "route": current_route(),
+            "caller": _caller(),
+            "statement": statement[:SLOW_QUERY_MAX_STATEMENT],
+            "parameters": redact(parameters[0] if executemany and parameters else parameters),
+            "executemany": len(parameters) if executemany else None,
+            "plan": None,
+            "full_scans": None,
+            "explain_error": None,
+        }
+        self._records.append(record)
+        logger.warning("Slow query (%.0f ms) from %s, %s: %.200s",
+                       duration_ms, record["route"] or "-", record["caller"] or "-", statement)
+        if self.explain and EXPLAINABLE.match(statement):
+            self._explain_later(record, dialect, statement, parameters[0] if executemany and parameters else parameters)
+
+    def _explain_later(self, record: dict, dialect: str, statement: str, parameters):
+        with self._lock:
+            cached = self._plans.get(statement)
+            if cached is not None and time.monotonic() - cached[0] < SLOW_QUERY_PLAN_TTL:
+                record.update(cached[1])
+                return
+            if statement in self._waiting:
+                self._waiting[statement].append(record)
+                return
+            try:
+                self._queue.put_nowait((dialect, statement, parameters))
+            except queue.Full:
+                self.explains_dropped += 1
+                record["explain_error"] = "Too many statements waiting for EXPLAIN"
+                return
+            self._waiting[statement] = [record]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            dialect, statement, parameters = self._queue.get()
+            try:
+                result = self._explain(dialect, statement, parameters)
+            except Exception as exc:
+                result = {"explain_error": f"{type(exc).__name__}: {exc}"[:500]}
+            with self._lock:
+                self.explained += 1
+                self._plans[statement] = (time.monotonic(), result)
+                if len(self._plans) > SLOW_QUERY_LOG_SIZE:
+                    # Forget the plan explained longest ago
+                    del self._plans[min(self._plans, key=lambda key: self._plans[key][0])]
+                for record in self._waiting.pop(statement, []):
+                    record.update(result)
+
+    def _explain(self, dialect: str, statement: str, parameters) -> dict:
+        with engine.connect() as connection:
+            connection = connection.execution_options(slow_query_log=False)
+            rows = connection.exec_driver_sql(EXPLAIN_PREFIXES.get(dialect, "EXPLAIN ") + statement, parameters).all()
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            plan = [row[-1] for row in rows]
+        elif dialect == "postgresql":
+            plan = rows[0][0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+        else:
+            plan = [" ".join(str(value) for value in row) for row in rows]
+        return {"plan": plan, "full_scans": _full_scans(dialect, plan), "explain_error": None}
+
+    def snapshot(self, limit: int, full_scans_only: bool = False) -> List[dict]:
+        """Up to `limit` records, newest first."""
+        records = [
+            dict(record) for record in reversed(self._records)
+            if not full_scans_only or record["full_scans"]
+        ]
+        return records[:limit]
+
+    def clear(self):
+        self._records.clear()
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": SLOW_QUERY_MS,
+            "size": self._records.maxlen,
+            "recorded": len(self._records),
+            "explained": self.explained,
+            "explain_waiting": self._queue.qsize(),
+            "explains_dropped": self.explains_dropped,
+        }
+
+
+_log: Optional[SlowQueryLog] = None
+_log_lock = threading.Lock()
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """Return the process-wide slow query log, creating it on first use."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = SlowQueryLog()
+    return _log
+
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < SLOW_QUERY_MS or connection.get_execution_options().get("slow_query_log") is False:
+        return
+    get_slow_query_log().record(connection.dialect.name, statement, parameters, executemany, duration_ms)
+
+
+# Every statement of the engine is timed; importing this module (the admin API does)
+# registers the hooks
+if SLOW_QUERY_MS > 0:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
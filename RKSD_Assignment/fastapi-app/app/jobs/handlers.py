@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.database.connection import SessionLocal
+from app.jobs.queue import get_queue
+from app.jobs.registry import JobOutput, PermanentJobError, job_handler, report_progress
+from app.utils.application_report import get_application_report_data, get_application_pdf_filename
+from app.utils.archive import ARCHIVE_AFTER_DAYS, archive_applications
+from app.utils.candidate_import import import_candidates
+from app.utils.dedup import DEDUP_MIN_SCORE, run_dedup
+from app.utils.opening_expiry import expire_openings
+from app.utils.outbox import compact_outbox
+from app.utils.storage import create_thumbnail, get_store
+from app.utils.text_extraction import run_extraction
+
+
+class ApplicationPdfPayload(BaseModel):
+    """Payload for the application_pdf job."""
+    application_id: int
+
+
+@job_handler("application_pdf", payload_model=ApplicationPdfPayload, concurrency=2)
+def application_pdf(payload: dict, output_path: str) -> JobOutput:
+    """Render the application PDF to a file."""
+    db = SessionLocal()
+    try:
+        application_data = get_application_report_data(db, payload["application_id"])
+    finally:
+        db.close()
+
+    if application_data is None:
+        raise PermanentJobError(f"Application with ID {payload['application_id']} not found")
+
+    from app.utils.pdf_generator import generate_application_pdf
+    pdf_buffer = generate_application_pdf(application_data)
+    with open(output_path, "wb") as output:
+        output.write(pdf_buffer.getbuffer())
+
+    return JobOutput(media_type="application/pdf", filename=get_application_pdf_filename(application_data))
+
+
+class CandidateImportPayload(BaseModel):
+    """Payload for the candidate_import job: the ID the spreadsheet was saved under and its original name."""
+    upload_id: str = Field(pattern=r"^[0-9a-f]{32}(\.[a-z0-9]+)?$")
+    filename: str
+
+
+@job_handler("candidate_import", payload_model=CandidateImportPayload, concurrency=1, max_attempts=1, internal=True)
+def candidate_import(payload: dict, output_path: str) -> JobOutput:
+    """Import an uploaded candidate spreadsheet; every rejected row is written to a CSV report."""
+    try:
+        path = get_queue().upload_path(payload["upload_id"])
+    except ValueError as exc:
+        raise PermanentJobError(str(exc))
+    if not os.path.exists(path):
+        raise PermanentJobError(f"Upload {payload['upload_id']} no longer exists")
+
+    try:
+        with open(path, "rb") as upload, open(output_path, "w", newline="") as report:
+            writer = csv.writer(report)
+            writer.writerow(["row", "errors", "data"])
+            summary = import_candidates(
+                upload,
+                payload["filename"],
+                on_progress=lambda progress: report_progress({key: value for key, value in progress.items()
+                                                              if key != "rejections"}),
+                on_rejected=lambda row_number, row, errors: writer.writerow(
+                    [row_number, json.dumps(errors), json.dumps(row, default=str)]
+                )
+            )
+    finally:
+        os.remove(path)
+
+    return JobOutput(media_type="text/csv", filename="rejected_rows.csv", result=summary)
+
+
+class PhotoThumbnailPayload(BaseModel):
+    """Payload for the photo_thumbnail job."""
+    key: str
+
+
+@job_handler("photo_thumbnail", payload_model=PhotoThumbnailPayload, concurrency=2)
+def photo_thumbnail(payload: dict, output_path: str) -> JobOutput:
+    """Generate the thumbnail of an uploaded candidate photo."""
+    if not get_store().exists(payload["key"]):
+        raise PermanentJobError(f"File {payload['key']} not found")
+
+    create_thumbnail(payload["key"])
+    return JobOutput(result={"key": payload["key"]})
+
+
+class AttachmentTextExtractionPayload(BaseModel):
+    """Payload for the attachment_text_extraction job; without keys every attachment is scanned."""
+    keys: Optional[List[str]] = None
+
+
+@job_handler("attachment_text_extraction", payload_model=AttachmentTextExtractionPayload, concurrency=1)
+def attachment_text_extraction(payload: dict, output_path: str) -> JobOutput:
+    """Extract and index the text of attachments that haven't been processed yet."""
+    summary = run_extraction(keys=payload.get("keys"), on_progress=report_progress)
+    return JobOutput(result=summary)
+
+
+class CandidateDedupPayload(BaseModel):
+    """Payload for the candidate_dedup job."""
+    min_score: float = DEDUP_MIN_SCORE
+
+
+@job_handler("candidate_dedup", payload_model=CandidateDedupPayload, concurrency=1, max_attempts=1)
+def candidate_dedup(payload: dict, output_path: str) -> JobOutput:
+    """Rebuild the duplicate candidate suggestions."""
+    summary = run_dedup(min_score=payload.get("min_score", DEDUP_MIN_SCORE), on_progress=report_progress)
+    return JobOutput(result=summary)
+
+
+@job_handler("opening_expiry", concurrency=1, max_attempts=1)
+def opening_expiry(payload: dict, output_path: str) -> JobOutput:
+    """Deactivate openings whose deadline has passed (also run periodically by the scheduler)."""
+    return JobOutput(result=expire_openings())
+
+
+class ApplicationArchivePayload(BaseModel):
+    """Payload for the application_archive job."""
+    older_than_days: float = ARCHIVE_AFTER_DAYS
+
+
+@job_handler("application_archive", payload_model=ApplicationArchivePayload, concurrency=1, max_attempts=1)
+def application_archive(payload: dict, output_path: str) -> JobOutput:
+    """Move old accepted and rejected applications to the archive tables."""
+    return JobOutput(result=archive_applications(older_than_days=payload.get("older_than_days", ARCHIVE_AFTER_DAYS)))
+
+
+@job_handler("outbox_compaction", concurrency=1, max_attempts=1)
+def outbox_compaction(payload: dict, output_path: str) -> JobOutput:
+    """Delete expired and superseded change feed events (also run periodically by the scheduler)."""
+    return JobOutput(result=compact_outbox())
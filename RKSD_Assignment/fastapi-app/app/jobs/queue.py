@@ -0,0 +1,301 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+# The queue lives in its own SQLite file so it survives restarts and is shared
+# by every worker process on the host, whatever database the app itself uses.
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "./jobs.db")
+JOB_RESULTS_DIR = os.getenv("JOB_RESULTS_DIR", "./job_results")
+
+# A running job whose lease expires (e.g. its worker was killed) is picked up again,
+# or failed if it has used all its attempts
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+# How often a worker extends the lease of the job it is running
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 4)))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    locked_by TEXT,
+    locked_until REAL,
+    result_path TEXT,
+    result_media_type TEXT,
+    result_filename TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status_type_run_after ON jobs (status, job_type, run_after);
+"""
+
+
+class JobQueue:
+    """Durable job queue backed by a SQLite file."""
+
+    def __init__(self, path: str = JOBS_DB_PATH, results_dir: str = JOB_RESULTS_DIR):
+        self.path = path
+        self.results_dir = results_dir
+        self._local = threading.local()
+        os.makedirs(os.path.join(results_dir, "attempts"), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def result_path(self, job_id: str) -> str:
+        """Path of a succeeded job's output file."""
+        return os.path.join(self.results_dir, job_id)
+
+    def attempt_path(self, job_id: str, attempt: int) -> str:
+        """
+        Path one attempt's handler writes its output file to; complete() moves
+        it to result_path() if the attempt still holds the job.
+        """
+        return os.path.join(self.results_dir, "attempts", f"{job_id}.{attempt}")
+
+    def upload_path(self, upload_id: str) -> str:
+        """
+        Path of a file saved for a job to process, by the ID it was saved
+        under; raises ValueError for an ID that would point outside the
+        uploads directory.
+        """
+        upload_dir = os.path.realpath(os.path.join(self.results_dir, "uploads"))
+        path = os.path.realpath(os.path.join(upload_dir, upload_id))
+        if os.path.dirname(path) != upload_dir:
+            raise ValueError(f"Invalid upload ID '{upload_id}'")
+        return path
+
+    def enqueue(self, job_type: str, payload: dict, max_attempts: int = 3) -> str:
+        """Add a job to the queue and return its ID."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (job_id, job_type, payload, status, max_attempts, run_after, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, job_type, json.dumps(payload), QUEUED, max_attempts, now, now, now)
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job as a dict, or None if it doesn't exist."""
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def claim(self, concurrency: Dict[str, int], worker_id: str) -> Optional[dict]:
+        """
+        Atomically take the oldest runnable job of one of the given types.
+
+        `concurrency` maps job type to the maximum number of jobs of that type
+        allowed to run at once across all processes sharing the queue. A job
+        whose lease expired is claimed again if it has attempts left and is
+        failed otherwise, so a job that kills its worker isn't retried forever.
+        """
+        connection = self._connection()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can't claim the same job
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "UPDATE jobs SET status = ?, locked_by = NULL, locked_until = NULL, "
+                "error = 'The worker running the last attempt stopped responding', updated_at = ? "
+                "WHERE status = ? AND locked_until <= ? AND attempts >= max_attempts",
+                (FAILED, now, RUNNING, now)
+            )
+            running = dict(connection.execute(
+                "SELECT job_type, COUNT(*) FROM jobs WHERE status = ? AND locked_until > ? GROUP BY job_type",
+                (RUNNING, now)
+            ).fetchall())
+            job_types = [
+                job_type for job_type, limit in concurrency.items()
+                if running.get(job_type, 0) < limit
+            ]
+            if not job_types:
+                connection.execute("COMMIT")
+                return None
+
+            placeholders = ", ".join("?" for _ in job_types)
+            row = connection.execute(
+                f"SELECT * FROM jobs WHERE job_type IN ({placeholders}) AND ("
+                "(status = ? AND run_after <= ?) OR (status = ? AND locked_until <= ? AND attempts < max_attempts)"
+                ") ORDER BY run_after LIMIT 1",
+                (*job_types, QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+
+            connection.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_by = ?, locked_until = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (RUNNING, worker_id, now + JOB_LEASE_SECONDS, now, row["job_id"])
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        job = _row_to_job(row)
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        job["locked_by"] = worker_id
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease of a running job; False if the worker no longer holds it."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET locked_until = ? WHERE job_id = ? AND status = ? AND locked_by = ?",
+            (time.time() + JOB_LEASE_SECONDS, job_id, RUNNING, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[dict] = None,
+                 media_type: Optional[str] = None, filename: Optional[str] = None,
+                 output_path: Optional[str] = None) -> bool:
+        """
+        Mark a job as succeeded, recording its result summary and moving the
+        attempt's output file (if any) to the job's result path. Nothing is
+        recorded, the output file is deleted and False returned if the worker
+        lost the job's lease to another.
+        """
+        connection = self._connection()
+        # The write lock keeps the lease from passing to another worker between
+        # the check and the update, so only the holder's file is ever published
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            held = connection.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND status = ? AND locked_by = ?", (job_id, RUNNING, worker_id)
+            ).fetchone() is not None
+            result_path = None
+            if held:
+                if output_path and os.path.exists(output_path):
+                    result_path = self.result_path(job_id)
+                    os.replace(output_path, result_path)
+                connection.execute(
+                    "UPDATE jobs SET status = ?, locked_by = NULL, locked_until = NULL, result_path = ?, "
+                    "result_media_type = ?, result_filename = ?, result = ?, error = NULL, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (SUCCEEDED, result_path, media_type, filename,
+                     json.dumps(result) if result is not None else None, time.time(), job_id)
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            _remove(output_path)
+        return held
+
+    def set_progress(self, job_id: str, worker_id: str, progress: dict):
+        """Store a running job's progress; it is returned as the job's result until the job finishes."""
+        self._connection().execute(
+            "UPDATE jobs SET result = ?, updated_at = ? WHERE job_id = ? AND status = ? AND locked_by = ?",
+            (json.dumps(progress), time.time(), job_id, RUNNING, worker_id)
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: Optional[float] = None,
+             output_path: Optional[str] = None) -> bool:
+        """
+        Record a failed attempt and delete its output file. The job is queued
+        again after `retry_delay` seconds if it has attempts left, otherwise it
+        is marked as failed. Like complete(), records nothing if the worker
+        lost the job's lease.
+        """
+        _remove(output_path)
+        connection = self._connection()
+        now = time.time()
+        job = self.get(job_id)
+        if job is None:
+            return False
+
+        if retry_delay is not None and job["attempts"] < job["max_attempts"]:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, locked_by = NULL, locked_until = NULL, error = ?, "
+                "updated_at = ? WHERE job_id = ? AND status = ? AND locked_by = ?",
+                (QUEUED, now + retry_delay, error, now, job_id, RUNNING, worker_id)
+            )
+        else:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, locked_by = NULL, locked_until = NULL, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = ? AND locked_by = ?",
+                (FAILED, error, now, job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs (and their output files) last updated more than `older_than` seconds ago."""
+        connection = self._connection()
+        cutoff = time.time() - older_than
+        rows = connection.execute(
+            "SELECT job_id, attempts FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (SUCCEEDED, FAILED, cutoff)
+        ).fetchall()
+        for row in rows:
+            _remove(self.result_path(row["job_id"]))
+            # Left behind by attempts whose worker died
+            for attempt in range(1, row["attempts"] + 1):
+                _remove(self.attempt_path(row["job_id"], attempt))
+        connection.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (SUCCEEDED, FAILED, cutoff)
+        )
+        return len(rows)
+
+    def counts(self) -> List[dict]:
+        """Number of jobs per type and status."""
+        rows = self._connection().execute(
+            "SELECT job_type, status, COUNT(*) AS count FROM jobs GROUP BY job_type, status"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _remove(path: Optional[str]):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
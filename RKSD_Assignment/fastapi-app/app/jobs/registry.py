@@ -0,0 +1,57 @@
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Type
+
+from pydantic import BaseModel
+
+
+class JobOutput(NamedTuple):
+    """What a handler produced: the file it wrote (if any) and a JSON-able summary."""
+    media_type: Optional[str] = None
+    filename: Optional[str] = None
+    result: Optional[dict] = None
+
+
+class JobType(NamedTuple):
+    name: str
+    handler: Callable[[dict, str], Optional[JobOutput]]
+    payload_model: Optional[Type[BaseModel]]
+    concurrency: int
+    max_attempts: int
+    retry_delay: float
+    internal: bool
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job can't succeed (e.g. the record is gone)."""
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def job_handler(name: str, payload_model: Optional[Type[BaseModel]] = None, concurrency: int = 2,
+                max_attempts: int = 3, retry_delay: float = 10.0, internal: bool = False):
+    """
+    Register a function as the handler for a job type.
+
+    The handler is called as `handler(payload, output_path)`. It may write its
+    result file to `output_path` and return a JobOutput describing it.
+    `concurrency` caps how many jobs of this type run at once across all
+    workers; failed attempts are retried with exponential backoff starting at
+    `retry_delay` seconds. `internal` job types are only enqueued by the app
+    itself (their payload is trusted), never through `POST /jobs/`.
+    """
+    def decorator(func):
+        JOB_TYPES[name] = JobType(name, func, payload_model, concurrency, max_attempts, retry_delay, internal)
+        return func
+    return decorator
+
+
+# The job being run by the current worker thread, set by WorkerPool.run_job
+_current = threading.local()
+
+
+def report_progress(progress: dict):
+    """Publish progress for the job running in this thread (no-op outside a job)."""
+    job_id = getattr(_current, "job_id", None)
+    if job_id is not None:
+        _current.queue.set_progress(job_id, _current.worker_id, progress)
@@ -0,0 +1,93 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, List, NamedTuple
+
+from app.utils.archive import archive_applications
+from app.utils.opening_expiry import expire_openings
+from app.utils.outbox import compact_outbox
+from app.utils.partitions import ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+# Periodic tasks run in every API worker process unless disabled, so the same
+# task may run in several workers at once. The built-in tasks allow for that:
+# each batch re-checks its conditions in the statement that changes the rows
+# (archiving re-checks status and age when it moves an application) and
+# partitions are created under an advisory lock. Overlapping runs only repeat
+# work; set SCHEDULER_ENABLED=false in all but one process to avoid that too.
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+OPENING_EXPIRY_INTERVAL = float(os.getenv("OPENING_EXPIRY_INTERVAL", "300"))
+APPLICATION_ARCHIVE_INTERVAL = float(os.getenv("APPLICATION_ARCHIVE_INTERVAL", str(24 * 3600)))
+# Only does anything once the applications table is partitioned (PostgreSQL)
+APPLICATION_PARTITION_INTERVAL = float(os.getenv("APPLICATION_PARTITION_INTERVAL", str(24 * 3600)))
+OUTBOX_COMPACTION_INTERVAL = float(os.getenv("OUTBOX_COMPACTION_INTERVAL", "3600"))
+
+
+class ScheduledTask(NamedTuple):
+    name: str
+    func: Callable[[], object]
+    interval: float
+
+
+class Scheduler:
+    """
+    A thread that runs registered functions every `interval` seconds.
+
+    Each task first runs after a random fraction of its interval, so workers
+    started together don't all fire at once. A failing run is logged and the
+    task runs again at its next slot.
+    """
+
+    def __init__(self):
+        self.tasks: List[ScheduledTask] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def every(self, interval: float, func: Callable[[], object], name: str = None):
+        self.tasks.append(ScheduledTask(name or func.__name__, func, interval))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Started scheduler with %d task(s)", len(self.tasks))
+
+    def stop(self, timeout: float = 30.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        if not self.tasks:
+            return
+        now = time.monotonic()
+        next_runs = [now + task.interval * random.random() for task in self.tasks]
+        while not self._stop.is_set():
+            due = min(next_runs)
+            if self._stop.wait(max(0.0, due - time.monotonic())):
+                break
+            for i, task in enumerate(self.tasks):
+                if next_runs[i] > time.monotonic():
+                    continue
+                try:
+                    result = task.func()
+                    logger.info("Scheduled task %s finished: %s", task.name, result)
+                except Exception:
+                    logger.exception("Scheduled task %s failed", task.name)
+                next_runs[i] = time.monotonic() + task.interval
+
+
+def default_scheduler() -> Scheduler:
+    scheduler = Scheduler()
+    if OPENING_EXPIRY_INTERVAL > 0:
+        scheduler.every(OPENING_EXPIRY_INTERVAL, expire_openings, "opening_expiry")
+    if APPLICATION_ARCHIVE_INTERVAL > 0:
+        scheduler.every(APPLICATION_ARCHIVE_INTERVAL, archive_applications, "application_archive")
+    if APPLICATION_PARTITION_INTERVAL > 0:
+        scheduler.every(APPLICATION_PARTITION_INTERVAL, ensure_partitions, "application_partitions")
+    if OUTBOX_COMPACTION_INTERVAL > 0:
+        scheduler.every(OUTBOX_COMPACTION_INTERVAL, compact_outbox, "outbox_compaction")
+    return scheduler
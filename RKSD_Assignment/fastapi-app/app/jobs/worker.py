@@ -0,0 +1,142 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import List, Optional
+
+from app.jobs import handlers  # noqa: F401 - registers the built-in job types
+from app.jobs.queue import JOB_HEARTBEAT_SECONDS, JobQueue, get_queue
+from app.jobs import registry
+from app.jobs.registry import JOB_TYPES, JobOutput, PermanentJobError
+
+logger = logging.getLogger(__name__)
+
+# Number of job threads started inside each API worker process (0 disables them,
+# e.g. when jobs are processed by a separate `python -m app.jobs.worker`)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+
+class WorkerPool:
+    """Threads that claim jobs from the queue and run their handlers."""
+
+    def __init__(self, queue: Optional[JobQueue] = None, threads: int = JOB_WORKERS,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue or get_queue()
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        for i in range(self.threads):
+            # The first thread also purges old finished jobs
+            thread = threading.Thread(target=self._run, args=(i == 0,), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d job worker thread(s)", self.threads)
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop claiming new jobs and wait for running ones to finish. Jobs still
+        running after the timeout are retried once their lease expires.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _run(self, purge: bool):
+        worker_id = f"{self._worker_prefix}:{threading.current_thread().name}"
+        last_purge = 0.0
+        while not self._stop.is_set():
+            try:
+                if purge and time.monotonic() - last_purge > 3600:
+                    self.queue.purge(JOB_RETENTION_HOURS * 3600)
+                    last_purge = time.monotonic()
+
+                job = self.queue.claim(
+                    {job_type.name: job_type.concurrency for job_type in JOB_TYPES.values()},
+                    worker_id
+                )
+            except Exception:
+                logger.exception("Failed to claim a job")
+                job = None
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self.run_job(job)
+
+    def run_job(self, job: dict):
+        """Run one claimed job and record its outcome, holding its lease meanwhile."""
+        job_type = JOB_TYPES[job["job_type"]]
+        job_id, worker_id = job["job_id"], job["locked_by"]
+        # Each attempt writes its own file, which only complete() publishes
+        output_path = self.queue.attempt_path(job_id, job["attempts"])
+        started = time.monotonic()
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, worker_id, finished), name=f"job-heartbeat-{job_id}", daemon=True
+        )
+        heartbeat.start()
+        registry._current.job_id, registry._current.worker_id, registry._current.queue = job_id, worker_id, self.queue
+        try:
+            output = job_type.handler(job["payload"], output_path)
+        except PermanentJobError as exc:
+            logger.warning("Job %s (%s) failed permanently: %s", job_id, job_type.name, exc)
+            recorded = self.queue.fail(job_id, worker_id, str(exc), output_path=output_path)
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed on attempt %d", job_id, job_type.name, job["attempts"])
+            retry_delay = job_type.retry_delay * 2 ** (job["attempts"] - 1)
+            recorded = self.queue.fail(
+                job_id, worker_id, f"{type(exc).__name__}: {exc}", retry_delay, output_path=output_path
+            )
+        else:
+            output = output or JobOutput()
+            recorded = self.queue.complete(
+                job_id, worker_id, output.result, output.media_type, output.filename, output_path=output_path
+            )
+            logger.info("Job %s (%s) finished in %.2fs", job_id, job_type.name, time.monotonic() - started)
+        finally:
+            finished.set()
+            registry._current.job_id = None
+        if not recorded:
+            logger.warning("Job %s (%s) outcome discarded: its lease passed to another worker", job_id, job_type.name)
+
+    def _heartbeat(self, job_id: str, worker_id: str, finished: threading.Event):
+        while not finished.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not self.queue.heartbeat(job_id, worker_id):
+                    logger.warning("Lost the lease of job %s", job_id)
+                    return
+            except Exception:
+                logger.exception("Failed to extend the lease of job %s", job_id)
+
+
+def main():
+    """Run a standalone job worker, keeping slow jobs entirely out of the API processes."""
+    parser = argparse.ArgumentParser(description="Process background jobs")
+    parser.add_argument("--threads", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    pool = WorkerPool(threads=args.threads)
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopped.set())
+
+    pool.start()
+    stopped.wait()
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
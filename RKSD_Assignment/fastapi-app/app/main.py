@@ -1,21 +1,154 @@
-from fastapi import FastAPI, Depends, HTTPException
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
 # Import routes
-from app.routes import candidate, role, stage, application, experience, opening
+from app.routes import candidate, role, stage, application, experience, opening, health, job, file, admin, batch, change
 
 # Import database connection
-from app.database.connection import get_db, init_db
+from app.database.connection import SessionLocal, engine, get_db, should_init_db_on_startup, warm_pool
+from app.database.migrations import get_current_revision, get_head_revision, upgrade_schema
+from app.jobs.scheduler import SCHEDULER_ENABLED, default_scheduler
+from app.jobs.worker import JOB_WORKERS, WorkerPool
+from app.middleware.admission import AdmissionMiddleware, RateLimitMiddleware, default_route_classes
+from app.middleware.coalescing import CoalescingMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.memory import MemoryMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+from app.utils import lookups
+from app.utils.events import EVENT_POLL_SECONDS, get_outbox_relay
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Open pooled connections and load the role/stage lookups."""
+    warm_pool()
+
+    db = SessionLocal()
+    try:
+        lookups.load(db)
+    finally:
+        db.close()
+
+
+def warm_up_pdf():
+    """Import ReportLab and load the PDF fonts off the startup path."""
+    try:
+        from app.utils import pdf_generator
+        pdf_generator.warm_up()
+    except Exception:
+        logger.exception("PDF warm-up failed; ReportLab will be loaded on first PDF request")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize connections and resources on startup, release them on shutdown."""
+    app.state.ready = False
+
+    if should_init_db_on_startup():
+        await run_in_threadpool(upgrade_schema)
+
+    current_revision = await run_in_threadpool(get_current_revision)
+    if current_revision != get_head_revision():
+        logger.warning(
+            "Database schema is at revision %s, expected %s; run 'alembic upgrade head'",
+            current_revision, get_head_revision()
+        )
+
+    await run_in_threadpool(warm_up)
+
+    job_workers = WorkerPool() if JOB_WORKERS > 0 else None
+    if job_workers:
+        job_workers.start()
+
+    scheduler = default_scheduler() if SCHEDULER_ENABLED else None
+    if scheduler:
+        scheduler.start()
+
+    # Publishes application changes made by any worker to this worker's event streams
+    relay = get_outbox_relay() if EVENT_POLL_SECONDS > 0 else None
+    if relay:
+        await run_in_threadpool(relay.start)
+
+    app.state.ready = True
+
+    # ReportLab is heavy, so it is warmed in the background after the worker starts serving
+    if os.getenv("PDF_WARM_UP", "true").lower() in ("1", "true", "yes"):
+        threading.Thread(target=warm_up_pdf, name="pdf-warm-up", daemon=True).start()
+
+    yield
+
+    app.state.ready = False
+    if relay:
+        await run_in_threadpool(relay.stop)
+    if scheduler:
+        await run_in_threadpool(scheduler.stop)
+    if job_workers:
+        await run_in_threadpool(job_workers.stop)
+    engine.dispose()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Recruitment API",
     description="API for managing recruitment processes",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """
+    A write matched no row because a concurrent request changed (or deleted)
+    it first; endpoints that retry such writes use update_with_retries.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "The record was modified by another request, try again"}
+    )
+
+
+# Middleware added last runs first: CORS, compression, rate limits, coalescing, admission
+# control, memory accounting, profiling, then the request context
+
+# Lets code that runs for a request (the slow query log) name the route it runs for
+app.add_middleware(RequestContextMiddleware)
+
+# Samples the stacks of requests to a route while a profile is running (see /admin/profile);
+# innermost, so that only the request's own work is profiled
+app.add_middleware(ProfilingMiddleware)
+
+# Measures the peak memory of a sample of requests per route (see /admin/memory)
+app.add_middleware(MemoryMiddleware)
+
+# Route classes shared by admission control and the rate limits in front of coalescing
+route_classes = default_route_classes()
+
+# Shed load per route class before any work is done for the request
+app.add_middleware(AdmissionMiddleware, route_classes=route_classes, rate_limit=False)
+
+# Identical concurrent requests share one response; they wait outside admission control
+# so that only the request doing the work takes a slot
+app.add_middleware(CoalescingMiddleware)
+
+# Per-client rate limits apply before coalescing, so that waiting for an identical request
+# still spends the client's tokens
+app.add_middleware(RateLimitMiddleware, route_classes=route_classes)
+
+# Compress JSON, CSV and other text responses (gzip, plus brotli/zstd when installed)
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -32,19 +165,12 @@ app.include_router(stage.router, prefix="/stages", tags=["Stages"])
 app.include_router(application.router, prefix="/applications", tags=["Applications"])
 app.include_router(experience.router, prefix="/experiences", tags=["Experiences"])
 app.include_router(opening.router, prefix="/openings", tags=["Openings"])
-
-
-@app.on_event("startup")
-async def startup():
-    """Initialize connections and resources on startup."""
-    await init_db()
-
-
-@app.on_event("shutdown")
-async def shutdown():
-    """Close connections and free resources on shutdown."""
-    # Add shutdown logic here if needed
-    pass
+app.include_router(file.router, prefix="/files", tags=["Files"])
+app.include_router(job.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(batch.router, prefix="/batch", tags=["Batch"])
+app.include_router(change.router, prefix="/changes", tags=["Changes"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 
 @app.get("/", tags=["Health"])
@@ -54,5 +180,6 @@ async def root():
 
 
 if __name__ == "__main__":
+    # Development server only; production runs through gunicorn (see gunicorn_conf.py)
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
 
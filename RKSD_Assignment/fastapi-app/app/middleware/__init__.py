@@ -0,0 +1,13 @@
+from typing import Optional
+
+from starlette.types import ASGIApp
+
+
+def find_middleware(app: ASGIApp, middleware_class) -> Optional[ASGIApp]:
+    """Return the instance of a middleware class in a built middleware stack, or None."""
+    node = app
+    while node is not None:
+        if isinstance(node, middleware_class):
+            return node
+        node = getattr(node, "app", None)
+    return None
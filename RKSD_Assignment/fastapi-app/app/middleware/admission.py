@@ -0,0 +1,267 @@
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Each worker process admits requests independently; limits are per process.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# How long a request may wait for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+# Retry-After sent with 503s
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+# Token buckets kept per route class before idle clients are dropped
+MAX_TRACKED_CLIENTS = 10000
+
+
+def _setting(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+class RouteClass:
+    """
+    A group of routes sharing a concurrency limit and a wait queue, and
+    optionally a per-client token bucket.
+    """
+
+    def __init__(self, name: str, routes: List[Tuple[str, str]], concurrency: int, queue_depth: int,
+                 rate: Optional[float] = None, burst: Optional[float] = None):
+        self.name = name
+        self.routes = [(method, re.compile(pattern)) for method, pattern in routes]
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.waiting = 0
+        self._semaphore = anyio.Semaphore(concurrency)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self.metrics = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_queue_timeout": 0,
+            "rate_limited": 0,
+            "peak_in_flight": 0,
+            "peak_waiting": 0,
+        }
+
+    def matches(self, method: str, path: str) -> bool:
+        return any((route_method == "*" or route_method == method) and pattern.match(path)
+                   for route_method, pattern in self.routes)
+
+    @property
+    def in_flight(self) -> int:
+        return self.concurrency - self._semaphore.value
+
+    def take_token(self, client: str) -> float:
+        """Take a token from the client's bucket; returns 0, or the seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+        if client not in self._buckets and len(self._buckets) >= MAX_TRACKED_CLIENTS:
+            # Forget clients whose buckets have refilled; they'd start full anyway
+            self._buckets = {
+                key: (value, at) for key, (value, at) in self._buckets.items()
+                if value + (now - at) * self.rate < self.burst
+            }
+        self._buckets[client] = (tokens - 1, now)
+        return 0.0
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting in the queue for up to `timeout` seconds; False if the request is shed."""
+        try:
+            self._semaphore.acquire_nowait()
+        except anyio.WouldBlock:
+            if self.waiting >= self.queue_depth:
+                self.metrics["shed_queue_full"] += 1
+                return False
+
+            self.waiting += 1
+            self.metrics["queued"] += 1
+            self.metrics["peak_waiting"] = max(self.metrics["peak_waiting"], self.waiting)
+            acquired = False
+            try:
+                with anyio.move_on_after(timeout):
+                    await self._semaphore.acquire()
+                    acquired = True
+            finally:
+                self.waiting -= 1
+            if not acquired:
+                self.metrics["shed_queue_timeout"] += 1
+                return False
+
+        self.metrics["admitted"] += 1
+        self.metrics["peak_in_flight"] = max(self.metrics["peak_in_flight"], self.in_flight)
+        return True
+
+    def release(self):
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue_depth,
+            "rate_per_client": self.rate,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            **self.metrics,
+        }
+
+
+def default_route_classes() -> List[RouteClass]:
+    """
+    Heavy endpoints (PDF rendering, the by-month report, ranking, search) and
+    bulk transfers (export, import) get small pools of their own so a spike on
+    them can't starve cheap lookups, which share the large default pool.
+    """
+    return [
+        RouteClass(
+            "heavy",
+            [
+                ("GET", r"^/applications/\d+/pdf$"),
+                ("POST", r"^/applications/by-month/detailed$"),
+                ("GET", r"^/applications/search$"),
+                ("GET", r"^/openings/\d+/ranking$"),
+            ],
+            concurrency=int(_setting("ADMISSION_HEAVY_CONCURRENCY", "4")),
+            queue_depth=int(_setting("ADMISSION_HEAVY_QUEUE", "8")),
+            rate=_setting("ADMISSION_HEAVY_RATE", "2"),
+            burst=_setting("ADMISSION_HEAVY_BURST", "10"),
+        ),
+        RouteClass(
+            "bulk",
+            [
+                ("GET", r"^/applications/export$"),
+                ("POST", r"^/candidates/import$"),
+            ],
+            concurrency=int(_setting("ADMISSION_BULK_CONCURRENCY", "2")),
+            queue_depth=int(_setting("ADMISSION_BULK_QUEUE", "2")),
+            rate=_setting("ADMISSION_BULK_RATE", "0.5"),
+            burst=_setting("ADMISSION_BULK_BURST", "5"),
+        ),
+        # Event streams stay open for as long as the client is connected, so they
+        # are counted separately instead of holding slots in the default pool
+        RouteClass(
+            "stream",
+            [("GET", r"^/applications/events$")],
+            concurrency=int(_setting("ADMISSION_STREAM_CONCURRENCY", "1000")),
+            queue_depth=0,
+        ),
+        RouteClass(
+            "default",
+            [("*", r"^/(?!health/|admin/)")],
+            concurrency=int(_setting("ADMISSION_DEFAULT_CONCURRENCY", "100")),
+            queue_depth=int(_setting("ADMISSION_DEFAULT_QUEUE", "200")),
+        ),
+    ]
+
+
+class AdmissionMiddleware:
+    """
+    Per-route-class admission control.
+
+    A request is matched to the first route class whose routes match it
+    (health checks and the admin API are never limited). If the class has a
+    free slot the request runs at once; otherwise it waits in the class's
+    queue. A full queue or a wait longer than the queue timeout gets an
+    immediate 503 with Retry-After, and a client that has used up its token
+    bucket gets a 429.
+    """
+
+    def __init__(self, app: ASGIApp, route_classes: Optional[List[RouteClass]] = None,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT, enabled: bool = ADMISSION_ENABLED,
+                 rate_limit: bool = True):
+        self.app = app
+        self.route_classes = route_classes if route_classes is not None else default_route_classes()
+        self.queue_timeout = queue_timeout
+        self.enabled = enabled
+        # Off when a RateLimitMiddleware further out checks the same route classes' buckets
+        self.rate_limit = rate_limit
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        for route_class in self.route_classes:
+            if route_class.matches(method, path):
+                return route_class
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = None
+        if self.enabled and scope["type"] == "http":
+            route_class = self.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limit and await _rate_limited(route_class, scope, send):
+            return
+
+        if not await route_class.acquire(self.queue_timeout):
+            await _reject(send, 503, "Server is busy, try again shortly", ADMISSION_RETRY_AFTER)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release()
+
+    def snapshot(self) -> dict:
+        return {route_class.name: route_class.snapshot() for route_class in self.route_classes}
+
+
+class RateLimitMiddleware:
+    """
+    The per-client token buckets of the route classes on their own, for use
+    further out than AdmissionMiddleware (created with `rate_limit=False` and
+    the same route classes). Placed in front of request coalescing, it makes
+    a request that joins an identical one in flight still spend its client's
+    tokens.
+    """
+
+    def __init__(self, app: ASGIApp, route_classes: List[RouteClass], enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.route_classes = route_classes
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.enabled and scope["type"] == "http":
+            for route_class in self.route_classes:
+                if route_class.matches(scope["method"], scope["path"]):
+                    if await _rate_limited(route_class, scope, send):
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+
+async def _rate_limited(route_class: RouteClass, scope: Scope, send: Send) -> bool:
+    """Take a token from the client's bucket of the route class; sends a 429 and returns True if there is none."""
+    if not route_class.rate:
+        return False
+    client = scope["client"][0] if scope.get("client") else "unknown"
+    wait = route_class.take_token(client)
+    if not wait:
+        return False
+    route_class.metrics["rate_limited"] += 1
+    await _reject(send, 429, "Too many requests, slow down", wait)
+    return True
+
+
+async def _reject(send: Send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COALESCING_ENABLED = os.getenv("COALESCING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Routes whose concurrent identical requests share one response, as "METHOD:regex" entries
+# separated by semicolons; replaces DEFAULT_COALESCED_ROUTES when set
+COALESCING_ROUTES = os.getenv("COALESCING_ROUTES")
+# Requests with a larger body are never coalesced
+COALESCING_MAX_REQUEST_BODY = 64 * 1024
+# Responses larger than this are not buffered for sharing; waiting requests run on their own
+COALESCING_MAX_RESPONSE_BYTES = int(os.getenv("COALESCING_MAX_RESPONSE_BYTES", str(16 * 1024 * 1024)))
+
+# Read-only endpoints that dashboards request all at once
+DEFAULT_COALESCED_ROUTES = [
+    ("GET", r"^/stages/$"),
+    ("GET", r"^/roles/$"),
+    ("POST", r"^/applications/by-month/detailed$"),
+    ("GET", r"^/applications/search$"),
+    ("GET", r"^/openings/\d+/ranking$"),
+]
+
+
+def parse_routes(value: str) -> List[Tuple[str, str]]:
+    """Parse "GET:^/stages/$;POST:^/applications/by-month/detailed$" into (method, regex) pairs."""
+    routes = []
+    for entry in value.split(";"):
+        method, _, pattern = entry.strip().partition(":")
+        if pattern:
+            routes.append((method.strip().upper(), pattern.strip()))
+    return routes
+
+
+class _Flight:
+    """One in-flight computation and the response messages it produced."""
+
+    def __init__(self):
+        self.done = anyio.Event()
+        self.messages: List[Message] = []
+        self.size = 0
+        self.shareable = True
+        self.followers = 0
+        self.status: Optional[int] = None
+
+    def record(self, message: Message):
+        if not self.shareable:
+            return
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        if message["type"] != "http.response.start" and message["type"] != "http.response.body":
+            # File descriptors and other extensions can't be replayed
+            self.shareable = False
+            self.messages = []
+            return
+        self.size += len(message.get("body", b""))
+        if self.size > COALESCING_MAX_RESPONSE_BYTES:
+            self.shareable = False
+            self.messages = []
+            return
+        self.messages.append(message)
+
+    @property
+    def complete(self) -> bool:
+        # A 429 or 5xx (shed by admission control, or an error) is about the leader's own
+        # attempt, so waiting requests make their own instead of inheriting it
+        return (
+            self.shareable
+            and self.status is not None
+            and self.status < 500
+            and self.status != 429
+            and bool(self.messages)
+            and self.messages[-1]["type"] == "http.response.body"
+            and not self.messages[-1].get("more_body", False)
+        )
+
+
+class CoalescingMiddleware:
+    """
+    Single-flight request coalescing for opted-in routes.
+
+    Requests are keyed by method, path, normalized query string and a digest
+    of the body. The first request for a key (the leader) runs normally while
+    its response is recorded; identical requests that arrive before it
+    finishes wait for it and are sent the same response instead of running
+    the handler again. Nothing is cached: once the leader's response is
+    complete the key is free and the next request runs anew.
+
+    If the leader fails, is cancelled, is answered with 429 or a 5xx, or
+    produces a response that can't be shared (too large, or sent as a file),
+    the waiting requests run on their own.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Optional[List[Tuple[str, str]]] = None,
+                 enabled: bool = COALESCING_ENABLED):
+        self.app = app
+        if routes is None:
+            routes = parse_routes(COALESCING_ROUTES) if COALESCING_ROUTES else DEFAULT_COALESCED_ROUTES
+        self.routes = [(method, re.compile(pattern)) for method, pattern in routes]
+        self.enabled = enabled
+        self._flights: Dict[Tuple[str, str, str, bytes], _Flight] = {}
+        self.metrics = {"leaders": 0, "coalesced": 0, "fallbacks": 0}
+
+    def matches(self, method: str, path: str) -> bool:
+        return any((route_method == "*" or route_method == method) and pattern.match(path)
+                   for route_method, pattern in self.routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not (self.enabled and scope["type"] == "http" and self.matches(scope["method"], scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        body, complete = await _read_body(receive)
+        replay = _replay_receive(body, complete, receive)
+        if not complete:
+            await self.app(scope, replay, send)
+            return
+
+        key = _request_key(scope, body)
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            await flight.done.wait()
+            if flight.complete:
+                self.metrics["coalesced"] += 1
+                for message in flight.messages:
+                    await send(message)
+                return
+            self.metrics["fallbacks"] += 1
+            await self.app(scope, replay, send)
+            return
+
+        flight = self._flights[key] = _Flight()
+        self.metrics["leaders"] += 1
+
+        async def record_and_send(message: Message):
+            flight.record(message)
+            await send(message)
+
+        try:
+            await self.app(scope, replay, record_and_send)
+        except BaseException:
+            flight.shareable = False
+            raise
+        finally:
+            del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.metrics,
+            "in_flight": len(self._flights),
+            "waiting": sum(flight.followers for flight in self._flights.values()),
+        }
+
+
+def _request_key(scope: Scope, body: bytes) -> Tuple[str, str, str, bytes]:
+    # Parameter order doesn't change the result, so sort it
+    query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+    return scope["method"], scope["path"], query, hashlib.blake2b(body, digest_size=16).digest()
+
+
+async def _read_body(receive: Receive) -> Tuple[bytes, bool]:
+    """Read the request body; `complete` is False if it exceeded the limit or the client left."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return b"".join(chunks), False
+        chunk = message.get("body", b"")
+        chunks.append(chunk)
+        size += len(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks), True
+        if size > COALESCING_MAX_REQUEST_BODY:
+            return b"".join(chunks), False
+
+
+def _replay_receive(body: bytes, complete: bool, receive: Receive) -> Receive:
+    """A receive callable that hands out the already-read body, then defers to `receive`."""
+    pending = True
+
+    async def replay() -> Message:
+        nonlocal pending
+        if pending:
+            pending = False
+            return {"type": "http.request", "body": body, "more_body": not complete}
+        return await receive()
+
+    return replay
@@ -0,0 +1,340 @@
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Responses smaller than this are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Encodings offered, most preferred first; unavailable ones (missing packages) are dropped
+COMPRESSION_ENCODINGS = [
+    name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()
+]
+# Memory for compressed copies of recently sent bodies (0 disables the cache)
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Bodies at least this large are compressed in a worker thread instead of on the event loop
+THREAD_COMPRESSION_SIZE = 256 * 1024
+FILE_CHUNK_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml",
+    "application/x-ndjson", "image/svg+xml",
+)
+# Server-sent events must reach the client as soon as they are written
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        import brotli
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"zstd": _ZstdEncoder, "br": _BrotliEncoder, "gzip": _GzipEncoder}
+
+
+def available_encodings(names: List[str]) -> List[str]:
+    """The encodings in `names` whose compression library is installed."""
+    available = []
+    for name in names:
+        if name not in ENCODERS:
+            continue
+        try:
+            ENCODERS[name]()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def negotiate(accept_encoding: Optional[str], encodings: List[str]) -> Optional[str]:
+    """Pick the encoding with the highest q-value in Accept-Encoding, preferring earlier `encodings` on ties."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(("+json", "+xml"))
+
+
+class CompressedVariantCache:
+    """
+    LRU of compressed bodies keyed by encoding and a digest of the uncompressed
+    body, so a payload served repeatedly is only compressed once per encoding.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, bytes], value: bytes):
+        # One entry may not take more than a quarter of the cache
+        if len(value) > self.max_bytes // 4:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd, brotli or gzip, as negotiated with Accept-Encoding.
+
+    Complete bodies below `minimum_size` are left alone; larger ones are
+    compressed in one go (through the variant cache). Streamed bodies are
+    compressed chunk by chunk, flushing after each chunk so clients receive
+    data as soon as it is produced. Partial content, responses that already
+    have a Content-Encoding and media types that don't compress (images,
+    archives, PDFs, event streams) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 encodings: Optional[List[str]] = None, cache_bytes: int = COMPRESSION_CACHE_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings if encodings is not None else COMPRESSION_ENCODINGS)
+        self.cache = CompressedVariantCache(cache_bytes) if cache_bytes > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    async def compress_body(self, encoding: str, body: bytes) -> bytes:
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(encoding, body)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if len(body) >= THREAD_COMPRESSION_SIZE:
+            compressed = await anyio.to_thread.run_sync(compress, encoding, body)
+        else:
+            compressed = compress(encoding, body)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.mode = None  # "pending" until the first body chunk decides: "passthrough" or "stream"
+        self.encoder = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Copy the headers; the list may belong to a Response object that is sent again
+            message = {**message, "headers": list(message.get("headers", []))}
+            headers = MutableHeaders(raw=message["headers"])
+            eligible = (
+                message["status"] >= 200
+                and message["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and is_compressible(headers.get("content-type", ""))
+            )
+            if eligible:
+                headers.add_vary_header("Accept-Encoding")
+            if eligible and self.encoding:
+                self.start_message = message
+                self.mode = "pending"
+            else:
+                self.mode = "passthrough"
+                await self._send(message)
+            return
+
+        if self.mode == "passthrough":
+            await self._send(message)
+        elif message_type == "http.response.zerocopysend":
+            await self._send_file(message)
+        elif message_type == "http.response.body":
+            await self._send_body(message)
+        else:
+            await self._send(message)
+
+    async def _send_body(self, message: Message):
+        if self.mode == "passthrough":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode == "pending":
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not more_body:
+                self.mode = "passthrough"
+                if len(body) >= self.middleware.minimum_size:
+                    compressed = await self.middleware.compress_body(self.encoding, body)
+                    # Not worth it when compression doesn't save anything
+                    if len(compressed) < len(body):
+                        self._set_encoding_headers(headers)
+                        headers["content-length"] = str(len(compressed))
+                        message = {"type": "http.response.body", "body": compressed, "more_body": False}
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            declared_length = headers.get("content-length")
+            if declared_length is not None and int(declared_length) < self.middleware.minimum_size:
+                self.mode = "passthrough"
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.mode = "stream"
+            self.encoder = ENCODERS[self.encoding]()
+            self._set_encoding_headers(headers)
+            del headers["content-length"]
+            await self._send(self.start_message)
+
+        chunk = self.encoder.compress(body) + (self.encoder.flush() if more_body else self.encoder.finish())
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_file(self, message: Message):
+        # The zero-copy extension hands over a file descriptor; read it so it can be compressed
+        fd = message["file"]
+        offset = message.get("offset")
+        if offset is None:
+            offset = os.lseek(fd, 0, os.SEEK_CUR)
+        remaining = message.get("count")
+        if remaining is None:
+            remaining = os.fstat(fd).st_size - offset
+        more_body = message.get("more_body", False)
+
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(FILE_CHUNK_SIZE, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await self._send_body({
+                "type": "http.response.body", "body": chunk, "more_body": remaining > 0 or more_body
+            })
+            if remaining <= 0:
+                return
+        await self._send_body({"type": "http.response.body", "body": b"", "more_body": more_body})
+
+    def _set_encoding_headers(self, headers: MutableHeaders):
+        headers["content-encoding"] = self.encoding
+        # Byte ranges would refer to the uncompressed body
+        if "accept-ranges" in headers:
+            del headers["accept-ranges"]
+        # The compressed bytes differ, so a strong validator becomes weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = "W/" + etag
@@ -0,0 +1,129 @@
+import logging
+import os
+import random
+import tracemalloc
+from typing import Dict, List, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.request_context import route_name
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests whose peak memory is measured with tracemalloc; 0 turns measuring off
+MEMORY_SAMPLE_RATE = float(os.getenv("MEMORY_SAMPLE_RATE", "0.01"))
+# Measured requests that allocate more than this at their peak are logged, in MB. Only
+# sampled requests are measured, so this alerts rather than limits; REPORT_STREAM_ROWS
+# and REPORT_MAX_ROWS are what bound the memory of the largest responses
+MEMORY_SOFT_LIMIT_MB = float(os.getenv("MEMORY_SOFT_LIMIT_MB", "100"))
+
+MB = 1024 * 1024
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident memory of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RouteMemory:
+    """Peak memory of the measured requests of one route."""
+
+    def __init__(self):
+        self.measured = 0
+        self.over_soft_limit = 0
+        self.total_peak = 0
+        self.max_peak = 0
+        self.last_peak = 0
+
+    def add(self, peak: int, soft_limit: int):
+        self.measured += 1
+        self.total_peak += peak
+        self.max_peak = max(self.max_peak, peak)
+        self.last_peak = peak
+        if peak > soft_limit:
+            self.over_soft_limit += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "measured": self.measured,
+            "over_soft_limit": self.over_soft_limit,
+            "mean_peak_mb": round(self.total_peak / self.measured / MB, 3),
+            "max_peak_mb": round(self.max_peak / MB, 3),
+            "last_peak_mb": round(self.last_peak / MB, 3),
+        }
+
+
+class MemoryMiddleware:
+    """
+    Samples the peak Python memory of requests, per route.
+
+    A fraction `sample_rate` of requests is measured, one at a time: tracemalloc
+    traces allocations from the start of the request until its response is
+    sent, then stops, so requests that aren't measured run at full speed
+    unless they overlap a measured one. The peak covers every allocation the
+    process made meanwhile, including those of overlapping requests, and
+    memory allocated outside Python (ReportLab's C code, database drivers)
+    isn't seen. Requests peaking above `soft_limit_mb` are logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = MEMORY_SAMPLE_RATE,
+                 soft_limit_mb: float = MEMORY_SOFT_LIMIT_MB):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.soft_limit = int(soft_limit_mb * MB)
+        self.routes: Dict[str, RouteMemory] = {}
+        self._measuring = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or self._measuring or self.sample_rate <= 0
+                or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        self._measuring = True
+        # Someone may be tracing already (PYTHONTRACEMALLOC); then it is left running
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+            self._measuring = False
+            self._record(route_name(scope), peak)
+
+    def _record(self, route: str, peak: int):
+        self.routes.setdefault(route, RouteMemory()).add(peak, self.soft_limit)
+        if peak > self.soft_limit:
+            logger.warning("%s allocated %.1f MB at its peak (soft limit %.0f MB)",
+                           route, peak / MB, self.soft_limit / MB)
+
+    def top_routes(self, limit: int) -> List[dict]:
+        """The routes with the highest measured peak first."""
+        ranked = sorted(self.routes.items(), key=lambda item: item[1].max_peak, reverse=True)
+        return [{"route": route, **memory.snapshot()} for route, memory in ranked[:limit]]
+
+    def snapshot(self) -> dict:
+        rss = _rss_bytes()
+        return {
+            "sample_rate": self.sample_rate,
+            "soft_limit_mb": self.soft_limit / MB,
+            "measuring": self._measuring,
+            "rss_mb": round(rss / MB, 1) if rss is not None else None,
+            # ru_maxrss is in kilobytes on Linux
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        }
@@ -0,0 +1,275 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextvars import Context, ContextVar
+from typing import Callable, Dict, Optional
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Longest profiling window that can be requested, in seconds
+PROFILE_MAX_SECONDS = 600
+# Distinct stacks kept per session; samples of further new stacks are counted under "[truncated]"
+PROFILE_MAX_STACKS = 20000
+# Frames kept per stack, the innermost ones
+PROFILE_MAX_DEPTH = 128
+
+# The session profiling the current request; thread-pool work started by the request inherits it
+_profiled: ContextVar[Optional["ProfileSession"]] = ContextVar("profiled", default=None)
+
+try:
+    # Thread-pool work (run_in_threadpool, sync endpoints) runs inside anyio's worker loop,
+    # which holds the request's context in a local
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_RUN_CODE = WorkerThread.run.__code__
+except (ImportError, AttributeError):
+    _WORKER_RUN_CODE = None
+
+# Every callback of the pure-Python event loop runs from here; frames below it are the loop's own
+_LOOP_CALLBACK_CODE = asyncio.events.Handle._run.__code__
+
+_labels: Dict[object, str] = {}
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        prefixes = [path for path in sys.path if path and filename.startswith(path.rstrip("/") + "/")]
+        if prefixes:
+            filename = filename[len(max(prefixes, key=len).rstrip("/")) + 1:]
+        label = f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+        _labels[code] = label
+    return label
+
+
+def _codes(frame) -> list:
+    """Code objects of the stack ending in `frame`, outermost first."""
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return codes
+
+
+def _after(codes: list, marker) -> list:
+    """The codes called from the innermost `marker` frame, or all of them if there is none."""
+    for index in range(len(codes) - 1, -1, -1):
+        if codes[index] is marker:
+            return codes[index + 1:]
+    return codes
+
+
+class ProfileSession:
+    """
+    A statistical stack sampler for one route over a time window.
+
+    A fraction of the requests to the route is profiled. While any of them
+    is in flight, a background thread samples the stacks of every thread
+    every `interval` seconds and keeps those working for a profiled
+    request: the event loop while it runs the request's task or a task the
+    request started, and thread-pool workers running the request's work.
+    Time a request spends awaiting only shows up where some thread is
+    working for it, and work done in plain event loop callbacks (such as
+    the batching loader's queries) isn't attributed to any request.
+    """
+
+    def __init__(self, route: str, method: Optional[str], sample_rate: float, seconds: float,
+                 interval: float, on_finish: Callable[["ProfileSession"], None]):
+        self.route = route
+        self.method = method.upper() if method else None
+        self.pattern = compile_path(route)[0]
+        self.sample_rate = sample_rate
+        self.seconds = seconds
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.matched = 0
+        self.profiled = 0
+        self.samples = 0
+        self.in_flight = 0
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.finished_at: Optional[float] = None
+        self._tasks = weakref.WeakSet()
+        self._on_finish = on_finish
+        self._stopped = threading.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        previous = self._loop.get_task_factory()
+        # A session that just ended may not have put the loop's factory back yet
+        while isinstance(getattr(previous, "__self__", None), ProfileSession):
+            previous = previous.__self__._previous_task_factory
+        self._previous_task_factory = previous
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    @property
+    def root(self) -> str:
+        return f"{self.method or '*'} {self.route}"
+
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method is None or self.method == method) and self.pattern.match(path) is not None
+
+    def start(self):
+        # Tasks a profiled request starts (a streaming response's body, for one) are profiled with it
+        self._loop.set_task_factory(self._task_factory)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_task_factory is not None:
+            task = self._previous_task_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        if (context.get(_profiled) if context is not None else _profiled.get()) is self:
+            self._tasks.add(task)
+        return task
+
+    async def profile(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send):
+        task = asyncio.current_task()
+        token = _profiled.set(self)
+        self._tasks.add(task)
+        self.profiled += 1
+        self.in_flight += 1
+        try:
+            await app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self._tasks.discard(task)
+            _profiled.reset(token)
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set() and time.monotonic() < self.deadline:
+                if self.in_flight:
+                    self._sample()
+                self._stopped.wait(self.interval)
+        finally:
+            self.finished_at = time.time()
+            try:
+                self._loop.call_soon_threadsafe(self._restore_task_factory)
+            except RuntimeError:
+                pass  # The loop is closed
+            self._on_finish(self)
+
+    def _restore_task_factory(self):
+        # Unless a newer session has installed its own since
+        if self._loop.get_task_factory() == self._task_factory:
+            self._loop.set_task_factory(self._previous_task_factory)
+
+    def _sample(self):
+        task = asyncio.current_task(self._loop)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._loop_thread:
+                if task is None or task not in self._tasks:
+                    continue
+                codes = _after(_after(_codes(frame), _LOOP_CALLBACK_CODE), _PROFILE_CODE)
+                if asyncio.current_task(self._loop) is not task:
+                    continue  # The loop moved on to another task while the stack was read
+                self._record(codes)
+            elif _WORKER_RUN_CODE is not None:
+                worker = frame
+                while worker is not None and worker.f_code is not _WORKER_RUN_CODE:
+                    worker = worker.f_back
+                if worker is None:
+                    continue
+                context = worker.f_locals.get("context")
+                if isinstance(context, Context) and context.get(_profiled) is self:
+                    self._record(["[thread pool]"] + _after(_codes(frame), _WORKER_RUN_CODE))
+        self.samples += 1
+
+    def _record(self, codes: list):
+        labels = [code if isinstance(code, str) else _label(code) for code in codes[-PROFILE_MAX_DEPTH:]]
+        stack = ";".join([self.root] + labels)
+        if stack not in self.stacks and len(self.stacks) >= PROFILE_MAX_STACKS:
+            stack = f"{self.root};[truncated]"
+        self.stacks[stack] += 1
+
+    def collapsed(self) -> str:
+        """The samples in collapsed-stack format, "outer;...;inner count" per line, for flamegraph tools."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def snapshot(self) -> dict:
+        return {
+            "route": self.route,
+            "method": self.method,
+            "sample_rate": self.sample_rate,
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "running": self.running,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "matched_requests": self.matched,
+            "profiled_requests": self.profiled,
+            "in_flight": self.in_flight,
+            "samples": self.samples,
+            "stack_samples": sum(self.stacks.values()),
+            "distinct_stacks": len(self.stacks),
+        }
+
+
+_PROFILE_CODE = ProfileSession.profile.__code__
+
+
+class ProfilingMiddleware:
+    """
+    On-demand request profiling, started through the admin API.
+
+    With no session running a request costs one attribute check. During a
+    session, requests matching its route are profiled with probability
+    `sample_rate`. Sessions are per worker process, and the results of the
+    last one are kept until the next starts.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.session: Optional[ProfileSession] = None
+        self.last: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session = self.session
+        if session is None or scope["type"] != "http" or not session.matches(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        session.matched += 1
+        if random.random() >= session.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        await session.profile(self.app, scope, receive, send)
+
+    def start(self, route: str, method: Optional[str], sample_rate: float, seconds: float,
+              interval: float) -> Optional[ProfileSession]:
+        """Start a session on the running event loop; None if one is already running."""
+        with self._lock:
+            if self.session is not None:
+                return None
+            session = ProfileSession(route, method, sample_rate, min(seconds, PROFILE_MAX_SECONDS),
+                                     interval, self._finished)
+            self.session = self.last = session
+        session.start()
+        return session
+
+    def stop(self) -> Optional[ProfileSession]:
+        """Stop the running session early; returns the last session."""
+        session = self.session
+        if session is not None:
+            session.stop()
+        return self.last
+
+    def _finished(self, session: ProfileSession):
+        with self._lock:
+            if self.session is session:
+                self.session = None
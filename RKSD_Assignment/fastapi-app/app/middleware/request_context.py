@@ -0,0 +1,37 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# The scope of the request being handled; the router adds the matched route to it.
+# Thread-pool work and tasks started by the request inherit it.
+_request_scope: ContextVar[Optional[Scope]] = ContextVar("request_scope", default=None)
+
+
+def route_name(scope: Scope) -> str:
+    """A request as "METHOD /path/{param}", with the path of the request if no route matched (yet)."""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+def current_route() -> Optional[str]:
+    """route_name of the request being handled; None outside a request."""
+    scope = _request_scope.get()
+    return route_name(scope) if scope is not None else None
+
+
+class RequestContextMiddleware:
+    """Makes the request being handled available to code without access to it (see current_route)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
@@ -4,4 +4,9 @@ from app.models import stage
 from app.models import application
 from app.models import experience
 from app.models import opening
-
+from app.models import attachment_text
+from app.models import candidate_duplicate
+from app.models import archived_application
+from app.models import archived_experience
+from app.models import outbox_event
+from app.models import application_attachment
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, func
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, Enum, func
 from sqlalchemy.orm import relationship
 from app.database.connection import Base
 from app.models.enums import ApplicationStatus
 
 class Application(Base):
     __tablename__ = "applications"
+    # IDs of archived applications must not be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
 
     application_id = Column(Integer, primary_key=True, index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.candidate_id"), nullable=False)
@@ -18,6 +20,20 @@ class Application(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    # Experience summary maintained by app.utils.experience_summary. Overlapping jobs are
+    # merged; with a current position the totals are as of experience_summary_at.
+    total_experience_years = Column(Float, nullable=True)
+    experience_gap_years = Column(Float, nullable=True)
+    latest_position = Column(String, nullable=True)
+    has_current_position = Column(Boolean, nullable=True)
+    experience_summary_at = Column(DateTime, nullable=True)
+
+    # Incremented by every ORM update, whose UPDATE only matches the version it read
+    # (WHERE version = :v): a concurrent change makes the flush raise StaleDataError
+    # instead of being overwritten. Served as the ETag of the application.
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
     role = relationship("Role", back_populates="applications")
     experiences = relationship("Experience", back_populates="application", cascade="all, delete-orphan")
     candidate = relationship("Candidate", back_populates="applications")
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from app.database.connection import Base
+
+class ApplicationAttachment(Base):
+    __tablename__ = "application_attachments"
+
+    # One row per storage key in Application.attachments, so attachment search can
+    # join on the content hash instead of scanning the comma-separated lists.
+    # Rows of archived applications are kept for when they are restored.
+    content_hash = Column(String(64), primary_key=True)
+    application_id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False)
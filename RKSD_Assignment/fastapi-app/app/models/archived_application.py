@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, Enum, func
+from app.database.connection import Base
+from app.models.enums import ApplicationStatus
+
+class ArchivedApplication(Base):
+    """
+    Cold copy of a finalized application, moved out of `applications` by
+    app.utils.archive. Columns mirror Application (the ID is kept) so reads
+    can fall back to this table; there are no foreign keys, so archived rows
+    never hold up changes to candidates, roles or openings.
+    """
+    __tablename__ = "applications_archive"
+
+    application_id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, nullable=False, index=True)
+    opening_id = Column(Integer, nullable=False)
+    rating = Column(Integer, nullable=True)
+    role_id = Column(Integer, nullable=False)
+    application_date = Column(DateTime, nullable=False)
+    attachments = Column(String, nullable=True)
+    status = Column(Enum(ApplicationStatus), nullable=False)
+    current_stage = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    total_experience_years = Column(Float, nullable=True)
+    experience_gap_years = Column(Float, nullable=True)
+    latest_position = Column(String, nullable=True)
+    has_current_position = Column(Boolean, nullable=True)
+    experience_summary_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")
+    archived_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
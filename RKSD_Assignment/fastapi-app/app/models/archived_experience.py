@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database.connection import Base
+
+class ArchivedExperience(Base):
+    """Cold copy of an experience of an archived application; mirrors Experience."""
+    __tablename__ = "experiences_archive"
+
+    experience_id = Column(Integer, primary_key=True)
+    application_id = Column(Integer, nullable=False, index=True)
+    company_name = Column(String, nullable=False)
+    position = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=True)
+    duration = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
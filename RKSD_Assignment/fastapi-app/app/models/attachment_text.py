@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from app.database.connection import Base
+
+class AttachmentText(Base):
+    __tablename__ = "attachment_texts"
+
+    # SHA-256 of the file content (the storage key without its extension)
+    content_hash = Column(String(64), primary_key=True)
+    media_type = Column(String, nullable=True)
+    text = Column(Text, nullable=True)
+    char_count = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)  # Set when no text could be extracted
+    extracted_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, UniqueConstraint, func
+from app.database.connection import Base
+
+class CandidateDuplicate(Base):
+    __tablename__ = "candidate_duplicates"
+    __table_args__ = (UniqueConstraint("candidate_id", "duplicate_id"),)
+
+    # One row per suggested pair, stored with candidate_id < duplicate_id
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.candidate_id"), nullable=False)
+    duplicate_id = Column(Integer, ForeignKey("candidates.candidate_id"), nullable=False, index=True)
+    score = Column(Float, nullable=False, index=True)
+    reasons = Column(String, nullable=False)  # Comma-separated, e.g. "email,name"
+    created_at = Column(DateTime, server_default=func.now())
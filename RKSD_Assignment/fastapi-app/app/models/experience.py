@@ -4,6 +4,8 @@ from app.database.connection import Base
 
 class Experience(Base):
     __tablename__ = "experiences"
+    # IDs of archived experiences must not be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
     
     experience_id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.application_id"), nullable=False)
@@ -12,7 +14,7 @@ class Experience(Base):
     description = Column(String, nullable=True)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
-    duration = Column(Integer, nullable=True)
+    duration = Column(Integer, nullable=True)  # Whole months; None while the position is current
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -1,9 +1,20 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
 from app.database.connection import Base
 
 class Opening(Base):
     __tablename__ = "openings"
+    __table_args__ = (
+        # Partial index over live openings only: the job board (active_only) and the
+        # expiry job filter on is_active and range over deadline. Queries must filter
+        # with `Opening.is_active` so their predicate matches the index's.
+        Index(
+            "ix_openings_active_deadline", "deadline",
+            postgresql_where=text("is_active"),
+            postgresql_include=["opening_id"],
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     opening_id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from app.database.connection import Base
+
+class OutboxEvent(Base):
+    """A change to a candidate, application or stage, written in the transaction that made it."""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Finds the later events of an entity when superseded events are compacted
+        Index("ix_outbox_events_entity", "entity", "entity_id", "seq"),
+        # Sequence numbers are never reused on SQLite, even after the newest events are deleted
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # "candidate", "application" or "stage"
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # "created", "updated" or "deleted"
+    payload = Column(Text, nullable=False)  # JSON snapshot of the row's columns
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
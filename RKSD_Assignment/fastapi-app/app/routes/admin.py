@@ -0,0 +1,156 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Route
+
+from app.database.slow_queries import SLOW_QUERY_LOG_SIZE, get_slow_query_log
+from app.jobs.queue import get_queue
+from app.middleware import find_middleware
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.coalescing import CoalescingMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.memory import MemoryMiddleware
+from app.middleware.profiling import PROFILE_MAX_SECONDS, ProfilingMiddleware
+from app.utils.events import get_event_bus
+
+# The admin API is disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only if it carries the configured X-Admin-Token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+router = APIRouter(
+    dependencies=[Depends(require_admin)],
+    responses={403: {"description": "Invalid admin token"}}
+)
+
+
+@router.get("/metrics")
+async def get_metrics(request: Request):
+    """
+    Runtime metrics of this worker process: admission control per route class
+    (in flight, queued, shed and rate-limited requests), request coalescing,
+    the compressed response cache, event stream subscribers and the
+    background job queue.
+    """
+    admission = find_middleware(request.app.middleware_stack, AdmissionMiddleware)
+    coalescing = find_middleware(request.app.middleware_stack, CoalescingMiddleware)
+    compression = find_middleware(request.app.middleware_stack, CompressionMiddleware)
+    return {
+        "pid": os.getpid(),
+        "admission": admission.snapshot() if admission else None,
+        "coalescing": coalescing.snapshot() if coalescing else None,
+        "compression_cache": compression.cache.stats() if compression and compression.cache else None,
+        "events": get_event_bus().stats(),
+        "jobs": await run_in_threadpool(get_queue().counts),
+        "slow_queries": get_slow_query_log().stats(),
+    }
+
+
+def get_profiler(request: Request) -> ProfilingMiddleware:
+    profiler = find_middleware(request.app.middleware_stack, ProfilingMiddleware)
+    if profiler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is not installed")
+    return profiler
+
+
+@router.post("/profile", status_code=status.HTTP_201_CREATED)
+async def start_profile(
+    request: Request,
+    route: str = Query(..., description="Route path as declared, e.g. /applications/{application_id}/pdf"),
+    method: Optional[str] = Query(None, description="Only profile this HTTP method"),
+    sample_rate: float = Query(1.0, gt=0, le=1, description="Fraction of the route's requests to profile"),
+    seconds: float = Query(60, gt=0, le=PROFILE_MAX_SECONDS, description="How long to profile"),
+    interval_ms: float = Query(5, ge=1, le=1000, description="Milliseconds between stack samples"),
+):
+    """
+    Start profiling a route in this worker process: for `seconds`, a
+    fraction of the requests to it are profiled by sampling their stacks.
+    Read the result with `GET /admin/profile`.
+    """
+    routes = [route_ for route_ in request.app.routes if isinstance(route_, Route) and route_.path == route]
+    if not routes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown route {route}")
+    if method and not any(method.upper() in route_.methods for route_ in routes):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Route {route} has no {method.upper()} method")
+
+    session = get_profiler(request).start(route, method, sample_rate, seconds, interval_ms / 1000)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    return {"pid": os.getpid(), **session.snapshot()}
+
+
+@router.get("/profile")
+async def get_profile(
+    request: Request,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """
+    The samples of the running or last profile of this worker process.
+
+    `collapsed` (the default) is plain text with one "outer;...;inner count"
+    line per stack, the input of flamegraph.pl and speedscope. `json`
+    returns the session's counters with the stacks.
+    """
+    session = get_profiler(request).last
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile has been taken")
+    if format == "collapsed":
+        return PlainTextResponse(session.collapsed())
+    return {"pid": os.getpid(), **session.snapshot(), "stacks": dict(session.stacks.most_common())}
+
+
+@router.delete("/profile")
+async def stop_profile(request: Request):
+    """Stop the running profile early; its samples stay available."""
+    session = await run_in_threadpool(get_profiler(request).stop)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile has been taken")
+    return {"pid": os.getpid(), **session.snapshot()}
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=SLOW_QUERY_LOG_SIZE),
+    full_scans_only: bool = Query(False, description="Only statements whose plan reads a table without an index"),
+):
+    """
+    The most recent statements of this worker process that took longer than
+    SLOW_QUERY_MS, newest first: the statement, its parameters with text
+    values redacted, the route and the line of code that ran it, and its
+    plan (`EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN (FORMAT JSON)` on
+    PostgreSQL) with the tables it scans in full. The plan is captured in
+    the background and is null until it is ready.
+    """
+    log = get_slow_query_log()
+    return {"pid": os.getpid(), **log.stats(), "queries": log.snapshot(limit, full_scans_only)}
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries():
+    """Empty the slow query log of this worker process and forget the captured plans."""
+    get_slow_query_log().clear()
+
+
+@router.get("/memory")
+async def get_memory(request: Request, limit: int = Query(10, ge=1, le=1000)):
+    """
+    The routes of this worker process that allocate the most memory: the
+    mean and highest peak of the requests measured with tracemalloc (a
+    MEMORY_SAMPLE_RATE fraction), and how many went over
+    MEMORY_SOFT_LIMIT_MB. Also the resident memory of the process.
+    """
+    memory = find_middleware(request.app.middleware_stack, MemoryMiddleware)
+    if memory is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory accounting is not installed")
+    return {"pid": os.getpid(), **memory.snapshot(), "routes": memory.top_routes(limit)}
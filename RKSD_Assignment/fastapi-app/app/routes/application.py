@@ -1,52 +1,272 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import asyncio
+import os
+import random
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Response, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from sqlalchemy import func, extract
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import func
 from datetime import datetime
+from starlette.concurrency import run_in_threadpool
 
-from app.database.connection import get_db
+from app.database.connection import SessionLocal, get_db
 from app.models.application import Application
+from app.models.application_attachment import ApplicationAttachment
 from app.models.candidate import Candidate
 from app.models.role import Role
 from app.models.stage import Stage
 from app.models.experience import Experience
+from app.models.archived_application import ArchivedApplication
 from app.models.enums import ApplicationStatus
-from app.schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse, MonthlyApplicationStats, DetailedApplicationResponse, ApplicationsByMonthRequest, StageInfo, ApplicationDetailResponse, ExperienceDetail, RoleStage, StageUpdateRequest
-from app.utils.pdf_generator import generate_application_pdf
+from app.schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse, MonthlyApplicationStats, DetailedApplicationResponse, ApplicationsByMonthRequest, StageInfo, ApplicationDetailResponse, ExperienceDetail, RoleStage, StageUpdateRequest, AttachmentSearchResult
+from app.utils import attachment_links  # noqa: F401 - registers the listener that keeps attachment links current
+from app.utils import lookups
+from app.utils.archive import SOURCES as APPLICATION_SOURCES
+from app.utils.application_report import get_application_report_data, get_application_pdf_filename
+from app.utils.export import EXPORT_CHUNK_SIZE, iter_export_rows, iter_csv, iter_gzip, iter_parquet
+from app.utils.events import get_event_bus, get_outbox_relay, stream_events
+from app.utils.experience_summary import current_total_years
+from app.utils.file_response import CHUNK_SIZE, BufferResponse, if_match_matches
+from app.utils.loader import get_loader, load_existing, parse_ids
+from app.utils.partitions import month_bounds
+from app.utils.storage import UploadTooLarge, get_store, parse_keys, with_key, without_key
+from app.schemas.file import AttachmentsResponse, StoredFileResponse
+from app.utils.text_extraction import search_attachments
+from app.jobs.queue import get_queue
+from app.jobs.registry import JOB_TYPES
+from app.routes.job import to_job_response
+from app.schemas.job import JobResponse
+
+# Attempts at an update that keeps losing to concurrent updates before answering 409
+APPLICATION_UPDATE_ATTEMPTS = int(os.getenv("APPLICATION_UPDATE_ATTEMPTS", "5"))
+# By-month reports with more rows than this are streamed as they are read instead of built in memory
+REPORT_STREAM_ROWS = int(os.getenv("REPORT_STREAM_ROWS", "5000"))
+# By-month reports with more rows than this are refused; 0 means no limit
+REPORT_MAX_ROWS = int(os.getenv("REPORT_MAX_ROWS", "0"))
 
 router = APIRouter(
     responses={404: {"description": "Application not found"}}
 )
 
+
+def application_etag(application) -> str:
+    return f'"{application.version}"'
+
+
+async def update_with_retries(db: Session, application_id: int, if_match: Optional[str],
+                              apply: Callable[[Application], None]) -> Application:
+    """
+    Load the application, change it with `apply` and commit, without locking.
+
+    The UPDATE only matches the version that was read. If a concurrent
+    request committed first, the change is recomputed from the new state and
+    tried again, up to APPLICATION_UPDATE_ATTEMPTS times (then 409). With
+    If-Match the client's version has to be the current one, so a concurrent
+    change is answered with 412 rather than retried.
+    """
+    for attempt in range(APPLICATION_UPDATE_ATTEMPTS):
+        application = db.query(Application).filter(Application.application_id == application_id).first()
+        if application is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Application with ID {application_id} not found"
+            )
+        if if_match is not None and not if_match_matches(if_match, application_etag(application)):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"Application with ID {application_id} has been modified (current version {application.version})"
+            )
+
+        apply(application)
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            # Back off a little so the competing requests don't collide again
+            await asyncio.sleep(random.uniform(0, 0.005 * 2 ** attempt))
+            continue
+        db.refresh(application)
+        # Publish a stage or status change to event stream clients without waiting for the next poll
+        get_outbox_relay().wake()
+        return application
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Application with ID {application_id} is being updated concurrently, try again"
+    )
+
 @router.get("/", response_model=List[ApplicationResponse])
 async def get_applications(
     skip: int = 0, 
     limit: int = 100, 
+    ids: Optional[List[int]] = Depends(parse_ids),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve all applications with pagination.
+    Retrieve all applications with pagination, or the applications listed in
+    `ids` (in that order; IDs that don't exist are left out).
     """
-    applications = db.query(Application).offset(skip).limit(limit).all()
+    if ids is not None:
+        applications = await load_existing(db, Application, ids)
+    else:
+        applications = db.query(Application).offset(skip).limit(limit).all()
 
     return [ApplicationResponse.model_validate(app) for app in applications]
 
 
 
+@router.get("/export", response_class=StreamingResponse)
+def export_applications(
+    format: str = "csv",
+    compress: Optional[str] = None,
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    status_filter: Optional[str] = "All",
+    include_archived: bool = True
+):
+    """
+    Export applications with candidate, role, opening, stage and experience data.
+
+    The file is streamed while it is read from the database, so memory stays
+    constant for any number of rows.
+
+    - format: `csv` (default) or `parquet` (requires pyarrow)
+    - compress: `gzip` to gzip the CSV on the fly
+    - year/month: only applications from that month
+    - status_filter: All, Accepted, Rejected or Pending
+    - include_archived: also export applications moved to the archive (default)
+    """
+    filters = ApplicationsByMonthRequest(
+        year=year, month=month, status_filter=status_filter, include_archived=include_archived
+    )
+    rows = iter_export_rows(filters.get_status_enum, filters.year, filters.month, filters.include_archived)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parquet export requires the pyarrow package"
+            )
+        return StreamingResponse(
+            iter_parquet(rows),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": f"attachment; filename=applications_{timestamp}.parquet"}
+        )
+
+    if format != "csv":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid format. Must be 'csv' or 'parquet'"
+        )
+
+    filename = f"applications_{timestamp}.csv"
+    body = iter_csv(rows)
+    if compress == "gzip":
+        body = iter_gzip(body)
+        filename += ".gz"
+    elif compress is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid compression. Only 'gzip' is supported"
+        )
+
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress == "gzip" else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_application_events(
+    role_id: Optional[int] = None,
+    opening_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None)
+):
+    """
+    Server-sent events stream of application stage and status changes.
+
+    Each `application` event carries the application, role and opening IDs
+    and the new stage and status; filter with `role_id` and `opening_id`.
+    Every worker publishes every change, and event IDs are change feed
+    sequence numbers, so clients that reconnect (to any worker) with
+    Last-Event-ID receive the events they missed while they are still in the
+    worker's history. A `resync` event means events were dropped and the
+    client should reload its lists.
+    """
+    subscription = get_event_bus().subscribe(role_id, opening_id, last_event_id)
+    return StreamingResponse(
+        stream_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/search", response_model=List[AttachmentSearchResult])
+async def search_application_attachments(
+    q: str,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search inside application attachments (resumes, cover letters).
+
+    Text is extracted in the background after each upload; see the
+    `attachment_text_extraction` job.
+    """
+    matches = dict(search_attachments(db, q, limit))
+    if not matches:
+        return []
+
+    rows = (
+        db.query(Application.application_id, ApplicationAttachment.key, Candidate.candidate_name, Role.role_name)
+        .join(ApplicationAttachment, ApplicationAttachment.application_id == Application.application_id)
+        .join(Candidate, Application.candidate_id == Candidate.candidate_id)
+        .join(Role, Application.role_id == Role.role_id)
+        .filter(ApplicationAttachment.content_hash.in_(matches))
+        .all()
+    )
+
+    # Best match first, one result per application
+    rank = {content_hash: index for index, content_hash in enumerate(matches)}
+    results = {}
+    for row in sorted(rows, key=lambda row: rank[row.key[:64]]):
+        if row.application_id not in results:
+            results[row.application_id] = AttachmentSearchResult(
+                application_id=row.application_id,
+                candidate_name=row.candidate_name,
+                role_name=row.role_name,
+                key=row.key,
+                snippet=matches[row.key[:64]]
+            )
+    return list(results.values())[:limit]
+
+
 @router.get("/{application_id}", response_model=ApplicationResponse)
 async def get_application(
     application_id: int, 
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve a specific application by ID.
+    Retrieve a specific application by ID, including archived applications.
+
+    The ETag header carries the application's version, for If-Match on updates.
     """
-    application = db.query(Application).filter(Application.application_id == application_id).first()
+    application = await get_loader(db).load(Application, application_id)
+    if application is None:
+        application = await get_loader(db).load(ArchivedApplication, application_id)
     if application is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=f"Application with ID {application_id} not found"
         )
+    response.headers["ETag"] = application_etag(application)
     return application
 
 
@@ -69,24 +289,24 @@ async def create_application(
 async def update_application(
     application_id: int, 
     application: ApplicationUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Update an existing application.
+
+    With an If-Match header (the ETag of a previous read), the update is only
+    made if the application hasn't changed since; otherwise 412.
     """
-    db_application = db.query(Application).filter(Application.application_id == application_id).first()
-    if db_application is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Application with ID {application_id} not found"
-        )
-        
     update_data = application.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_application, key, value)
-    
-    db.commit()
-    db.refresh(db_application)
+
+    def apply(db_application: Application):
+        for key, value in update_data.items():
+            setattr(db_application, key, value)
+
+    db_application = await update_with_retries(db, application_id, if_match, apply)
+    response.headers["ETag"] = application_etag(db_application)
     return db_application
 
 
@@ -109,6 +329,92 @@ async def delete_application(
     db.commit()
     return None
 
+def detailed_by_month_query(db: Session, request: ApplicationsByMonthRequest):
+    """
+    The query behind /by-month/detailed; also used by scripts/check_partition_pruning.py.
+    With `include_archived` the live and archived applications are combined with UNION ALL.
+    """
+    sources = APPLICATION_SOURCES if request.include_archived else APPLICATION_SOURCES[:1]
+    queries = []
+    for application_model, _ in sources:
+        query = (
+            db.query(
+                application_model.application_id,
+                Candidate.candidate_name,
+                Role.role_name,
+                application_model.rating,
+                application_model.application_date,
+                application_model.attachments,
+                application_model.status,
+                Stage.stage_id,   # ✅ Fetch full stage details
+                Stage.stage_name,
+                Stage.stage_sequence,
+                application_model.total_experience_years,
+                application_model.has_current_position,
+                application_model.experience_summary_at,
+                application_model.latest_position
+            )
+            .join(Candidate, application_model.candidate_id == Candidate.candidate_id)
+            .join(Role, application_model.role_id == Role.role_id)
+            .outerjoin(Stage, Stage.stage_id == application_model.current_stage)  # ✅ Ensure this join is correct
+        )
+
+        # Apply date filters only if both year and month are provided. A date range rather than
+        # extract() so PostgreSQL only scans that month's partition of a partitioned table.
+        if request.year is not None and request.month is not None:
+            start, end = month_bounds(request.year, request.month)
+            query = query.filter(application_model.application_date >= start, application_model.application_date < end)
+
+        # Apply status filter if not "All"
+        if request.get_status_enum is not None:
+            query = query.filter(application_model.status == request.get_status_enum)
+        queries.append(query)
+
+    return queries[0].union_all(*queries[1:]) if len(queries) > 1 else queries[0]
+
+
+def to_detailed_response(row) -> DetailedApplicationResponse:
+    return DetailedApplicationResponse(
+        application_id=row[0],
+        candidate_name=row[1],
+        role_name=row[2],
+        rating=row[3],
+        application_date=row[4],
+        attachments=row[5],
+        status=row[6],
+        stage=StageInfo(  # ✅ Fix: Create full StageInfo object
+            current_stage=row[7],  # stage_id
+            stage_name=row[8],  # stage_name
+            stage_sequence=row[9]  # stage_sequence
+        ) if row[7] else None,  # If stage_id is None, set stage=None
+        total_experience_years=current_total_years(row[10], row[11], row[12]),
+        latest_position=row[13]
+    )
+
+
+def iter_detailed_by_month(request: ApplicationsByMonthRequest) -> Iterator[bytes]:
+    """
+    The by-month report as a JSON array, encoded row by row as the rows are
+    read from a server-side cursor. Uses a session of its own, since the
+    request's is closed before the response is sent.
+    """
+    db = SessionLocal()
+    try:
+        query = detailed_by_month_query(db, request).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        chunk = bytearray(b"[")
+        for count, row in enumerate(query):
+            if count:
+                chunk += b","
+            chunk += to_detailed_response(row).model_dump_json().encode("utf-8")
+            if len(chunk) >= CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += b"]"
+        yield bytes(chunk)
+    finally:
+        db.close()
+
+
 @router.post("/by-month/detailed", response_model=List[DetailedApplicationResponse])
 async def get_detailed_applications_by_month(
     request: ApplicationsByMonthRequest,
@@ -121,59 +427,32 @@ async def get_detailed_applications_by_month(
     application date, and attachments. Can be filtered by status (All, Accepted, Rejected, Pending).
     
     If year or month are not provided, returns all applications regardless of date.
-    """
-    # Initialize the query
-    query = (
-        db.query(
-            Application.application_id,
-            Candidate.candidate_name,
-            Role.role_name,
-            Application.rating,
-            Application.application_date,
-            Application.attachments,
-            Application.status,
-            Stage.stage_id,   # ✅ Fetch full stage details
-            Stage.stage_name,
-            Stage.stage_sequence
-        )
-        .join(Candidate, Application.candidate_id == Candidate.candidate_id)
-        .join(Role, Application.role_id == Role.role_id)
-        .outerjoin(Stage, Stage.stage_id == Application.current_stage)  # ✅ Ensure this join is correct
-    )
+    Archived applications are included unless `include_archived` is false.
 
-    # Apply date filters only if both year and month are provided
-    if request.year is not None and request.month is not None:
-        query = query.filter(
-            extract('year', Application.application_date) == request.year,
-            extract('month', Application.application_date) == request.month
-        )
-
-    # Apply status filter if not "All"
-    if request.get_status_enum is not None:
-        query = query.filter(Application.status == request.get_status_enum)
+    Reports of more than REPORT_STREAM_ROWS applications are streamed as they
+    are read from the database, and reports of more than REPORT_MAX_ROWS (when
+    set) are refused with 400.
+    """
+    query = detailed_by_month_query(db, request)
+    if REPORT_MAX_ROWS:
+        count = query.order_by(None).count()
+        if count > REPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The report has {count} applications, more than the {REPORT_MAX_ROWS} allowed; "
+                       f"narrow it down by month or status"
+            )
+        stream = count > REPORT_STREAM_ROWS
+    else:
+        # Probe for a row past the threshold instead of reading every row up to it
+        stream = query.offset(REPORT_STREAM_ROWS).limit(1).first() is not None
 
-    results = query.all()
+    if stream:
+        # Too large to hold every row and a response object per row at once
+        return StreamingResponse(iter_detailed_by_month(request), media_type="application/json")
 
     # Transform results into response model
-    detailed_applications = [
-        DetailedApplicationResponse(
-            application_id=row[0],
-            candidate_name=row[1],
-            role_name=row[2],
-            rating=row[3],
-            application_date=row[4],
-            attachments=row[5],
-            status=row[6],
-            stage=StageInfo(  # ✅ Fix: Create full StageInfo object
-                current_stage=row[7],  # stage_id
-                stage_name=row[8],  # stage_name
-                stage_sequence=row[9]  # stage_sequence
-            ) if row[7] else None  # If stage_id is None, set stage=None
-        )
-        for row in results
-    ]
-
-    return detailed_applications
+    return [to_detailed_response(row) for row in query]
 
 @router.get("/{application_id}/details", response_model=ApplicationDetailResponse)
 async def get_application_details(
@@ -186,27 +465,37 @@ async def get_application_details(
     - Current application status and stage
     - All experiences of the candidate for this application
     - All stages for the role associated with this application
+
+    Archived applications are looked up in the archive tables.
     """
-    # Get the application with related data
-    application = (
-        db.query(
-            Application.application_id,
-            Application.candidate_id,
-            Candidate.candidate_name,
-            Application.role_id,
-            Role.role_name,
-            Application.current_stage,
-            Stage.stage_name,
-            Stage.stage_sequence,
-            Application.status,
-            Application.application_date
+    # Get the application with related data, from the live tables first
+    for application_model, experience_model in APPLICATION_SOURCES:
+        application = (
+            db.query(
+                application_model.application_id,
+                application_model.candidate_id,
+                Candidate.candidate_name,
+                application_model.role_id,
+                Role.role_name,
+                application_model.current_stage,
+                Stage.stage_name,
+                Stage.stage_sequence,
+                application_model.status,
+                application_model.application_date,
+                application_model.total_experience_years,
+                application_model.has_current_position,
+                application_model.experience_summary_at,
+                application_model.experience_gap_years,
+                application_model.latest_position
+            )
+            .join(Candidate, application_model.candidate_id == Candidate.candidate_id)
+            .join(Role, application_model.role_id == Role.role_id)
+            .join(Stage, application_model.current_stage == Stage.stage_id)
+            .filter(application_model.application_id == application_id)
+            .first()
         )
-        .join(Candidate, Application.candidate_id == Candidate.candidate_id)
-        .join(Role, Application.role_id == Role.role_id)
-        .join(Stage, Application.current_stage == Stage.stage_id)
-        .filter(Application.application_id == application_id)
-        .first()
-    )
+        if application:
+            break
     
     if not application:
         raise HTTPException(
@@ -216,18 +505,13 @@ async def get_application_details(
     
     # Get all experiences for this application
     experiences = (
-        db.query(Experience)
-        .filter(Experience.application_id == application_id)
+        db.query(experience_model)
+        .filter(experience_model.application_id == application_id)
         .all()
     )
     
     # Get all stages for the role associated with this application
-    role_stages = (
-        db.query(Stage)
-        .filter(Stage.role_id == application[3])  # application[3] is role_id
-        .order_by(Stage.stage_sequence)
-        .all()
-    )
+    role_stages = lookups.get_role_stages(db, application[3])  # application[3] is role_id
     
     # Construct the response
     return ApplicationDetailResponse(
@@ -257,13 +541,18 @@ async def get_application_details(
                 stage_name=stage.stage_name,
                 stage_sequence=stage.stage_sequence
             ) for stage in role_stages
-        ]
+        ],
+        total_experience_years=current_total_years(application[10], application[11], application[12]),
+        experience_gap_years=application[13],
+        latest_position=application[14]
     )
 
 @router.post("/{application_id}/update-stage", response_model=ApplicationResponse)
 async def update_application_stage(
     application_id: int,
     request: StageUpdateRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -272,75 +561,74 @@ async def update_application_stage(
     - If action is 'next': Advances the application to the next stage if available.
       If it's the last stage, changes status to ACCEPTED.
     - If action is 'reject': Changes the application status to REJECTED.
+
+    Concurrent clicks are each applied once, to the state the other left. Send
+    the ETag of the application as If-Match to act only on the version that
+    was shown (412 if someone else moved it in the meantime).
     """
-    # Get the application
-    application = db.query(Application).filter(Application.application_id == application_id).first()
-    if not application:
+    action = request.action.lower()
+
+    def apply(application: Application):
+        # Handle rejection
+        if action == "reject":
+            application.status = ApplicationStatus.REJECTED
+            return
+
+        # Handle advancing to next stage
+        if action == "next":
+            # Get all stages for this role; not from the cache, which may be behind other workers
+            role_stages = lookups.read_role_stages(db, application.role_id)
+
+            if not role_stages:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No stages found for this role"
+                )
+
+            # Find current stage and determine if it's the last one
+            current_stage = None
+            next_stage = None
+
+            for i, stage in enumerate(role_stages):
+                if stage.stage_id == application.current_stage:
+                    current_stage = stage
+                    if i < len(role_stages) - 1:
+                        next_stage = role_stages[i + 1]
+                    break
+
+            if not current_stage:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Current stage not found in role stages"
+                )
+
+            # If there's a next stage, advance to it
+            if next_stage:
+                application.current_stage = next_stage.stage_id
+            else:
+                # If it's the last stage, mark as accepted
+                application.status = ApplicationStatus.ACCEPTED
+            return
+
+        # If action is neither 'next' nor 'reject'
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Application with ID {application_id} not found"
-        )
-    
-    # Handle rejection
-    if request.action.lower() == "reject":
-        application.status = ApplicationStatus.REJECTED
-        db.commit()
-        db.refresh(application)
-        return application
-    
-    # Handle advancing to next stage
-    if request.action.lower() == "next":
-        # Get all stages for this role
-        role_stages = (
-            db.query(Stage)
-            .filter(Stage.role_id == application.role_id)
-            .order_by(Stage.stage_sequence)
-            .all()
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid action. Must be 'next' or 'reject'"
         )
-        
-        if not role_stages:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No stages found for this role"
-            )
-        
-        # Find current stage and determine if it's the last one
-        current_stage = None
-        next_stage = None
-        
-        for i, stage in enumerate(role_stages):
-            if stage.stage_id == application.current_stage:
-                current_stage = stage
-                if i < len(role_stages) - 1:
-                    next_stage = role_stages[i + 1]
-                break
-        
-        if not current_stage:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Current stage not found in role stages"
-            )
-        
-        # If there's a next stage, advance to it
-        if next_stage:
-            application.current_stage = next_stage.stage_id
-        else:
-            # If it's the last stage, mark as accepted
-            application.status = ApplicationStatus.ACCEPTED
-        
-        db.commit()
-        db.refresh(application)
-        return application
-    
-    # If action is neither 'next' nor 'reject'
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Invalid action. Must be 'next' or 'reject'"
-    )
 
-@router.get("/{application_id}/pdf", response_class=Response)
+    application = await update_with_retries(db, application_id, if_match, apply)
+    response.headers["ETag"] = application_etag(application)
+    return application
+
+@router.get(
+    "/{application_id}/pdf",
+    response_class=Response,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={202: {"model": JobResponse}, 200: {"content": {"application/pdf": {}}}}
+)
 async def generate_application_pdf_endpoint(
     application_id: int,
+    inline: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -352,77 +640,140 @@ async def generate_application_pdf_endpoint(
     - Current stage and status
     - Work experience history
     - All stages for the role with their status (completed, current, pending)
+
+    The PDF is rendered by an `application_pdf` background job: the response
+    is 202 with the job, and its Location header points to
+    `/jobs/{job_id}/result`, where the file can be downloaded once the job
+    has succeeded. With `inline=true` the PDF is rendered on a worker thread
+    and returned directly.
     """
-    # Reuse the logic from get_application_details to fetch the data
-    application = (
-        db.query(
-            Application.application_id,
-            Application.candidate_id,
-            Candidate.candidate_name,
-            Application.role_id,
-            Role.role_name,
-            Application.current_stage,
-            Stage.stage_name,
-            Stage.stage_sequence,
-            Application.status,
-            Application.application_date,
-            Application.rating
+    if not inline:
+        exists = any(
+            db.query(application_model.application_id)
+            .filter(application_model.application_id == application_id).first()
+            for application_model, _ in APPLICATION_SOURCES
         )
-        .join(Candidate, Application.candidate_id == Candidate.candidate_id)
-        .join(Role, Application.role_id == Role.role_id)
-        .join(Stage, Application.current_stage == Stage.stage_id)
-        .filter(Application.application_id == application_id)
-        .first()
-    )
-    
-    if not application:
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Application with ID {application_id} not found"
+            )
+        job_type = JOB_TYPES["application_pdf"]
+        queue = get_queue()
+        job_id = await run_in_threadpool(
+            queue.enqueue, job_type.name, {"application_id": application_id}, job_type.max_attempts
+        )
+        job = to_job_response(await run_in_threadpool(queue.get, job_id))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"/jobs/{job_id}/result"}
+        )
+
+    application_data = await run_in_threadpool(get_application_report_data, db, application_id)
+    if application_data is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Application with ID {application_id} not found"
         )
     
-    # Get all experiences for this application
-    experiences = (
-        db.query(Experience)
-        .filter(Experience.application_id == application_id)
-        .all()
-    )
-    
-    # Get all stages for the role associated with this application
-    role_stages = (
-        db.query(Stage)
-        .filter(Stage.role_id == application[3])  # application[3] is role_id
-        .order_by(Stage.stage_sequence)
-        .all()
-    )
-    
-    # Prepare data for PDF generation
-    application_data = {
-        "application_id": application[0],
-        "candidate_id": application[1],
-        "candidate_name": application[2],
-        "role_id": application[3],
-        "role_name": application[4],
-        "current_stage_id": application[5],
-        "current_stage_name": application[6],
-        "current_stage_sequence": application[7],
-        "status": application[8],
-        "application_date": application[9],
-        "rating": application[10],
-        "experiences": experiences,
-        "role_stages": role_stages
-    }
-    
-    # Generate the PDF
-    pdf_buffer = generate_application_pdf(application_data)
+    # Generate the PDF off the event loop (ReportLab is only imported on first use to keep startup fast)
+    from app.utils.pdf_generator import generate_application_pdf
+    pdf_buffer = await run_in_threadpool(generate_application_pdf, application_data)
     
     # Return the PDF as a downloadable file
-    filename = f"application_{application_id}_{application[2].replace(' ', '_')}.pdf"
+    filename = get_application_pdf_filename(application_data)
     
-    return Response(
-        content=pdf_buffer.getvalue(),
+    return BufferResponse(
+        pdf_buffer,
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+def to_attachments_response(application: Application) -> AttachmentsResponse:
+    store = get_store()
+    return AttachmentsResponse(
+        application_id=application.application_id,
+        attachments=[
+            StoredFileResponse(key=key, size=os.path.getsize(store.path(key)), url=f"/files/{key}")
+            for key in parse_keys(application.attachments) if store.exists(key)
+        ]
+    )
+
+
+@router.get("/{application_id}/attachments", response_model=AttachmentsResponse)
+async def get_application_attachments(
+    application_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    List the files attached to an application.
+    """
+    application = db.query(Application).filter(Application.application_id == application_id).first()
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Application with ID {application_id} not found"
+        )
+    return to_attachments_response(application)
+
+
+@router.post("/{application_id}/attachments", response_model=AttachmentsResponse, status_code=status.HTTP_201_CREATED)
+async def upload_application_attachment(
+    application_id: int,
+    file: UploadFile = File(..., description="Resume or other document"),
+    db: Session = Depends(get_db)
+):
+    """
+    Attach a file (e.g. a resume) to an application.
+
+    The file is saved in the content store (identical files are stored once)
+    and its key is appended to `Application.attachments`.
+    """
+    application = db.query(Application).filter(Application.application_id == application_id).first()
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Application with ID {application_id} not found"
+        )
+
+    try:
+        stored = await run_in_threadpool(get_store().put, file.file, file.filename)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+
+    def apply(application: Application):
+        application.attachments = with_key(application.attachments, stored.key)
+
+    application = await update_with_retries(db, application_id, None, apply)
+
+    # Index the new file's text for search
+    await run_in_threadpool(get_queue().enqueue, "attachment_text_extraction", {"keys": [stored.key]})
+
+    return to_attachments_response(application)
+
+
+@router.delete("/{application_id}/attachments/{key}", response_model=AttachmentsResponse)
+async def delete_application_attachment(
+    application_id: int,
+    key: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Detach a file from an application. The stored file is kept, since other
+    records may reference the same content.
+    """
+    def apply(application: Application):
+        if key not in parse_keys(application.attachments):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Attachment {key} not found on application {application_id}"
+            )
+        application.attachments = without_key(application.attachments, key)
+
+    application = await update_with_retries(db, application_id, None, apply)
+
+    return to_attachments_response(application)
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import anyio
+from fastapi import APIRouter, Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.types import Message, Scope
+
+from app.database.connection import SessionLocal
+from app.middleware import find_middleware
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.utils.loader import Loader, batch_loader
+
+logger = logging.getLogger(__name__)
+
+# Sub-requests of one batch that run at the same time
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Sub-requests open their sessions in the threadpool and reach their lookups at
+# slightly different times; lookups made within this many seconds share a query
+BATCH_LOADER_DELAY = float(os.getenv("BATCH_LOADER_DELAY", "0.002"))
+
+# Reads that can be batched. Streams, files and the endpoints limited by
+# admission control (reports, search, ranking) have to be requested directly.
+BATCHABLE_ROUTES = [
+    re.compile(r"^/(candidates|roles|stages|openings|experiences|applications)/$"),
+    re.compile(r"^/(candidates|roles|stages|openings|experiences|applications)/\d+$"),
+    re.compile(r"^/applications/\d+/(details|attachments)$"),
+    re.compile(r"^/candidates/duplicates$"),
+]
+
+# Request headers that describe the batch request itself rather than the sub-requests
+EXCLUDED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"transfer-encoding"}
+
+router = APIRouter()
+
+
+class _SubResponse:
+    def __init__(self):
+        self.status = 500
+        self.content_type = ""
+        self.chunks: List[bytes] = []
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    self.content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+
+    def encoded_body(self) -> bytes:
+        """The body as JSON: JSON responses as they are, anything else as a string."""
+        body = b"".join(self.chunks)
+        if not body:
+            return b"null"
+        if self.content_type.startswith("application/json"):
+            return body
+        return json.dumps(body.decode("utf-8", errors="replace")).encode()
+
+
+def _error(status_code: int, detail: str) -> Tuple[int, bytes]:
+    return status_code, json.dumps({"detail": detail}).encode()
+
+
+def _sub_scope(scope: Scope, path: str, query: str) -> Scope:
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": scope.get("scheme", "http"),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": scope.get("root_path", ""),
+        "headers": [(name, value) for name, value in scope.get("headers", []) if name not in EXCLUDED_HEADERS],
+        "client": scope.get("client"),
+        "server": scope.get("server"),
+        "app": scope.get("app"),
+        "state": scope.get("state", {}),
+    }
+
+
+async def _receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+@router.post("", response_class=Response, responses={200: {"model": BatchResponse}})
+async def execute_batch(batch: BatchRequest, request: Request):
+    """
+    Execute several reads in one round trip.
+
+    Each sub-request is a GET against the API's own routes (e.g.
+    `/candidates/1`, `/stages/`, `/applications/7/details`) and is answered
+    with its status code and JSON body, in the order given. Identical
+    sub-requests are executed once. Sub-requests run concurrently, each on a
+    database session of its own so a failing one doesn't affect the others,
+    and their lookups by ID are batched together.
+    """
+    app = request.app
+    handler = find_middleware(app.middleware_stack, ExceptionMiddleware) or app.router
+
+    # Identical sub-requests (same path and parameters in any order) run once
+    entries: List[Tuple[Optional[str], Optional[Tuple[int, bytes]]]] = []
+    unique: Dict[str, Tuple[str, str]] = {}
+    for sub_request in batch.requests:
+        url = urlsplit(sub_request.path)
+        if sub_request.method.upper() != "GET":
+            entries.append((None, _error(405, "Only GET requests can be batched")))
+        elif not any(pattern.match(url.path) for pattern in BATCHABLE_ROUTES):
+            entries.append((None, _error(400, f"{url.path} can't be batched")))
+        else:
+            query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+            key = f"{url.path}?{query}"
+            unique.setdefault(key, (url.path, query))
+            entries.append((key, None))
+
+    results: Dict[str, Tuple[int, bytes]] = {}
+    # Instances found by ID live in the loader's session, which the sub-requests only read
+    loader = Loader(SessionLocal(), delay=BATCH_LOADER_DELAY)
+    limiter = anyio.CapacityLimiter(BATCH_CONCURRENCY)
+
+    async def run(key: str, path: str, query: str):
+        scope = _sub_scope(request.scope, path, query)
+        response = _SubResponse()
+        async with limiter:
+            try:
+                await handler(scope, _receive, response.send)
+                results[key] = response.status, response.encoded_body()
+            except Exception:
+                logger.exception("Batch sub-request GET %s failed", path)
+                results[key] = _error(500, "Internal Server Error")
+
+    token = batch_loader.set(loader)
+    try:
+        async with anyio.create_task_group() as task_group:
+            for key, (path, query) in unique.items():
+                task_group.start_soon(run, key, path, query)
+    finally:
+        batch_loader.reset(token)
+        await run_in_threadpool(loader.db.close)
+
+    parts = []
+    for sub_request, (key, error) in zip(batch.requests, entries):
+        status_code, body = error if key is None else results[key]
+        parts.append(b'{"id":%s,"status":%d,"body":%s}' % (json.dumps(sub_request.id).encode(), status_code, body))
+    return Response(b'{"responses":[' + b",".join(parts) + b"]}", media_type="application/json")
+
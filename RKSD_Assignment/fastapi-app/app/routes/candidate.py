@@ -1,10 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import os
+import shutil
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
 
 from app.database.connection import get_db
 from app.models.candidate import Candidate
-from app.schemas.candidate import CandidateCreate, CandidateResponse, CandidateUpdate
+from app.models.candidate_duplicate import CandidateDuplicate
+from app.schemas.candidate import (
+    CandidateCreate, CandidateResponse, CandidateUpdate, CandidateImportResponse, CandidateDuplicateResponse
+)
+from app.jobs.queue import get_queue
+from app.jobs.registry import JOB_TYPES
+from app.utils.candidate_import import SUPPORTED_EXTENSIONS, import_candidates
+from app.utils.dedup import DEDUP_MIN_SCORE, merge_candidates
+from app.utils.loader import get_loader, load_existing, parse_ids
+from app.utils.storage import UploadTooLarge, get_store
+from app.schemas.file import StoredFileResponse
 
 router = APIRouter(
     responses={404: {"description": "Not found"}},
@@ -14,14 +29,100 @@ router = APIRouter(
 async def get_candidates(
     skip: int = 0, 
     limit: int = 100, 
+    ids: Optional[List[int]] = Depends(parse_ids),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve all candidates with pagination.
+    Retrieve all candidates with pagination, or the candidates listed in `ids`
+    (in that order; IDs that don't exist are left out).
     """
+    if ids is not None:
+        return await load_existing(db, Candidate, ids)
     candidates = db.query(Candidate).offset(skip).limit(limit).all()
     return candidates
 
+@router.post("/import", response_model=CandidateImportResponse)
+async def import_candidates_file(
+    file: UploadFile = File(..., description="CSV or XLSX with candidate_name, email, phone_number and optional photo columns"),
+    background: bool = False
+):
+    """
+    Bulk import candidates from a CSV or XLSX spreadsheet.
+
+    Rows are validated and inserted in batches; rows that fail validation or
+    clash with an existing email/phone number are rejected and reported.
+
+    With `background=true` the file is handed to a `candidate_import` job and
+    the response contains its `job_id`; poll `GET /jobs/{job_id}` for progress
+    and download every rejected row from `GET /jobs/{job_id}/result`.
+    """
+    filename = file.filename or ""
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Must be one of: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+
+    if background:
+        queue = get_queue()
+        upload_id = uuid.uuid4().hex + os.path.splitext(filename)[1].lower()
+        path = queue.upload_path(upload_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def save_upload():
+            with open(path, "wb") as destination:
+                shutil.copyfileobj(file.file, destination)
+
+        await run_in_threadpool(save_upload)
+        job_type = JOB_TYPES["candidate_import"]
+        job_id = await run_in_threadpool(
+            queue.enqueue, job_type.name, {"upload_id": upload_id, "filename": filename}, job_type.max_attempts
+        )
+        return CandidateImportResponse(job_id=job_id)
+
+    summary = await run_in_threadpool(import_candidates, file.file, filename)
+    return CandidateImportResponse(**summary)
+
+
+@router.get("/duplicates", response_model=List[CandidateDuplicateResponse])
+async def get_duplicate_candidates(
+    min_score: float = DEDUP_MIN_SCORE,
+    candidate_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    List suggested duplicate candidates, most likely first.
+
+    Suggestions are rebuilt by the `candidate_dedup` job (enqueue it with
+    `POST /jobs/`); pass `candidate_id` to see the suggestions for one candidate.
+    """
+    first = aliased(Candidate)
+    second = aliased(Candidate)
+    query = (
+        db.query(CandidateDuplicate, first, second)
+        .join(first, first.candidate_id == CandidateDuplicate.candidate_id)
+        .join(second, second.candidate_id == CandidateDuplicate.duplicate_id)
+        .filter(CandidateDuplicate.score >= min_score)
+    )
+    if candidate_id is not None:
+        query = query.filter(
+            (CandidateDuplicate.candidate_id == candidate_id) | (CandidateDuplicate.duplicate_id == candidate_id)
+        )
+    rows = query.order_by(CandidateDuplicate.score.desc(), CandidateDuplicate.id).offset(skip).limit(limit).all()
+
+    return [
+        CandidateDuplicateResponse(
+            candidate=candidate,
+            duplicate=duplicate,
+            score=suggestion.score,
+            reasons=suggestion.reasons.split(",")
+        )
+        for suggestion, candidate, duplicate in rows
+    ]
+
+
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 async def get_candidate(
     candidate_id: int, 
@@ -30,7 +131,7 @@ async def get_candidate(
     """
     Retrieve a specific candidate by ID.
     """
-    candidate = db.query(Candidate).filter(Candidate.candidate_id == candidate_id).first()
+    candidate = await get_loader(db).load(Candidate, candidate_id)
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return candidate
@@ -81,6 +182,70 @@ async def update_candidate(
         "phone_number": db_candidate.phone_number
     }
 
+@router.post("/{candidate_id}/photo", response_model=StoredFileResponse)
+async def upload_candidate_photo(
+    candidate_id: int,
+    file: UploadFile = File(..., description="Image file"),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a candidate's photo.
+
+    The image is saved in the content store and its key replaces
+    `Candidate.photo`; a thumbnail is generated in the background and served
+    from `GET /files/{key}/thumbnail`.
+    """
+    candidate = db.query(Candidate).filter(Candidate.candidate_id == candidate_id).first()
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Photo must be an image"
+        )
+
+    try:
+        stored = await run_in_threadpool(get_store().put, file.file, file.filename)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+
+    candidate.photo = stored.key
+    db.commit()
+
+    job_type = JOB_TYPES["photo_thumbnail"]
+    await run_in_threadpool(get_queue().enqueue, job_type.name, {"key": stored.key}, job_type.max_attempts)
+
+    return StoredFileResponse(key=stored.key, size=stored.size, url=f"/files/{stored.key}")
+
+@router.post("/{candidate_id}/merge/{duplicate_id}", response_model=CandidateResponse)
+async def merge_candidate(
+    candidate_id: int,
+    duplicate_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Merge a duplicate into a candidate.
+
+    The duplicate's applications are moved to the candidate, its photo is kept
+    if the candidate has none, and the duplicate is deleted.
+    """
+    if candidate_id == duplicate_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A candidate can't be merged into itself"
+        )
+
+    candidate = db.query(Candidate).filter(Candidate.candidate_id == candidate_id).first()
+    duplicate = db.query(Candidate).filter(Candidate.candidate_id == duplicate_id).first()
+    if candidate is None or duplicate is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Candidate with ID {candidate_id if candidate is None else duplicate_id} not found"
+        )
+
+    return merge_candidates(db, candidate, duplicate)
+
 @router.delete("/{candidate_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_candidate(
     candidate_id: int,
@@ -0,0 +1,43 @@
+import json
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+
+from app.database.connection import get_db
+from app.schemas.change import ChangeFeedResponse
+from app.utils.outbox import CHANGES_MAX_LIMIT, read_changes
+
+router = APIRouter()
+
+
+@router.get("", response_class=Response, responses={200: {"model": ChangeFeedResponse}})
+async def get_changes(
+    after: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(1000, ge=1, le=CHANGES_MAX_LIMIT),
+    db: Session = Depends(get_db)
+):
+    """
+    Read the feed of candidate, application and stage changes, oldest first.
+
+    Start with `after=0` and pass `next_after` from each response to the next
+    request; when `has_more` is false, wait a little before polling again.
+    Each change carries the row's columns after it. Changes are kept for
+    OUTBOX_RETENTION_DAYS, and older ones superseded by a later change to the
+    same row are compacted away, so a consumer that falls behind still sees
+    the latest state of every row.
+    """
+    rows, has_more = read_changes(db, after, limit)
+
+    # Payloads are stored as JSON and spliced in as they are
+    parts = [
+        b'{"seq":%d,"entity":%s,"entity_id":%d,"operation":%s,"created_at":%s,"payload":%s}' % (
+            row.seq, json.dumps(row.entity).encode(), row.entity_id, json.dumps(row.operation).encode(),
+            json.dumps(row.created_at.isoformat()).encode(), row.payload.encode()
+        )
+        for row in rows
+    ]
+    next_after = rows[-1].seq if rows else after
+    body = b'{"changes":[%s],"next_after":%d,"has_more":%s}' % (
+        b",".join(parts), next_after, b"true" if has_more else b"false"
+    )
+    return Response(body, media_type="application/json")
@@ -5,6 +5,8 @@ from typing import List, Optional
 from app.database.connection import get_db
 from app.models.experience import Experience
 from app.schemas.experience import ExperienceCreate, ExperienceResponse, ExperienceUpdate
+from app.utils.experience_summary import refresh_summaries
+from app.utils.loader import get_loader, load_existing, parse_ids
 
 router = APIRouter(
     responses={404: {"description": "Experience not found"}}
@@ -15,11 +17,15 @@ router = APIRouter(
 async def get_experiences(
     skip: int = 0, 
     limit: int = 100, 
+    ids: Optional[List[int]] = Depends(parse_ids),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve all experiences with pagination.
+    Retrieve all experiences with pagination, or the experiences listed in
+    `ids` (in that order; IDs that don't exist are left out).
     """
+    if ids is not None:
+        return await load_existing(db, Experience, ids)
     experiences = db.query(Experience).offset(skip).limit(limit).all()
     return experiences
 
@@ -32,7 +38,7 @@ async def get_experience_by_id(
     """
     Retrieve a specific experience by its ID.
     """
-    experience = db.query(Experience).filter(Experience.experience_id == experience_id).first()
+    experience = await get_loader(db).load(Experience, experience_id)
     if not experience:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
@@ -51,6 +57,10 @@ async def create_experience(
     """
     db_experience = Experience(**experience.dict())
     db.add(db_experience)
+    db.flush()
+
+    # Keeps the application's experience summary and this experience's duration current
+    refresh_summaries(db, [db_experience.application_id])
     db.commit()
     db.refresh(db_experience)
     return db_experience
@@ -73,10 +83,14 @@ async def update_experience(
         )
     
     # Update the experience with the provided data
+    previous_application_id = db_experience.application_id
     update_data = experience.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_experience, key, value)
-        
+    db.flush()
+
+    # Moving an experience changes the summary of both applications
+    refresh_summaries(db, {previous_application_id, db_experience.application_id})
     db.commit()
     db.refresh(db_experience)
     return db_experience
@@ -98,6 +112,8 @@ async def delete_experience(
         )
     
     db.delete(db_experience)
+    db.flush()
+    refresh_summaries(db, [db_experience.application_id])
     db.commit()
     return None
 
@@ -0,0 +1,54 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.utils.file_response import file_response
+from app.utils.storage import INLINE_MEDIA_TYPES, get_store, media_type_for
+
+router = APIRouter(
+    responses={404: {"description": "File not found"}}
+)
+
+
+def get_path_or_404(key: str) -> str:
+    store = get_store()
+    if not store.exists(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File {key} not found"
+        )
+    return store.path(key)
+
+
+@router.get("/{key}")
+async def download_file(key: str, request: Request, download: bool = False):
+    """
+    Download a stored file (candidate photo or application attachment).
+
+    Supports `Range` requests for partial downloads and `If-None-Match`
+    revalidation; files never change, so responses are cacheable forever.
+    Only images and PDFs are shown inline; other files are always downloaded.
+    """
+    path = get_path_or_404(key)
+    media_type = media_type_for(key)
+    if media_type not in INLINE_MEDIA_TYPES:
+        return file_response(request, path, "application/octet-stream", etag=key, filename=key)
+    return file_response(request, path, media_type, etag=key, filename=key if download else None)
+
+
+@router.get("/{key}/thumbnail")
+async def download_thumbnail(key: str, request: Request):
+    """
+    Download the thumbnail of a stored image.
+
+    Thumbnails are generated in the background after a photo upload; until
+    then this returns 404.
+    """
+    get_path_or_404(key)
+    path = get_store().thumbnail_path(key)
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Thumbnail for {key} is not available yet"
+        )
+    return file_response(request, path, "image/jpeg", etag=f"{key}-thumbnail")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Request, Response, status
+from sqlalchemy import text
+
+from app.database.connection import engine
+from app.database.migrations import is_schema_current
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def liveness():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def readiness(request: Request, response: Response):
+    """
+    Readiness probe: startup finished, the database answers and its schema is
+    at the latest Alembic revision. Returns 503 until all of these hold.
+    """
+    checks = {"startup": getattr(request.app.state, "ready", False)}
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        checks["database"] = True
+    except Exception:
+        checks["database"] = False
+
+    try:
+        checks["schema"] = checks["database"] and is_schema_current()
+    except Exception:
+        checks["schema"] = False
+
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {"status": "ready" if ready else "not ready", "checks": checks}
@@ -0,0 +1,120 @@
+import os
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.jobs import handlers  # noqa: F401 - registers the built-in job types
+from app.jobs.queue import SUCCEEDED, get_queue
+from app.jobs.registry import JOB_TYPES
+from app.schemas.job import JobCreate, JobResponse, JobTypeInfo
+
+router = APIRouter(
+    responses={404: {"description": "Job not found"}}
+)
+
+
+def to_job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        job_id=job["job_id"],
+        job_type=job["job_type"],
+        status=job["status"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        result=job["result"],
+        error=job["error"],
+        has_result_file=job["result_path"] is not None,
+        created_at=datetime.fromtimestamp(job["created_at"]),
+        updated_at=datetime.fromtimestamp(job["updated_at"])
+    )
+
+
+async def get_job_or_404(job_id: str) -> dict:
+    job = await run_in_threadpool(get_queue().get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    return job
+
+
+@router.get("/types", response_model=List[JobTypeInfo])
+async def get_job_types():
+    """
+    List the job types that can be enqueued.
+    """
+    return [
+        JobTypeInfo(
+            job_type=job_type.name,
+            concurrency=job_type.concurrency,
+            max_attempts=job_type.max_attempts,
+            payload_schema=job_type.payload_model.model_json_schema() if job_type.payload_model else None
+        )
+        for job_type in JOB_TYPES.values()
+        if not job_type.internal
+    ]
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_job(job: JobCreate):
+    """
+    Enqueue a background job and return immediately.
+
+    Poll `GET /jobs/{job_id}` until the status is `succeeded` or `failed`, then
+    download the output from `GET /jobs/{job_id}/result`.
+    """
+    job_type = JOB_TYPES.get(job.job_type)
+    if job_type is None or job_type.internal:
+        # Internal job types are enqueued by other endpoints, which validate what goes in their payload
+        public = [name for name, registered in JOB_TYPES.items() if not registered.internal]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job type '{job.job_type}'. Must be one of: {', '.join(public)}"
+        )
+
+    payload = job.payload
+    if job_type.payload_model is not None:
+        try:
+            payload = job_type.payload_model.model_validate(payload).model_dump(mode="json")
+        except ValidationError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors())
+
+    queue = get_queue()
+    job_id = await run_in_threadpool(queue.enqueue, job_type.name, payload, job_type.max_attempts)
+    return to_job_response(await run_in_threadpool(queue.get, job_id))
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Retrieve the status of a background job.
+    """
+    return to_job_response(await get_job_or_404(job_id))
+
+
+@router.get("/{job_id}/result", response_class=FileResponse)
+async def get_job_result(job_id: str):
+    """
+    Download the file produced by a finished job.
+    """
+    job = await get_job_or_404(job_id)
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} is {job['status']}; the result is available once it has succeeded"
+        )
+    if job["result_path"] is None or not os.path.exists(job["result_path"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} has no result file"
+        )
+
+    return FileResponse(
+        job["result_path"],
+        media_type=job["result_media_type"] or "application/octet-stream",
+        filename=job["result_filename"]
+    )
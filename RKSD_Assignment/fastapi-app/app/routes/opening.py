@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+import math
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.models.candidate import Candidate
 from app.models.opening import Opening
 from app.database.connection import get_db
-from app.schemas.opening import OpeningCreate, OpeningResponse, OpeningUpdate
+from app.utils.loader import get_loader, load_existing, parse_ids
+from app.schemas.opening import (
+    OpeningCreate, OpeningResponse, OpeningUpdate, OpeningRankingResponse, RankedApplicant
+)
 
 router = APIRouter(
     responses={404: {"description": "Opening not found"}}
@@ -16,15 +23,36 @@ async def get_all_openings(
     skip: int = 0, 
     limit: int = 100, 
     location: Optional[str] = None,
+    active_only: bool = False,
+    ids: Optional[List[int]] = Depends(parse_ids),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve all job openings with optional filtering by location.
+    Retrieve all job openings with optional filtering by location, or the
+    openings listed in `ids` (in that order; IDs that don't exist are left out).
+
+    With `active_only`, only openings that are active and still before their
+    deadline are returned, soonest deadline first.
     """
+    now = datetime.now()
+    if ids is not None:
+        openings = await load_existing(db, Opening, ids)
+        return [
+            OpeningResponse.model_validate(opening) for opening in openings
+            if (not location or opening.location == location)
+            and (not active_only or (opening.is_active and opening.deadline >= now))
+        ]
+
     query = db.query(Opening)
     
     if location:
         query = query.filter(Opening.location == location)
+
+    if active_only:
+        # Served by the partial index on active openings; the deadline check also covers
+        # openings that expired since the expiry job last ran
+        query = query.filter(Opening.is_active, Opening.deadline >= now)
+        query = query.order_by(Opening.deadline, Opening.opening_id)
         
     openings = query.offset(skip).limit(limit).all()
     
@@ -36,7 +64,7 @@ async def get_opening_by_id(opening_id: int, db: Session = Depends(get_db)):
     """
     Retrieve a specific job opening by ID.
     """
-    opening = db.query(Opening).filter(Opening.opening_id == opening_id).first()
+    opening = await get_loader(db).load(Opening, opening_id)
     if not opening:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,6 +74,67 @@ async def get_opening_by_id(opening_id: int, db: Session = Depends(get_db)):
     return OpeningResponse.model_validate(opening)
 
 
+@router.get("/{opening_id}/ranking", response_model=OpeningRankingResponse, status_code=status.HTTP_200_OK)
+def rank_applicants(
+    opening_id: int,
+    top_k: int = Query(10, ge=1, le=1000),
+    include_rejected: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Rank the applicants to an opening and return the best `top_k`.
+
+    Every applicant is scored at once from their years of experience against
+    `experience_required`, their rating, how far they are through the role's
+    stages and how many words of the opening's requirements their experience
+    mentions. Rejected applications are left out unless `include_rejected`.
+    """
+    opening = db.query(Opening).filter(Opening.opening_id == opening_id).first()
+    if not opening:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Opening with ID {opening_id} not found"
+        )
+
+    # NumPy is only imported on first use to keep startup fast
+    from app.utils.ranking import load_features, score_applicants, top_k as select_top_k
+
+    features = load_features(db, opening, include_rejected=include_rejected)
+    scores = score_applicants(features, opening.experience_required or 0)
+    best = select_top_k(scores, top_k)
+
+    candidate_ids = [int(features.candidate_ids[index]) for index in best]
+    names = dict(
+        db.query(Candidate.candidate_id, Candidate.candidate_name)
+        .filter(Candidate.candidate_id.in_(candidate_ids))
+        .all()
+    ) if candidate_ids else {}
+
+    applicants = []
+    for rank, index in enumerate(best, start=1):
+        rating = features.ratings[index]
+        applicants.append(RankedApplicant(
+            rank=rank,
+            application_id=int(features.application_ids[index]),
+            candidate_id=int(features.candidate_ids[index]),
+            candidate_name=names.get(int(features.candidate_ids[index])),
+            score=round(float(scores[index]), 4),
+            experience_years=round(float(features.experience_years[index]), 2),
+            rating=None if math.isnan(rating) else int(rating),
+            stage_progress=round(float(features.stage_progress[index]), 4),
+            matched_keywords=[
+                keyword for keyword, hit in zip(features.keywords, features.keyword_hits[index]) if hit
+            ]
+        ))
+
+    return OpeningRankingResponse(
+        opening_id=opening_id,
+        total_applicants=len(scores),
+        keywords=features.keywords,
+        applicants=applicants
+    )
+
+
 @router.post("/", response_model=OpeningResponse, status_code=status.HTTP_201_CREATED)
 async def create_opening(opening_data: OpeningCreate, db: Session = Depends(get_db)):
     """
@@ -5,6 +5,8 @@ from typing import List, Optional
 from app.database.connection import get_db
 from app.models.role import Role
 from app.schemas.role import RoleCreate, RoleResponse, RoleUpdate
+from app.utils import lookups
+from app.utils.loader import get_loader, load_existing, parse_ids
 
 router = APIRouter(
     responses={404: {"description": "Role not found"}}
@@ -12,10 +14,18 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[RoleResponse])
-async def get_all_roles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_all_roles(
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[List[int]] = Depends(parse_ids),
+    db: Session = Depends(get_db)
+):
     """
-    Retrieve all roles with pagination support.
+    Retrieve all roles with pagination support, or the roles listed in `ids`
+    (in that order; IDs that don't exist are left out).
     """
+    if ids is not None:
+        return await load_existing(db, Role, ids)
     roles = db.query(Role).offset(skip).limit(limit).all()
     return roles
 
@@ -25,7 +35,7 @@ async def get_role_by_id(role_id: int, db: Session = Depends(get_db)):
     """
     Retrieve a specific role by its ID.
     """
-    role = db.query(Role).filter(Role.role_id == role_id).first()
+    role = await get_loader(db).load(Role, role_id)
     if role is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
     return role
@@ -44,6 +54,7 @@ async def create_role(role: RoleCreate, db: Session = Depends(get_db)):
     
     db.add(db_role)
     db.commit()
+    lookups.invalidate()
     db.refresh(db_role)
     
     return db_role
@@ -68,6 +79,7 @@ async def update_role(role_id: int, role: RoleUpdate, db: Session = Depends(get_
         db_role.is_active = update_data['is_active']
     
     db.commit()
+    lookups.invalidate()
     db.refresh(db_role)
     
     return db_role
@@ -84,6 +96,7 @@ async def delete_role(role_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_role)
     db.commit()
+    lookups.invalidate()
     
     return None
 
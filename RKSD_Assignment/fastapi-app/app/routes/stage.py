@@ -1,25 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.connection import get_db
 from app.models.stage import Stage
 from app.schemas.stage import StageCreate, StageResponse, StageUpdate
+from app.utils import lookups
+from app.utils.loader import get_loader, parse_ids
 
 router = APIRouter(
     responses={404: {"description": "Stage not found"}}
 )
 
 @router.get("/", response_model=List[StageResponse])
-async def get_all_stages(db: Session = Depends(get_db)):
-    """Retrieve all stages and convert to Pydantic models"""
-    stages = db.query(Stage).all()
+async def get_all_stages(ids: Optional[List[int]] = Depends(parse_ids), db: Session = Depends(get_db)):
+    """Retrieve all stages, or the stages listed in `ids`, and convert to Pydantic models"""
+    stages = lookups.get_all_stages(db)
+    if ids is not None:
+        # Stages are cached, so pick them out of the cache instead of querying
+        stages_by_id = {stage.stage_id: stage for stage in stages}
+        stages = [stages_by_id[stage_id] for stage_id in ids if stage_id in stages_by_id]
     return [StageResponse.model_validate(stage) for stage in stages]  # ✅ Ensures proper data conversion
 
 @router.get("/{stage_id}", response_model=StageResponse)
 async def get_stage_by_id(stage_id: int, db: Session = Depends(get_db)):
     """Retrieve a specific stage by ID"""
-    stage = db.query(Stage).filter(Stage.stage_id == stage_id).first()
+    stage = await get_loader(db).load(Stage, stage_id)
     if stage is None:
         raise HTTPException(status_code=404, detail="Stage not found")
     
@@ -31,6 +37,7 @@ async def create_stage(stage: StageCreate, db: Session = Depends(get_db)):
     db_stage = Stage(**stage.model_dump())  # ✅ Correct use of model_dump() for Pydantic v2
     db.add(db_stage)
     db.commit()
+    lookups.invalidate()
     db.refresh(db_stage)
     
     return StageResponse.model_validate(db_stage)  # ✅ Fixes response validation error
@@ -46,6 +53,7 @@ async def update_stage(stage_id: int, stage: StageUpdate, db: Session = Depends(
         setattr(db_stage, key, value)
 
     db.commit()
+    lookups.invalidate()
     db.refresh(db_stage)
 
     return StageResponse.model_validate(db_stage)  # ✅ Fixes response validation error
@@ -59,4 +67,5 @@ async def delete_stage(stage_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_stage)
     db.commit()
+    lookups.invalidate()
     return None
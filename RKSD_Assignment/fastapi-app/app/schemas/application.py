@@ -26,6 +26,7 @@ class ApplicationUpdate(BaseModel):
 class ApplicationResponse(ApplicationBase):
     """Model for returning application data."""
     application_id: int = Field(..., description="Unique identifier for the application")
+    version: int = Field(1, description="Incremented by every update; sent as the ETag")
 
     class Config:
         from_attributes = True  
@@ -58,15 +59,18 @@ class DetailedApplicationResponse(BaseModel):
     attachments: Optional[str] = Field(None, description="Attachments for the application")
     status: ApplicationStatus = Field(..., description="Status of the application")
     stage: Optional[StageInfo] = Field(None, description="Current stage information")
+    total_experience_years: Optional[float] = Field(None, description="Years of experience, overlapping jobs counted once")
+    latest_position: Optional[str] = Field(None, description="Current or most recent position")
 
     class Config:
         from_attributes = True
 
 class ApplicationsByMonthRequest(BaseModel):
     """Model for requesting applications by month."""
-    year: Optional[int] = Field(None, description="Year to filter applications (optional, if not provided with month, returns all applications)")
-    month: Optional[int] = Field(None, description="Month to filter applications (1-12, optional, if not provided with year, returns all applications)")
+    year: Optional[int] = Field(None, ge=1, le=9999, description="Year to filter applications (optional, if not provided with month, returns all applications)")
+    month: Optional[int] = Field(None, ge=1, le=12, description="Month to filter applications (1-12, optional, if not provided with year, returns all applications)")
     status_filter: Optional[str] = Field("All", description="Filter by status: All, Accepted, Rejected, or Pending")
+    include_archived: bool = Field(True, description="Also return applications moved to the archive")
 
     @property
     def get_status_enum(self) -> Optional[ApplicationStatus]:
@@ -114,6 +118,9 @@ class ApplicationDetailResponse(BaseModel):
     application_date: datetime
     experiences: List[ExperienceDetail]
     role_stages: List[RoleStage]
+    total_experience_years: Optional[float] = None
+    experience_gap_years: Optional[float] = None
+    latest_position: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -121,3 +128,20 @@ class ApplicationDetailResponse(BaseModel):
 class StageUpdateRequest(BaseModel):
     """Model for updating application stage."""
     action: str = Field(..., description="Action to take: 'next' to advance to next stage, 'reject' to reject the application")
+
+class AttachmentSearchResult(BaseModel):
+    """Model for an application whose attachment matches a full-text search."""
+    application_id: int
+    candidate_name: str
+    role_name: str
+    key: str = Field(..., description="Storage key of the matching attachment")
+    snippet: str = Field(..., description="Matching text with the search terms highlighted")
+
+class ApplicationChangeEvent(BaseModel):
+    """Model for an application stage or status change pushed to event stream clients."""
+    application_id: int
+    role_id: int
+    opening_id: int
+    stage_id: int
+    status: ApplicationStatus
+    changed_at: datetime
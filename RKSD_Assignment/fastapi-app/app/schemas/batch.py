@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+# Sub-requests accepted in one batch
+BATCH_MAX_REQUESTS = 50
+
+
+class BatchSubRequest(BaseModel):
+    """Model for one read in a batch."""
+    id: Optional[str] = Field(None, description="Client identifier echoed in the matching response")
+    method: str = Field("GET", description="HTTP method; only GET is supported")
+    path: str = Field(..., description="Path and query string, e.g. '/candidates/1' or '/applications/?limit=10'")
+
+
+class BatchRequest(BaseModel):
+    """Model for a batch of reads executed in one round trip."""
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    """Model for the result of one sub-request, in the order the sub-requests were given."""
+    id: Optional[str] = None
+    status: int = Field(..., description="HTTP status code of the sub-request")
+    body: Any = Field(None, description="Decoded JSON body of the sub-request")
+
+
+class BatchResponse(BaseModel):
+    """Model for the results of a batch."""
+    responses: List[BatchSubResponse]
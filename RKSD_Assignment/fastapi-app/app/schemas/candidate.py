@@ -1,7 +1,16 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import Optional, List
 from datetime import datetime
 
+from app.utils.storage import is_key
+
+
+def check_photo_key(photo: Optional[str]) -> Optional[str]:
+    """Only storage keys are saved as photos; upload the image with POST /candidates/{id}/photo."""
+    if photo is not None and not is_key(photo):
+        raise ValueError("photo must be the key of an uploaded file; upload it with POST /candidates/{id}/photo")
+    return photo
+
 
 class CandidateBase(BaseModel):
     """Base Pydantic model for candidate data validation"""
@@ -13,7 +22,8 @@ class CandidateBase(BaseModel):
 
 class CandidateCreate(CandidateBase):
     """Pydantic model for validating candidate creation data"""
-    pass
+
+    _check_photo = field_validator("photo")(check_photo_key)
 
 
 class CandidateUpdate(BaseModel):
@@ -23,6 +33,8 @@ class CandidateUpdate(BaseModel):
     email: Optional[EmailStr] = None
     phone_number: Optional[str] = None
 
+    _check_photo = field_validator("photo")(check_photo_key)
+
 
 class CandidateResponse(CandidateBase):
     """Pydantic model for candidate response data including database fields"""
@@ -33,3 +45,27 @@ class CandidateResponse(CandidateBase):
     class Config:
         from_attributes = True
 
+
+
+class CandidateImportRejection(BaseModel):
+    """Pydantic model for a spreadsheet row rejected during import"""
+    row: int
+    errors: List[dict]
+
+
+class CandidateImportResponse(BaseModel):
+    """Pydantic model for the result of a candidate spreadsheet import"""
+    processed: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    batches: int = 0
+    rejections: List[CandidateImportRejection] = []
+    job_id: Optional[str] = None
+
+
+class CandidateDuplicateResponse(BaseModel):
+    """Pydantic model for a suggested pair of duplicate candidates"""
+    candidate: CandidateResponse
+    duplicate: CandidateResponse
+    score: float
+    reasons: List[str]
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+
+
+class ChangeEvent(BaseModel):
+    """Model for one change to a candidate, application or stage."""
+    seq: int = Field(..., description="Position in the feed; pass the last one seen as `after`")
+    entity: str = Field(..., description="candidate, application or stage")
+    entity_id: int
+    operation: str = Field(..., description="created, updated or deleted")
+    created_at: datetime
+    payload: Dict[str, Any] = Field(..., description="The row's columns after the change")
+
+
+class ChangeFeedResponse(BaseModel):
+    """Model for a page of the change feed."""
+    changes: List[ChangeEvent]
+    next_after: int = Field(..., description="Value of `after` for the next request")
+    has_more: bool = Field(..., description="Whether more changes can be fetched right away")
@@ -21,6 +21,7 @@ class ExperienceCreate(ExperienceBase):
 class ExperienceResponse(ExperienceBase):
     """Schema for returning experience data"""
     experience_id: int
+    duration: Optional[int] = None  # Whole months; None while the position is current
     created_at: datetime
     updated_at: datetime
 
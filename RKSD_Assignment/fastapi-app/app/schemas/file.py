@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class StoredFileResponse(BaseModel):
+    """Model for a file saved in the content store."""
+    key: str = Field(..., description="Storage key (SHA-256 of the content plus the file extension)")
+    size: int = Field(..., description="Size in bytes")
+    url: str = Field(..., description="Download URL")
+
+
+class AttachmentsResponse(BaseModel):
+    """Model for the attachments of an application."""
+    application_id: int
+    attachments: List[StoredFileResponse]
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, Any, Dict
+
+
+class JobCreate(BaseModel):
+    """Model for enqueueing a background job."""
+    job_type: str = Field(..., description="Type of job to run, e.g. 'application_pdf'")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Job-specific parameters")
+
+
+class JobResponse(BaseModel):
+    """Model for returning the state of a background job."""
+    job_id: str = Field(..., description="Unique identifier for the job")
+    job_type: str = Field(..., description="Type of the job")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    attempts: int = Field(..., description="Number of attempts made so far")
+    max_attempts: int = Field(..., description="Attempts allowed before the job is marked as failed")
+    result: Optional[Dict[str, Any]] = Field(None, description="Summary returned by the job")
+    error: Optional[str] = Field(None, description="Error from the last failed attempt")
+    has_result_file: bool = Field(False, description="Whether a result file can be downloaded")
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobTypeInfo(BaseModel):
+    """Model describing a registered job type."""
+    job_type: str
+    concurrency: int
+    max_attempts: int
+    payload_schema: Optional[Dict[str, Any]] = None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -33,3 +33,21 @@ class OpeningResponse(OpeningBase):
 
     class Config:
         from_attributes = True  # ✅ Ensure compatibility with SQLAlchemy models
+
+
+class RankedApplicant(BaseModel):
+    rank: int
+    application_id: int
+    candidate_id: int
+    candidate_name: Optional[str] = None
+    score: float
+    experience_years: float
+    rating: Optional[int] = None
+    stage_progress: float
+    matched_keywords: List[str]
+
+class OpeningRankingResponse(BaseModel):
+    opening_id: int
+    total_applicants: int
+    keywords: List[str]
+    applicants: List[RankedApplicant]
@@ -0,0 +1,20 @@
+import os
+
+from uvicorn.workers import UvicornWorker
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """
+    Gunicorn worker class running the app on uvloop with the httptools parser.
+
+    Keep-alive, backlog and max-requests are taken from the gunicorn config
+    (see gunicorn_conf.py); only uvicorn-specific settings are set here.
+    """
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "proxy_headers": True,
+        "server_header": False,
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+    }
@@ -0,0 +1,74 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.candidate import Candidate
+from app.models.role import Role
+from app.models.stage import Stage
+from app.utils import lookups
+from app.utils.archive import SOURCES
+
+
+def get_application_report_data(db: Session, application_id: int) -> Optional[dict]:
+    """
+    Collect everything the application PDF shows.
+
+    Returns None if the application doesn't exist, live or archived.
+    """
+    for application_model, experience_model in SOURCES:
+        application = (
+            db.query(
+                application_model.application_id,
+                application_model.candidate_id,
+                Candidate.candidate_name,
+                application_model.role_id,
+                Role.role_name,
+                application_model.current_stage,
+                Stage.stage_name,
+                Stage.stage_sequence,
+                application_model.status,
+                application_model.application_date,
+                application_model.rating
+            )
+            .join(Candidate, application_model.candidate_id == Candidate.candidate_id)
+            .join(Role, application_model.role_id == Role.role_id)
+            .join(Stage, application_model.current_stage == Stage.stage_id)
+            .filter(application_model.application_id == application_id)
+            .first()
+        )
+        if application:
+            break
+
+    if not application:
+        return None
+
+    # Get all experiences for this application
+    experiences = (
+        db.query(experience_model)
+        .filter(experience_model.application_id == application_id)
+        .all()
+    )
+
+    # Get all stages for the role associated with this application
+    role_stages = lookups.get_role_stages(db, application.role_id)
+
+    return {
+        "application_id": application.application_id,
+        "candidate_id": application.candidate_id,
+        "candidate_name": application.candidate_name,
+        "role_id": application.role_id,
+        "role_name": application.role_name,
+        "current_stage_id": application.current_stage,
+        "current_stage_name": application.stage_name,
+        "current_stage_sequence": application.stage_sequence,
+        "status": application.status,
+        "application_date": application.application_date,
+        "rating": application.rating,
+        "experiences": experiences,
+        "role_stages": role_stages
+    }
+
+
+def get_application_pdf_filename(application_data: dict) -> str:
+    """Build the download filename for an application PDF."""
+    return f"application_{application_data['application_id']}_{application_data['candidate_name'].replace(' ', '_')}.pdf"
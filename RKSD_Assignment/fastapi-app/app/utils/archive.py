@@ -0,0 +1,180 @@
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import DateTime, Table, and_, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.application import Application
+from app.models.archived_application import ArchivedApplication
+from app.models.archived_experience import ArchivedExperience
+from app.models.enums import ApplicationStatus
+from app.models.experience import Experience
+from app.utils.outbox import record_changes
+
+# Finalized applications untouched for this long are moved to the archive
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+# Applications moved per transaction
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+FINAL_STATUSES = (ApplicationStatus.ACCEPTED, ApplicationStatus.REJECTED)
+
+# (application, experience) models in the order reads look an application up
+SOURCES = ((Application, Experience), (ArchivedApplication, ArchivedExperience))
+
+
+def _copy(db: Session, source: Table, target: Table, where, values: Optional[Dict[str, datetime]] = None) -> int:
+    """INSERT INTO target SELECT the shared columns FROM source WHERE ..., overriding `values`."""
+    values = values or {}
+    columns = [column.name for column in target.columns if column.name in source.c and column.name not in values]
+    selected = [source.c[name] for name in columns] + [literal(value, DateTime) for value in values.values()]
+    result = db.execute(insert(target).from_select(columns + list(values), select(*selected).where(where)))
+    return result.rowcount
+
+
+def archive_batch(db: Session, application_ids: List[int], now: datetime, cutoff: datetime) -> int:
+    """
+    Move those of `application_ids` that are still finalized and older than
+    `cutoff` to the archive, with their experiences; the caller commits. The
+    change feed sees archived applications as deleted.
+
+    The conditions are checked again because a request may have changed an
+    application since it was selected. The copy runs first, which on SQLite
+    takes the write lock, so the applications it moved can't change before
+    they are deleted; only those are archived.
+    """
+    archivable = and_(
+        Application.application_id.in_(application_ids),
+        Application.status.in_(FINAL_STATUSES),
+        func.coalesce(Application.updated_at, Application.application_date) < cutoff
+    )
+    moved = _copy(db, Application.__table__, ArchivedApplication.__table__, archivable, {"archived_at": now})
+    if not moved:
+        return 0
+    moved_ids = [
+        row[0] for row in db.query(ArchivedApplication.application_id)
+        .filter(ArchivedApplication.application_id.in_(application_ids))
+    ]
+    record_changes(db, Application, moved_ids, "deleted")
+    _copy(db, Experience.__table__, ArchivedExperience.__table__, Experience.application_id.in_(moved_ids))
+    db.execute(
+        delete(Experience).where(Experience.application_id.in_(moved_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(Application).where(archivable, Application.application_id.in_(moved_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return moved
+
+
+def archive_applications(older_than_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                         now: Optional[datetime] = None) -> dict:
+    """
+    Move accepted and rejected applications not updated for `older_than_days`
+    days, with their experiences, to the archive tables.
+
+    Applications are moved `batch_size` at a time in application_id order,
+    each batch in its own transaction, so the archive and the live tables are
+    consistent after every commit and an interrupted run can simply be rerun.
+    On PostgreSQL the batch rows are locked, skipping any that a request is
+    updating at that moment; elsewhere each application's status and age are
+    checked again when it is moved, so one changed in between stays live.
+    """
+    from app.database.connection import SessionLocal
+
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=older_than_days)
+    started = time.monotonic()
+    summary = {"archived": 0, "batches": 0, "seconds": 0.0}
+    db = SessionLocal()
+    try:
+        skip_locked = db.get_bind().dialect.name == "postgresql"
+        last_id = 0
+        while True:
+            query = (
+                db.query(Application.application_id)
+                .filter(
+                    Application.application_id > last_id,
+                    Application.status.in_(FINAL_STATUSES),
+                    func.coalesce(Application.updated_at, Application.application_date) < cutoff
+                )
+                .order_by(Application.application_id)
+                .limit(batch_size)
+            )
+            if skip_locked:
+                query = query.with_for_update(skip_locked=True)
+            ids = [row[0] for row in query]
+            if not ids:
+                break
+            summary["archived"] += archive_batch(db, ids, now, cutoff)
+            summary["batches"] += 1
+            db.commit()
+            last_id = ids[-1]
+    finally:
+        db.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def restore_applications(application_ids: Iterable[int], now: Optional[datetime] = None) -> dict:
+    """
+    Move archived applications and their experiences back to the live tables
+    in one transaction. Their updated_at is set to `now`, so they aren't
+    archived again until they have been left alone for the archive period.
+    """
+    from app.database.connection import SessionLocal
+
+    now = now or datetime.now()
+    db = SessionLocal()
+    try:
+        requested = sorted(set(application_ids))
+        ids = [
+            row[0] for row in db.query(ArchivedApplication.application_id)
+            .filter(ArchivedApplication.application_id.in_(requested))
+        ]
+        if ids:
+            _copy(
+                db, ArchivedApplication.__table__, Application.__table__,
+                ArchivedApplication.application_id.in_(ids), {"updated_at": now}
+            )
+            # To the change feed a restored application is created again
+            record_changes(db, Application, ids, "created")
+            _copy(db, ArchivedExperience.__table__, Experience.__table__, ArchivedExperience.application_id.in_(ids))
+            db.execute(
+                delete(ArchivedExperience).where(ArchivedExperience.application_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                delete(ArchivedApplication).where(ArchivedApplication.application_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    return {"restored": ids, "not_archived": sorted(set(requested) - set(ids))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive finalized applications, or restore archived ones")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="Move old accepted and rejected applications to the archive")
+    archive.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS,
+                         help="Archive applications not updated for this many days")
+    archive.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    restore = commands.add_parser("restore", help="Move archived applications back to the live tables")
+    restore.add_argument("application_ids", type=int, nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "archive":
+        print(archive_applications(older_than_days=args.days, batch_size=args.batch_size))
+    else:
+        print(restore_applications(args.application_ids))
+
+
+if __name__ == "__main__":
+    main()
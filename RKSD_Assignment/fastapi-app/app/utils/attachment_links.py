@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, insert, inspect
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.application import Application
+from app.models.application_attachment import ApplicationAttachment
+from app.utils.storage import parse_keys
+
+
+def link_rows(application_id: int, attachments: Optional[str]) -> List[dict]:
+    """application_attachments rows for the storage keys in an attachments list (legacy URLs are skipped)."""
+    rows = {}
+    for key in parse_keys(attachments):
+        rows.setdefault(key[:64], {"content_hash": key[:64], "application_id": application_id, "key": key})
+    return list(rows.values())
+
+
+def replace_links(db: Session, attachments: Iterable) -> None:
+    """Replace the links of the given (application_id, attachments) pairs; the caller commits."""
+    attachments = list(attachments)
+    connection = db.connection()
+    connection.execute(
+        delete(ApplicationAttachment.__table__)
+        .where(ApplicationAttachment.application_id.in_([application_id for application_id, _ in attachments]))
+    )
+    rows = [row for application_id, value in attachments for row in link_rows(application_id, value)]
+    if rows:
+        connection.execute(insert(ApplicationAttachment.__table__), rows)
+
+
+def _sync_flush(session: Session, flush_context):
+    """
+    Rewrite the attachment links of every application the flush inserted,
+    deleted or whose attachments changed, on the flush's connection so they
+    commit or roll back with it.
+    """
+    changed: Dict[int, Optional[str]] = {}
+    for instance in session.new:
+        if isinstance(instance, Application):
+            changed[instance.application_id] = instance.attachments
+    for instance in session.dirty:
+        if isinstance(instance, Application) and inspect(instance).attrs.attachments.history.has_changes():
+            changed[instance.application_id] = instance.attachments
+    for instance in session.deleted:
+        if isinstance(instance, Application):
+            changed[instance.application_id] = None
+    if changed:
+        replace_links(session, changed.items())
+
+
+# The application routes import this module, which registers the listener
+event.listen(SessionLocal, "after_flush", _sync_flush)
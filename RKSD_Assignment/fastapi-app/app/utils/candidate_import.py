@@ -0,0 +1,181 @@
+import csv
+import io
+import os
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.database.connection import SessionLocal, insert_for
+from app.models.candidate import Candidate
+from app.schemas.candidate import CandidateCreate
+from app.utils.outbox import record_changes
+
+# Rows validated, checked for duplicates and inserted together
+IMPORT_BATCH_SIZE = int(os.getenv("CANDIDATE_IMPORT_BATCH_SIZE", "1000"))
+
+# Rejected rows returned in the summary; the rest are only counted
+MAX_REPORTED_REJECTIONS = int(os.getenv("CANDIDATE_IMPORT_MAX_REPORTED_REJECTIONS", "100"))
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[Dict[str, str]]:
+    """Read a CSV file row by row; the first line holds the column names."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Don't let the wrapper close the underlying upload
+        text.detach()
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[Dict[str, str]]:
+    """
+    Read the first sheet of an XLSX workbook row by row; the first row holds the
+    column names. Uses openpyxl's read-only mode, which streams the sheet XML.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, [])]
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            yield {
+                column: (str(value) if value is not None else None)
+                for column, value in zip(header, values) if column
+            }
+    finally:
+        workbook.close()
+
+
+def iter_rows(file: BinaryIO, filename: str) -> Iterator[Dict[str, str]]:
+    """Pick the reader for a spreadsheet based on its file extension."""
+    if filename.lower().endswith(".xlsx"):
+        return iter_xlsx_rows(file)
+    return iter_csv_rows(file)
+
+
+def _clean(row: Dict[str, Optional[str]]) -> dict:
+    # Blank cells become None so optional fields validate
+    return {
+        key.strip(): (value.strip() or None) if isinstance(value, str) else value
+        for key, value in row.items() if key
+    }
+
+
+def import_candidates(file: BinaryIO, filename: str, batch_size: int = IMPORT_BATCH_SIZE,
+                      on_progress: Optional[Callable[[dict], None]] = None,
+                      on_rejected: Optional[Callable[[int, dict, list], None]] = None) -> dict:
+    """
+    Import candidates from a CSV or XLSX file.
+
+    Rows are read incrementally and handled in batches: each batch is
+    validated against CandidateCreate, checked against existing candidates
+    with one query per unique column, and inserted with a single executemany
+    that skips rows clashing with candidates added meanwhile.
+    Every batch is committed on its own, so a failure part way through keeps
+    the batches already imported.
+
+    `on_progress` is called with the running summary after each batch and
+    `on_rejected(row_number, row, errors)` for every rejected row.
+    """
+    summary = {"processed": 0, "inserted": 0, "rejected": 0, "batches": 0, "rejections": []}
+
+    # Emails and phone numbers seen earlier in this file
+    seen_emails: Set[str] = set()
+    seen_phones: Set[str] = set()
+
+    def reject(row_number: int, row: dict, errors: list):
+        summary["rejected"] += 1
+        if len(summary["rejections"]) < MAX_REPORTED_REJECTIONS:
+            summary["rejections"].append({"row": row_number, "errors": errors})
+        if on_rejected:
+            on_rejected(row_number, row, errors)
+
+    db = SessionLocal()
+    try:
+        batch: List[Tuple[int, dict]] = []
+        # Row 1 is the header, so data starts at row 2
+        for row_number, row in enumerate(iter_rows(file, filename), start=2):
+            batch.append((row_number, _clean(row)))
+            if len(batch) >= batch_size:
+                _import_batch(db, batch, seen_emails, seen_phones, summary, reject)
+                batch = []
+                if on_progress:
+                    on_progress(summary)
+        if batch:
+            _import_batch(db, batch, seen_emails, seen_phones, summary, reject)
+            if on_progress:
+                on_progress(summary)
+    finally:
+        db.close()
+
+    return summary
+
+
+def _import_batch(db, batch: List[Tuple[int, dict]], seen_emails: Set[str], seen_phones: Set[str],
+                  summary: dict, reject: Callable[[int, dict, list], None]):
+    valid: List[Tuple[int, dict, CandidateCreate]] = []
+    for row_number, row in batch:
+        try:
+            valid.append((row_number, row, CandidateCreate.model_validate(row)))
+        except ValidationError as exc:
+            reject(row_number, row, [
+                {"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                for error in exc.errors()
+            ])
+
+    # One query per unique column for the whole batch
+    emails = {candidate.email for _, _, candidate in valid}
+    phones = {candidate.phone_number for _, _, candidate in valid}
+    existing_emails = {
+        email for (email,) in db.query(Candidate.email).filter(Candidate.email.in_(emails))
+    } if emails else set()
+    existing_phones = {
+        phone for (phone,) in db.query(Candidate.phone_number).filter(Candidate.phone_number.in_(phones))
+    } if phones else set()
+
+    to_insert: List[Tuple[int, dict, dict]] = []
+    for row_number, row, candidate in valid:
+        errors = []
+        if candidate.email in existing_emails:
+            errors.append({"field": "email", "message": "A candidate with this email already exists"})
+        elif candidate.email in seen_emails:
+            errors.append({"field": "email", "message": "Duplicate email earlier in the file"})
+        if candidate.phone_number in existing_phones:
+            errors.append({"field": "phone_number", "message": "A candidate with this phone number already exists"})
+        elif candidate.phone_number in seen_phones:
+            errors.append({"field": "phone_number", "message": "Duplicate phone number earlier in the file"})
+
+        if errors:
+            reject(row_number, row, errors)
+            continue
+
+        seen_emails.add(candidate.email)
+        seen_phones.add(candidate.phone_number)
+        to_insert.append((row_number, row, candidate.model_dump()))
+
+    inserted: Dict[str, int] = {}
+    if to_insert:
+        # A candidate added meanwhile with the same email or phone number skips the row
+        # instead of failing the batch; only the rows inserted are returned
+        statement = (
+            insert_for(db, Candidate).on_conflict_do_nothing()
+            .returning(Candidate.email, Candidate.candidate_id)
+        )
+        inserted = dict(db.execute(statement, [row for _, _, row in to_insert]).all())
+        record_changes(db, Candidate, list(inserted.values()), "created")
+        db.commit()
+
+    for row_number, row, candidate in to_insert:
+        if candidate["email"] not in inserted:
+            reject(row_number, row, [
+                {"field": "email", "message": "A candidate with this email or phone number was added meanwhile"}
+            ])
+
+    summary["processed"] += len(batch)
+    summary["inserted"] += len(inserted)
+    summary["batches"] += 1
@@ -0,0 +1,291 @@
+import argparse
+import difflib
+import itertools
+import os
+import re
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Pairs scoring below this are not suggested
+DEDUP_MIN_SCORE = float(os.getenv("DEDUP_MIN_SCORE", "0.8"))
+# Blocks larger than this (very common names, placeholder phone numbers) are only
+# compared within a sliding window over the sorted names instead of all pairs
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", "100"))
+DEDUP_WINDOW = int(os.getenv("DEDUP_WINDOW", "10"))
+# Suggestions written per INSERT
+DEDUP_BATCH_SIZE = int(os.getenv("DEDUP_BATCH_SIZE", "5000"))
+# Trailing digits compared, so "+91 98765-43210" and "098765 43210" match
+PHONE_DIGITS = int(os.getenv("DEDUP_PHONE_DIGITS", "10"))
+MIN_PHONE_DIGITS = 7
+
+# Mail providers that ignore dots in the local part
+DOTLESS_DOMAINS = {"gmail.com": "gmail.com", "googlemail.com": "gmail.com"}
+
+# Score = base + weight * name similarity. A shared email or phone needs a
+# similar name to reach the default threshold (relatives share phones); a
+# similar name alone never does, but can be listed with a lower min_score.
+CONTACT_MATCH_BASE, CONTACT_MATCH_WEIGHT = 0.4, 0.5
+NAME_ONLY_WEIGHT = 0.75
+NAME_MATCH_SIMILARITY = 0.85
+
+try:
+    from rapidfuzz.fuzz import ratio as _ratio
+
+    def name_similarity(a: str, b: str) -> float:
+        return _ratio(a, b) / 100
+except ImportError:
+    def name_similarity(a: str, b: str) -> float:
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+class CandidateRecord(NamedTuple):
+    """A candidate's normalized identity fields."""
+    candidate_id: int
+    name: str
+    email: str
+    phone: str
+
+
+class DuplicatePair(NamedTuple):
+    candidate_id: int
+    duplicate_id: int
+    score: float
+    reasons: List[str]
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """Lower-case an address and drop "+tags" (and dots for Gmail)."""
+    local, _, domain = (email or "").strip().lower().rpartition("@")
+    if not local:
+        return ""
+    local = local.split("+", 1)[0]
+    if domain in DOTLESS_DOMAINS:
+        local = local.replace(".", "")
+        domain = DOTLESS_DOMAINS[domain]
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Keep the last PHONE_DIGITS digits, dropping punctuation and country/trunk prefixes."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-PHONE_DIGITS:]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Strip accents and punctuation, lower-case and sort the name's words."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(sorted(re.findall(r"[a-z0-9]+", ascii_name.lower())))
+
+
+def make_record(candidate_id: int, name: str, email: str, phone: str) -> CandidateRecord:
+    return CandidateRecord(candidate_id, normalize_name(name), normalize_email(email), normalize_phone(phone))
+
+
+def blocking_keys(record: CandidateRecord) -> List[str]:
+    """
+    Keys under which a record is grouped; only records sharing a key are compared.
+
+    Besides the normalized email and phone, each name contributes
+    "<word>:<initial of another word>" for its first and last (sorted) words,
+    so one misspelt word or a swapped first and last name still shares a block.
+    """
+    keys = []
+    if record.email:
+        keys.append("e:" + record.email)
+    if len(record.phone) >= MIN_PHONE_DIGITS:
+        keys.append("p:" + record.phone)
+    words = record.name.split()
+    if len(words) == 1:
+        keys.append("n:" + words[0])
+    elif words:
+        first, last = words[0], words[-1]
+        keys.append(f"n:{first}:{last[0]}")
+        keys.append(f"n:{last}:{first[0]}")
+    return keys
+
+
+def score_pair(a: CandidateRecord, b: CandidateRecord, min_score: float = DEDUP_MIN_SCORE) -> Optional[DuplicatePair]:
+    """Score two records; returns None when the pair scores below `min_score`."""
+    reasons = []
+    if a.email and a.email == b.email:
+        reasons.append("email")
+    if len(a.phone) >= MIN_PHONE_DIGITS and a.phone == b.phone:
+        reasons.append("phone")
+
+    if len(reasons) == 2:
+        score = 1.0
+    else:
+        base, weight = (CONTACT_MATCH_BASE, CONTACT_MATCH_WEIGHT) if reasons else (0.0, NAME_ONLY_WEIGHT)
+        # The length ratio bounds the similarity, which rules most pairs out cheaply
+        total_length = len(a.name) + len(b.name)
+        upper_bound = 2 * min(len(a.name), len(b.name)) / total_length if total_length else 1.0
+        if base + weight * upper_bound < min_score:
+            return None
+        similarity = name_similarity(a.name, b.name)
+        score = base + weight * similarity
+        if score < min_score:
+            return None
+        if similarity >= NAME_MATCH_SIMILARITY:
+            reasons.append("name")
+
+    first, second = sorted((a.candidate_id, b.candidate_id))
+    return DuplicatePair(first, second, round(score, 4), reasons)
+
+
+def _block_pairs(members: List[int], records: List[CandidateRecord]) -> Iterable[Tuple[int, int]]:
+    if len(members) <= DEDUP_MAX_BLOCK_SIZE:
+        return itertools.combinations(members, 2)
+    # Sorted neighbourhood: compare each record with the next few names only
+    ordered = sorted(members, key=lambda index: records[index].name)
+    return (
+        (index, other)
+        for position, index in enumerate(ordered)
+        for other in ordered[position + 1:position + DEDUP_WINDOW]
+    )
+
+
+def find_duplicates(records: List[CandidateRecord], min_score: float = DEDUP_MIN_SCORE,
+                    stats: Optional[dict] = None) -> Iterator[DuplicatePair]:
+    """
+    Find likely duplicate pairs among `records`.
+
+    Records are grouped by their blocking keys and only pairs within a block
+    are scored, so the work grows with the block sizes rather than with the
+    square of the number of candidates. A pair sharing several keys is scored
+    once, in the first block it shares.
+    """
+    stats = stats if stats is not None else {}
+    # A key maps to a single index until a second record shares it
+    blocks: Dict[str, Union[int, List[int]]] = {}
+    keys_by_record = []
+    for index, record in enumerate(records):
+        keys = blocking_keys(record)
+        keys_by_record.append(keys)
+        for key in keys:
+            members = blocks.get(key)
+            if members is None:
+                blocks[key] = index
+            elif isinstance(members, int):
+                blocks[key] = [members, index]
+            else:
+                members.append(index)
+
+    # Pairs that only share a name block can't reach a score above NAME_ONLY_WEIGHT
+    skip_name_blocks = min_score > NAME_ONLY_WEIGHT
+    stats.setdefault("blocks", 0)
+    stats.setdefault("comparisons", 0)
+    for key, members in blocks.items():
+        if isinstance(members, int) or (skip_name_blocks and key.startswith("n:")):
+            continue
+        stats["blocks"] += 1
+        for i, j in _block_pairs(members, records):
+            if next(k for k in keys_by_record[i] if k in keys_by_record[j]) != key:
+                continue
+            stats["comparisons"] += 1
+            pair = score_pair(records[i], records[j], min_score)
+            if pair is not None:
+                yield pair
+
+
+def load_records(db, batch_size: int = DEDUP_BATCH_SIZE) -> List[CandidateRecord]:
+    """Read and normalize every candidate."""
+    from app.models.candidate import Candidate
+
+    query = (
+        db.query(Candidate.candidate_id, Candidate.candidate_name, Candidate.email, Candidate.phone_number)
+        .execution_options(yield_per=batch_size)
+    )
+    return [make_record(*row) for row in query]
+
+
+def run_dedup(min_score: float = DEDUP_MIN_SCORE,
+              on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Rebuild the candidate_duplicates suggestions from a full pass over all candidates.
+
+    The old suggestions are replaced in the same transaction, so readers keep
+    seeing them until the new ones are committed.
+    """
+    from sqlalchemy import insert
+
+    from app.database.connection import SessionLocal
+    from app.models.candidate_duplicate import CandidateDuplicate
+
+    started = time.monotonic()
+    summary = {"candidates": 0, "blocks": 0, "comparisons": 0, "pairs": 0, "seconds": 0.0}
+
+    db = SessionLocal()
+    try:
+        records = load_records(db)
+        summary["candidates"] = len(records)
+        db.query(CandidateDuplicate).delete(synchronize_session=False)
+
+        batch = []
+        for pair in find_duplicates(records, min_score, stats=summary):
+            batch.append({
+                "candidate_id": pair.candidate_id,
+                "duplicate_id": pair.duplicate_id,
+                "score": pair.score,
+                "reasons": ",".join(pair.reasons),
+            })
+            if len(batch) >= DEDUP_BATCH_SIZE:
+                db.execute(insert(CandidateDuplicate), batch)
+                summary["pairs"] += len(batch)
+                batch = []
+                if on_progress:
+                    on_progress(summary)
+        if batch:
+            db.execute(insert(CandidateDuplicate), batch)
+            summary["pairs"] += len(batch)
+        db.commit()
+    finally:
+        db.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def merge_candidates(db, candidate, duplicate):
+    """
+    Merge `duplicate` into `candidate`: its applications (live and archived)
+    move over, its photo is kept if `candidate` has none, and the duplicate is
+    deleted.
+    """
+    from app.models.application import Application
+    from app.models.archived_application import ArchivedApplication
+    from app.models.candidate_duplicate import CandidateDuplicate
+    from app.utils.outbox import record_changes
+
+    moved = [
+        application_id for (application_id,) in
+        db.query(Application.application_id).filter(Application.candidate_id == duplicate.candidate_id)
+    ]
+    for model in (Application, ArchivedApplication):
+        db.query(model).filter(model.candidate_id == duplicate.candidate_id).update(
+            {model.candidate_id: candidate.candidate_id, model.version: model.version + 1}, synchronize_session=False
+        )
+    db.query(CandidateDuplicate).filter(
+        (CandidateDuplicate.candidate_id == duplicate.candidate_id)
+        | (CandidateDuplicate.duplicate_id == duplicate.candidate_id)
+    ).delete(synchronize_session=False)
+    record_changes(db, Application, moved)
+
+    if not candidate.photo and duplicate.photo:
+        candidate.photo = duplicate.photo
+    db.delete(duplicate)
+    db.commit()
+    db.refresh(candidate)
+    return candidate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find likely duplicate candidates")
+    parser.add_argument("--min-score", type=float, default=DEDUP_MIN_SCORE)
+    args = parser.parse_args()
+    print(run_dedup(min_score=args.min_score))
+
+
+if __name__ == "__main__":
+    main()
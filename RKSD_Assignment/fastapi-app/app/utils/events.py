@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Set, Tuple
+
+import anyio
+from sqlalchemy import func, select
+
+from app.database.connection import SessionLocal
+from app.models.outbox_event import OutboxEvent
+from app.schemas.application import ApplicationChangeEvent
+from app.utils.outbox import read_changes
+
+logger = logging.getLogger(__name__)
+
+# Events kept for clients that reconnect with Last-Event-ID
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# Undelivered events per client before it is told to resync instead
+EVENT_MAX_PENDING = int(os.getenv("EVENT_MAX_PENDING", "256"))
+# A comment is sent after this many idle seconds so proxies keep the connection open
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+# Reconnection delay suggested to clients, in milliseconds
+EVENT_RETRY_MS = 3000
+# How often each worker reads new changes from the outbox to publish them, in seconds
+EVENT_POLL_SECONDS = float(os.getenv("EVENT_POLL_SECONDS", "0.5"))
+# Outbox events read per query by the relay
+EVENT_POLL_BATCH_SIZE = 1000
+# Applications whose last published stage and status the relay remembers
+EVENT_STATE_CACHE_SIZE = 10000
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+
+
+class _Event:
+    __slots__ = ("event_id", "role_id", "opening_id", "frame")
+
+    def __init__(self, event_id: int, role_id: int, opening_id: int, frame: bytes):
+        self.event_id = event_id
+        self.role_id = role_id
+        self.opening_id = opening_id
+        self.frame = frame
+
+
+class Subscription:
+    """
+    One connected client: its filters and a bounded queue of encoded frames.
+
+    A client that falls more than EVENT_MAX_PENDING events behind stops
+    receiving events and is sent a single resync frame, after which it should
+    reload its lists.
+    """
+
+    def __init__(self, bus: "EventBus", role_id: Optional[int], opening_id: Optional[int], after: int = 0):
+        self.bus = bus
+        self.role_id = role_id
+        self.opening_id = opening_id
+        # Events up to this ID were already seen, e.g. through another worker
+        self.after = after
+        self.loop = asyncio.get_running_loop()
+        self.lagged = False
+        self._frames: Deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def matches(self, event: _Event) -> bool:
+        return (
+            event.event_id > self.after
+            and (self.role_id is None or event.role_id == self.role_id)
+            and (self.opening_id is None or event.opening_id == self.opening_id)
+        )
+
+    def deliver(self, frame: bytes):
+        """Queue a frame; must run on the subscription's event loop."""
+        if self.lagged:
+            return
+        if len(self._frames) >= EVENT_MAX_PENDING:
+            self.lagged = True
+            self._frames.clear()
+            self._frames.append(RESYNC_FRAME)
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+
+    async def next_frames(self, timeout: float) -> List[bytes]:
+        """Wait up to `timeout` seconds for frames; returns all that are queued (possibly none)."""
+        if not self._frames:
+            self._ready.clear()
+            with anyio.move_on_after(timeout):
+                await self._ready.wait()
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process pub/sub for application changes, fed by OutboxRelay.
+
+    Event IDs are outbox sequence numbers, the same in every worker. Each
+    event is encoded as an SSE frame once, when it is published, and the
+    same bytes are handed to every matching subscriber. Publishing never
+    blocks: frames for subscribers on another thread's loop are handed over
+    with call_soon_threadsafe.
+    """
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._history: Deque[_Event] = deque(maxlen=history_size)
+        self._last_id = 0
+        # Every event after this ID is in the history
+        self._history_start = 0
+
+    def reset(self, last_id: int):
+        """Start the history after event `last_id`; earlier events can't be replayed."""
+        with self._lock:
+            self._history.clear()
+            self._last_id = self._history_start = last_id
+
+    def subscribe(self, role_id: Optional[int] = None, opening_id: Optional[int] = None,
+                  last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Register a subscriber on the running event loop. With `last_event_id`,
+        matching events published after it are queued first; if they are no
+        longer in the history the client is sent a resync frame.
+        """
+        subscription = Subscription(self, role_id, opening_id, last_event_id or 0)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is not None and last_event_id < self._last_id:
+                if last_event_id < self._history_start:
+                    subscription.deliver(RESYNC_FRAME)
+                    subscription.lagged = True
+                else:
+                    for event in self._history:
+                        if subscription.matches(event):
+                            subscription.deliver(event.frame)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_id: int, event: ApplicationChangeEvent):
+        """Send an event to every matching subscriber."""
+        with self._lock:
+            self._last_id = event_id
+            data = event.model_dump_json().encode()
+            frame = b"id: %d\nevent: application\ndata: %s\n\n" % (event_id, data)
+            published = _Event(event_id, event.role_id, event.opening_id, frame)
+            if len(self._history) == self._history.maxlen:
+                self._history_start = self._history[0].event_id
+            self._history.append(published)
+            subscribers = [subscription for subscription in self._subscribers if subscription.matches(published)]
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for subscription in subscribers:
+            if subscription.loop is running_loop:
+                subscription.deliver(frame)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, frame)
+                except RuntimeError:
+                    # The subscriber's loop has been closed
+                    self.unsubscribe(subscription)
+
+    def advance(self, event_id: int):
+        """Record that the outbox has been read up to `event_id` (with nothing to publish)."""
+        with self._lock:
+            self._last_id = max(self._last_id, event_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "last_event_id": self._last_id,
+                "history": len(self._history),
+            }
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Return the process-wide event bus, creating it on first use."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = EventBus()
+    return _bus
+
+
+def _state(values: dict) -> Tuple[object, object]:
+    """The fields whose change is published: current stage and status."""
+    return values.get("current_stage"), values.get("status")
+
+
+class OutboxRelay:
+    """
+    A thread that publishes application stage and status changes from the
+    outbox to this worker's event bus.
+
+    Every worker reads the same outbox, so a change committed through any
+    worker reaches the event stream clients of all of them, and the event ID
+    is the outbox sequence number everywhere: a client can reconnect to
+    another worker with its Last-Event-ID. An application event is published
+    when it was created, or when its stage or status differs from the
+    previous event for it.
+    """
+
+    def __init__(self, bus: Optional[EventBus] = None, poll_interval: float = EVENT_POLL_SECONDS):
+        self.bus = bus or get_event_bus()
+        self.poll_interval = poll_interval
+        self.after = 0
+        self._states: "OrderedDict[int, Tuple[object, object]]" = OrderedDict()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Publish changes committed from now on."""
+        db = SessionLocal()
+        try:
+            self.after = db.execute(select(func.max(OutboxEvent.seq))).scalar() or 0
+        finally:
+            db.close()
+        self.bus.reset(self.after)
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        """Read the outbox now rather than at the next poll (after this worker committed a change)."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Failed to publish changes from the outbox")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def poll(self) -> int:
+        """Publish the changes committed since the last poll; returns the number published."""
+        published = 0
+        db = SessionLocal()
+        try:
+            has_more = True
+            while has_more:
+                rows, has_more = read_changes(db, self.after, EVENT_POLL_BATCH_SIZE)
+                for row in rows:
+                    if row.entity == "application" and row.operation != "deleted":
+                        published += self._publish(db, row)
+                    self.after = row.seq
+                self.bus.advance(self.after)
+        finally:
+            db.close()
+        return published
+
+    def _publish(self, db, row) -> int:
+        values = json.loads(row.payload)
+        state = _state(values)
+        previous = self._states.pop(row.entity_id, None)
+        if previous is None and row.operation != "created":
+            before = db.execute(
+                select(OutboxEvent.payload)
+                .where(OutboxEvent.entity == "application", OutboxEvent.entity_id == row.entity_id,
+                       OutboxEvent.seq < row.seq)
+                .order_by(OutboxEvent.seq.desc())
+                .limit(1)
+            ).scalar()
+            previous = _state(json.loads(before)) if before is not None else None
+        self._states[row.entity_id] = state
+        if len(self._states) > EVENT_STATE_CACHE_SIZE:
+            self._states.popitem(last=False)
+        if previous == state:
+            return 0
+
+        self.bus.publish(row.seq, ApplicationChangeEvent(
+            application_id=row.entity_id,
+            role_id=values["role_id"],
+            opening_id=values["opening_id"],
+            stage_id=values["current_stage"],
+            status=values["status"],
+            changed_at=row.created_at,
+        ))
+        return 1
+
+
+_relay: Optional[OutboxRelay] = None
+_relay_lock = threading.Lock()
+
+
+def get_outbox_relay() -> OutboxRelay:
+    """Return the process-wide outbox relay, creating it on first use (main.py starts it)."""
+    global _relay
+    if _relay is None:
+        with _relay_lock:
+            if _relay is None:
+                _relay = OutboxRelay()
+    return _relay
+
+
+async def stream_events(subscription: Subscription):
+    """Yield SSE frames for a subscription until the client disconnects."""
+    try:
+        yield b"retry: %d\n\n" % EVENT_RETRY_MS
+        while True:
+            frames = await subscription.next_frames(EVENT_KEEPALIVE_SECONDS)
+            if not frames:
+                yield KEEPALIVE_FRAME
+                continue
+            yield b"".join(frames)
+            if subscription.lagged:
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,172 @@
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.models.application import Application
+from app.models.experience import Experience
+from app.utils.outbox import record_changes
+
+# Applications summarized per transaction by the backfill
+BACKFILL_BATCH_SIZE = int(os.getenv("EXPERIENCE_BACKFILL_BATCH_SIZE", "1000"))
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+class ExperienceSummary(NamedTuple):
+    total_years: float
+    gap_years: float
+    latest_position: Optional[str]
+    has_current_position: bool
+
+
+def months_between(start: datetime, end: datetime) -> int:
+    """Whole months from `start` to `end` (0 if `end` is earlier)."""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day:
+        months -= 1
+    return max(months, 0)
+
+
+def summarize(experiences: Iterable[Tuple[datetime, Optional[datetime], str]],
+              now: datetime) -> ExperienceSummary:
+    """
+    Summarize (start_date, end_date, position) rows with a sort-and-sweep.
+
+    Intervals are sorted by start; an interval that starts before the current
+    run ends extends it, otherwise the run is closed and the space between the
+    two counts as a gap. A missing end date means the position is current and
+    runs until `now`.
+    """
+    # An end date before the start counts as an empty interval
+    intervals = sorted(
+        (start, max(end or now, start), position, end is None)
+        for start, end, position in experiences
+    )
+    if not intervals:
+        return ExperienceSummary(0.0, 0.0, None, False)
+
+    total = gap = 0.0
+    run_start, run_end = intervals[0][0], intervals[0][1]
+    for start, end, _, _ in intervals[1:]:
+        if start <= run_end:
+            run_end = max(run_end, end)
+            continue
+        total += (run_end - run_start).total_seconds()
+        gap += (start - run_end).total_seconds()
+        run_start, run_end = start, end
+    total += (run_end - run_start).total_seconds()
+
+    # Current positions first, then the one that ended (or started) last
+    latest = max(intervals, key=lambda interval: (interval[3], interval[1], interval[0]))
+    return ExperienceSummary(
+        round(total / SECONDS_PER_YEAR, 4),
+        round(gap / SECONDS_PER_YEAR, 4),
+        latest[2],
+        any(interval[3] for interval in intervals)
+    )
+
+
+def current_total_years(total_years: Optional[float], has_current_position: Optional[bool],
+                        summary_at: Optional[datetime], now: Optional[datetime] = None) -> Optional[float]:
+    """Total years from a stored summary, counting a current position up to `now`."""
+    if total_years is None:
+        return None
+    if has_current_position and summary_at is not None:
+        elapsed = ((now or datetime.now()) - summary_at).total_seconds()
+        total_years += max(elapsed, 0.0) / SECONDS_PER_YEAR
+    return round(total_years, 2)
+
+
+def refresh_summaries(db: Session, application_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """
+    Recompute the experience summary of the given applications, and the
+    duration of their experiences.
+
+    Reads the experiences with one query and writes the changes with one
+    executemany UPDATE per table; the caller commits. Returns the number of
+    applications.
+    """
+    application_ids = sorted(set(application_ids))
+    if not application_ids:
+        return 0
+    now = now or datetime.now()
+
+    experiences: Dict[int, List[Tuple[datetime, Optional[datetime], str]]] = {
+        application_id: [] for application_id in application_ids
+    }
+    durations = []
+    rows = db.query(
+        Experience.experience_id, Experience.application_id, Experience.start_date,
+        Experience.end_date, Experience.position, Experience.duration
+    ).filter(Experience.application_id.in_(application_ids))
+    for experience_id, application_id, start, end, position, duration in rows:
+        experiences[application_id].append((start, end, position))
+        months = months_between(start, end) if end else None
+        if months != duration:
+            durations.append({"experience_id": experience_id, "duration": months})
+
+    summaries = []
+    for application_id, application_experiences in experiences.items():
+        summary = summarize(application_experiences, now)
+        summaries.append({
+            "summary_application_id": application_id,
+            "total_experience_years": summary.total_years,
+            "experience_gap_years": summary.gap_years,
+            "latest_position": summary.latest_position,
+            "has_current_position": summary.has_current_position,
+            "experience_summary_at": now,
+        })
+    # A Core UPDATE: the summary is derived data, so it doesn't bump the application's version
+    applications = Application.__table__
+    db.execute(
+        update(applications).where(applications.c.application_id == bindparam("summary_application_id")),
+        summaries
+    )
+    record_changes(db, Application, application_ids)
+    if durations:
+        db.execute(update(Experience), durations)
+    return len(summaries)
+
+
+def backfill(batch_size: int = BACKFILL_BATCH_SIZE, only_missing: bool = False) -> dict:
+    """Summarize every application, `batch_size` at a time in application_id order."""
+    from app.database.connection import SessionLocal
+
+    started = time.monotonic()
+    summary = {"applications": 0, "batches": 0, "seconds": 0.0}
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            query = db.query(Application.application_id).filter(Application.application_id > last_id)
+            if only_missing:
+                query = query.filter(Application.experience_summary_at.is_(None))
+            ids = [row[0] for row in query.order_by(Application.application_id).limit(batch_size)]
+            if not ids:
+                break
+            summary["applications"] += refresh_summaries(db, ids)
+            summary["batches"] += 1
+            db.commit()
+            last_id = ids[-1]
+    finally:
+        db.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the experience summary of every application")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    parser.add_argument("--only-missing", action="store_true", help="Skip applications that already have a summary")
+    args = parser.parse_args()
+    print(backfill(batch_size=args.batch_size, only_missing=args.only_missing))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import csv
+import io
+import os
+import zlib
+from itertools import groupby
+from typing import Iterator, List, Optional
+
+from app.database.connection import SessionLocal
+from app.models.candidate import Candidate
+from app.models.enums import ApplicationStatus
+from app.models.opening import Opening
+from app.models.role import Role
+from app.models.stage import Stage
+from app.utils.archive import SOURCES
+from app.utils.partitions import month_bounds
+
+# Rows fetched from the database cursor per round trip
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+EXPORT_COLUMNS = [
+    "application_id",
+    "application_date",
+    "status",
+    "rating",
+    "attachments",
+    "candidate_id",
+    "candidate_name",
+    "email",
+    "phone_number",
+    "role_name",
+    "opening_title",
+    "stage_name",
+    "stage_sequence",
+    "experience_count",
+    "experiences",
+]
+
+
+def iter_export_rows(status: Optional[ApplicationStatus] = None, year: Optional[int] = None,
+                     month: Optional[int] = None, include_archived: bool = True,
+                     chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+    """
+    Yield one flat row per application, in EXPORT_COLUMNS order.
+
+    Applications, candidates, roles, openings, stages and experiences come from
+    a single joined query read through a server-side cursor in chunks of
+    `chunk_size`, so memory stays constant however many rows are exported.
+    Experiences are collapsed into one "Position @ Company (start - end)" cell.
+    With `include_archived`, archived applications follow the live ones.
+    """
+    sources = SOURCES if include_archived else SOURCES[:1]
+    db = SessionLocal()
+    try:
+        for application_model, experience_model in sources:
+            yield from _iter_source_rows(db, application_model, experience_model, status, year, month, chunk_size)
+    finally:
+        db.close()
+
+
+def _iter_source_rows(db, application_model, experience_model, status: Optional[ApplicationStatus],
+                      year: Optional[int], month: Optional[int], chunk_size: int) -> Iterator[list]:
+    query = (
+        db.query(
+            application_model.application_id,
+            application_model.application_date,
+            application_model.status,
+            application_model.rating,
+            application_model.attachments,
+            Candidate.candidate_id,
+            Candidate.candidate_name,
+            Candidate.email,
+            Candidate.phone_number,
+            Role.role_name,
+            Opening.title,
+            Stage.stage_name,
+            Stage.stage_sequence,
+            experience_model.experience_id,
+            experience_model.position,
+            experience_model.company_name,
+            experience_model.start_date,
+            experience_model.end_date
+        )
+        .join(Candidate, application_model.candidate_id == Candidate.candidate_id)
+        .join(Role, application_model.role_id == Role.role_id)
+        .outerjoin(Opening, application_model.opening_id == Opening.opening_id)
+        .outerjoin(Stage, Stage.stage_id == application_model.current_stage)
+        .outerjoin(experience_model, experience_model.application_id == application_model.application_id)
+    )
+
+    if year is not None and month is not None:
+        start, end = month_bounds(year, month)
+        query = query.filter(application_model.application_date >= start, application_model.application_date < end)
+    if status is not None:
+        query = query.filter(application_model.status == status)
+
+    # Rows of one application must be adjacent so they can be grouped while streaming
+    query = query.order_by(application_model.application_id, experience_model.start_date).execution_options(
+        yield_per=chunk_size
+    )
+
+    for application_id, rows in groupby(query, key=lambda row: row.application_id):
+        rows = list(rows)
+        first = rows[0]
+        experiences = [
+            f"{row.position} @ {row.company_name} "
+            f"({_format_month(row.start_date)} - {_format_month(row.end_date) or 'present'})"
+            for row in rows if row.experience_id is not None
+        ]
+        yield [
+            first.application_id,
+            first.application_date.isoformat() if first.application_date else None,
+            first.status.value if first.status else None,
+            first.rating,
+            first.attachments,
+            first.candidate_id,
+            first.candidate_name,
+            first.email,
+            first.phone_number,
+            first.role_name,
+            first.title,
+            first.stage_name,
+            first.stage_sequence,
+            len(experiences),
+            "; ".join(experiences),
+        ]
+
+
+def _format_month(value) -> Optional[str]:
+    return value.strftime("%Y-%m") if value else None
+
+
+def iter_csv(rows: Iterator[list], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encode rows as CSV (with a header line), yielding a chunk every `rows_per_chunk` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_gzip(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out and forgotten as they are produced."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(rows: Iterator[list], rows_per_group: int = 50000) -> Iterator[bytes]:
+    """
+    Encode rows as Parquet, one row group per `rows_per_group` rows.
+
+    Requires pyarrow (optional dependency); raises ImportError without it.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("application_id", pa.int64()),
+        ("application_date", pa.string()),
+        ("status", pa.string()),
+        ("rating", pa.int64()),
+        ("attachments", pa.string()),
+        ("candidate_id", pa.int64()),
+        ("candidate_name", pa.string()),
+        ("email", pa.string()),
+        ("phone_number", pa.string()),
+        ("role_name", pa.string()),
+        ("opening_title", pa.string()),
+        ("stage_name", pa.string()),
+        ("stage_sequence", pa.int64()),
+        ("experience_count", pa.int64()),
+        ("experiences", pa.string()),
+    ])
+
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+
+    def write_group(batch):
+        columns = list(zip(*batch))
+        writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type)
+                                                 for column, field in zip(columns, schema)], schema=schema))
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= rows_per_group:
+            write_group(batch)
+            batch = []
+            yield sink.drain()
+    if batch:
+        write_group(batch)
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,167 @@
+import os
+import re
+from io import BytesIO
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import Request, Response, status
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFileResponse(Response):
+    """
+    Sends `length` bytes of a file starting at `offset`.
+
+    When the server supports the ASGI zero-copy send extension the file
+    descriptor is handed over so the kernel can sendfile() it; otherwise the
+    file is streamed in chunks read off the event loop.
+    """
+
+    def __init__(self, path: str, offset: int, length: int, status_code: int, headers: dict, media_type: str):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"] == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank underneath us; end the response rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class BufferResponse(Response):
+    """
+    Sends the contents of a BytesIO in chunks taken straight from its buffer,
+    rather than copying the whole document into one bytes object first
+    (getvalue()) while the buffer still holds it.
+    """
+
+    def __init__(self, buffer: BytesIO, headers: dict, media_type: str, status_code: int = status.HTTP_200_OK):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.buffer = buffer
+        with buffer.getbuffer() as view:
+            self.headers["content-length"] = str(view.nbytes)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        with self.buffer.getbuffer() as view:
+            if scope["method"] == "HEAD" or not view.nbytes:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            for start in range(0, view.nbytes, CHUNK_SIZE):
+                end = start + CHUNK_SIZE
+                await send({"type": "http.response.body", "body": bytes(view[start:end]), "more_body": end < view.nbytes})
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into (start, end) inclusive.
+
+    Returns None when the whole file should be sent (no header, or a
+    multi-range request) and raises ValueError for an unsatisfiable range.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag (compression
+    makes ETags weak). Not for If-Match, which needs if_match_matches().
+    """
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def if_match_matches(if_match: Optional[str], etag: str) -> bool:
+    """
+    Strong comparison of an If-Match header against an ETag: `*` matches any
+    ETag, and weak tags (W/"...") on either side never match.
+    """
+    if not if_match:
+        return False
+    tags = {tag.strip() for tag in if_match.split(",")}
+    return "*" in tags or (not etag.startswith("W/") and etag in tags)
+
+
+def file_response(request: Request, path: str, media_type: str, etag: str,
+                  filename: Optional[str] = None, immutable: bool = True) -> Response:
+    """Serve a file with ETag revalidation and single-range (HTTP 206) support."""
+    size = os.stat(path).st_size
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": f'"{etag}"',
+        "cache-control": "public, max-age=31536000, immutable" if immutable else "no-cache",
+        # Browsers must not guess a type other than the one sent
+        "x-content-type-options": "nosniff",
+    }
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+    if etag_matches(request.headers.get("if-none-match"), headers["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        headers["content-range"] = f"bytes */{size}"
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+    if byte_range is None:
+        return RangeFileResponse(path, 0, size, status.HTTP_200_OK, headers, media_type)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(path, start, end - start + 1, status.HTTP_206_PARTIAL_CONTENT, headers, media_type)
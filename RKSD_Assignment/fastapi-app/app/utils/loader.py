@@ -0,0 +1,140 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+# IDs accepted by a multi-get (?ids=)
+MULTI_GET_MAX_IDS = 100
+# IDs per IN clause; larger batches are split
+LOADER_CHUNK_SIZE = 500
+
+
+class Loader:
+    """
+    DataLoader-style batching of lookups by primary key.
+
+    `load` and `load_many` don't query right away: the keys are collected and
+    resolved on the next turn of the event loop with one IN query per model,
+    so every lookup made in the meantime (by one handler, or by concurrent
+    sub-requests of a batch) costs a single round trip. Results, including
+    misses, are remembered for the life of the loader.
+    """
+
+    def __init__(self, db: Session, delay: float = 0.0):
+        self.db = db
+        # Seconds to keep collecting keys before querying, instead of the next turn of the loop
+        self.delay = delay
+        self.queries = 0
+        self._cache: Dict[type, Dict[int, object]] = {}
+        self._pending: Dict[type, Dict[int, List[asyncio.Future]]] = {}
+        self._scheduled = False
+
+    def _enqueue(self, model: type, key: int) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        cache = self._cache.get(model)
+        if cache is not None and key in cache:
+            future.set_result(cache[key])
+            return future
+
+        self._pending.setdefault(model, {}).setdefault(key, []).append(future)
+        if not self._scheduled:
+            self._scheduled = True
+            if self.delay:
+                loop.call_later(self.delay, self._dispatch)
+            else:
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load(self, model: type, key: int) -> Optional[object]:
+        """The instance of `model` with primary key `key`, or None."""
+        return await self._enqueue(model, key)
+
+    async def load_many(self, model: type, keys: Iterable[int]) -> List[Optional[object]]:
+        """Instances for `keys` in the same order, with None for missing ones."""
+        futures = [self._enqueue(model, key) for key in keys]
+        return [await future for future in futures]
+
+    def prime(self, model: type, instances: Iterable[object]):
+        """Remember instances loaded some other way, so later lookups don't query for them."""
+        cache = self._cache.setdefault(model, {})
+        for instance in instances:
+            cache[inspect(instance).identity[0]] = instance
+
+    def _dispatch(self):
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        for model, waiters in pending.items():
+            try:
+                found = self._fetch(model, list(waiters))
+            except Exception as exc:
+                for futures in waiters.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                continue
+
+            cache = self._cache.setdefault(model, {})
+            for key, futures in waiters.items():
+                cache[key] = found.get(key)
+                for future in futures:
+                    # A waiter whose request was cancelled no longer wants the result
+                    if not future.done():
+                        future.set_result(cache[key])
+
+    def _fetch(self, model: type, keys: List[int]) -> Dict[int, object]:
+        mapper = inspect(model)
+        column = mapper.primary_key[0]
+        attribute = mapper.get_property_by_column(column).key
+        found = {}
+        for start in range(0, len(keys), LOADER_CHUNK_SIZE):
+            chunk = keys[start:start + LOADER_CHUNK_SIZE]
+            for instance in self.db.query(model).filter(column.in_(chunk)):
+                found[getattr(instance, attribute)] = instance
+            self.queries += 1
+        return found
+
+
+# Set by POST /batch so that the lookups of its sub-requests, which each have a
+# session of their own, are still batched together
+batch_loader: ContextVar[Optional[Loader]] = ContextVar("batch_loader", default=None)
+
+
+def get_loader(db: Session) -> Loader:
+    """The batch's loader inside POST /batch, otherwise the session's, created on first use."""
+    loader = batch_loader.get()
+    if loader is not None:
+        return loader
+    loader = db.info.get("loader")
+    if loader is None:
+        loader = db.info["loader"] = Loader(db)
+    return loader
+
+
+def parse_ids(
+    ids: Optional[str] = Query(None, description="Comma-separated IDs to fetch, e.g. 3,1,7")
+) -> Optional[List[int]]:
+    """Dependency for the `ids` multi-get parameter: the distinct IDs in the order given."""
+    if ids is None:
+        return None
+    try:
+        parsed = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    if len(parsed) > MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MULTI_GET_MAX_IDS} ids can be fetched at once"
+        )
+    return parsed
+
+
+async def load_existing(db: Session, model: type, ids: List[int]) -> list:
+    """Instances for `ids` in the order given, leaving out IDs that don't exist."""
+    return [instance for instance in await get_loader(db).load_many(model, ids) if instance is not None]
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.role import Role
+from app.models.stage import Stage
+
+# Roles and stages change rarely but are read on almost every application
+# request, so they are cached per worker. Writes in this worker invalidate the
+# cache immediately; the TTL bounds staleness for changes made by other workers.
+# Writes that depend on the stages read them with read_role_stages() instead.
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "60"))
+
+
+class RoleEntry(NamedTuple):
+    role_id: int
+    role_name: str
+    description: Optional[str]
+    is_active: Optional[bool]
+
+
+class StageEntry(NamedTuple):
+    stage_id: int
+    stage_name: str
+    role_id: int
+    stage_sequence: int
+
+
+_lock = threading.Lock()
+_roles: Dict[int, RoleEntry] = {}
+_stages: List[StageEntry] = []
+_stages_by_role: Dict[int, List[StageEntry]] = {}
+_loaded_at: Optional[float] = None
+_generation = 0
+
+
+def load(db: Session):
+    """(Re)load roles and stages from the database."""
+    global _roles, _stages, _stages_by_role, _loaded_at
+
+    generation = _generation
+    roles = {
+        row.role_id: RoleEntry(row.role_id, row.role_name, row.description, row.is_active)
+        for row in db.query(Role.role_id, Role.role_name, Role.description, Role.is_active)
+    }
+    stages = [
+        StageEntry(row.stage_id, row.stage_name, row.role_id, row.stage_sequence)
+        for row in db.query(Stage.stage_id, Stage.stage_name, Stage.role_id, Stage.stage_sequence)
+        .order_by(Stage.stage_id)
+    ]
+    stages_by_role: Dict[int, List[StageEntry]] = {}
+    for stage in sorted(stages, key=lambda s: s.stage_sequence):
+        stages_by_role.setdefault(stage.role_id, []).append(stage)
+
+    with _lock:
+        _roles, _stages, _stages_by_role = roles, stages, stages_by_role
+        # A write that happened while we were reading keeps the cache marked stale
+        if generation == _generation:
+            _loaded_at = time.monotonic()
+
+
+def invalidate():
+    """Drop the cached lookups; the next read reloads them."""
+    global _loaded_at, _generation
+    with _lock:
+        _generation += 1
+        _loaded_at = None
+
+
+def _ensure_loaded(db: Session):
+    loaded_at = _loaded_at
+    if loaded_at is None or time.monotonic() - loaded_at > LOOKUP_CACHE_TTL:
+        load(db)
+
+
+def get_role(db: Session, role_id: int) -> Optional[RoleEntry]:
+    """Return a cached role, or None if it doesn't exist."""
+    _ensure_loaded(db)
+    return _roles.get(role_id)
+
+
+def get_all_stages(db: Session) -> List[StageEntry]:
+    """Return every stage ordered by ID."""
+    _ensure_loaded(db)
+    return list(_stages)
+
+
+def get_role_stages(db: Session, role_id: int) -> List[StageEntry]:
+    """Return the stages of a role ordered by stage_sequence."""
+    _ensure_loaded(db)
+    return list(_stages_by_role.get(role_id, []))
+
+
+def read_role_stages(db: Session, role_id: int) -> List[StageEntry]:
+    """
+    Return the stages of a role ordered by stage_sequence, read from the
+    database rather than the cache, for writes that must not act on stages
+    another worker has changed.
+    """
+    return [
+        StageEntry(row.stage_id, row.stage_name, row.role_id, row.stage_sequence)
+        for row in db.query(Stage.stage_id, Stage.stage_name, Stage.role_id, Stage.stage_sequence)
+        .filter(Stage.role_id == role_id)
+        .order_by(Stage.stage_sequence, Stage.stage_id)
+    ]
@@ -0,0 +1,63 @@
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.models.opening import Opening
+
+# Openings deactivated per UPDATE (and per transaction)
+EXPIRY_BATCH_SIZE = int(os.getenv("OPENING_EXPIRY_BATCH_SIZE", "500"))
+
+
+def expire_openings(now: Optional[datetime] = None, batch_size: int = EXPIRY_BATCH_SIZE) -> dict:
+    """
+    Deactivate active openings whose deadline has passed.
+
+    Expired IDs are read from the partial index on active openings and
+    deactivated `batch_size` at a time, each batch in its own short
+    transaction, so a large backlog never holds many row locks at once.
+    """
+    from app.database.connection import SessionLocal
+
+    now = now or datetime.now()
+    started = time.monotonic()
+    summary = {"expired": 0, "batches": 0, "seconds": 0.0}
+    db = SessionLocal()
+    try:
+        while True:
+            ids = [
+                row[0] for row in db.query(Opening.opening_id)
+                .filter(Opening.is_active, Opening.deadline < now)
+                .order_by(Opening.deadline)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            result = db.execute(
+                update(Opening)
+                .where(Opening.opening_id.in_(ids), Opening.is_active)
+                .values(is_active=False)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            summary["expired"] += result.rowcount
+            summary["batches"] += 1
+    finally:
+        db.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deactivate openings whose deadline has passed")
+    parser.add_argument("--batch-size", type=int, default=EXPIRY_BATCH_SIZE)
+    args = parser.parse_args()
+    print(expire_openings(batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
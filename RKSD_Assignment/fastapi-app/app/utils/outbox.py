@@ -0,0 +1,260 @@
+import argparse
+import enum
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, exists, insert, inspect, select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
+
+from app.database.connection import SessionLocal
+from app.models.application import Application
+from app.models.candidate import Candidate
+from app.models.outbox_event import OutboxEvent
+from app.models.stage import Stage
+
+# Events older than this are deleted
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+# Events followed by a later event for the same row are deleted once they are this old
+OUTBOX_COMPACT_AFTER_HOURS = float(os.getenv("OUTBOX_COMPACT_AFTER_HOURS", "24"))
+# Events deleted per transaction by the compaction
+OUTBOX_COMPACTION_BATCH_SIZE = int(os.getenv("OUTBOX_COMPACTION_BATCH_SIZE", "1000"))
+# On databases other than SQLite and PostgreSQL, a missing sequence number may belong
+# to a transaction that hasn't committed yet until this long after the feed first saw
+# it, so the change feed stops in front of it until then
+OUTBOX_GAP_WAIT_SECONDS = float(os.getenv("OUTBOX_GAP_WAIT_SECONDS", "5"))
+# Events returned by one change feed request at most
+CHANGES_MAX_LIMIT = 5000
+# Rows read per IN clause when recording bulk changes
+RECORD_CHUNK_SIZE = 500
+# Gaps remembered per process
+MAX_TRACKED_GAPS = 10000
+
+# Models whose changes are recorded, by entity name
+TRACKED_MODELS = {Candidate: "candidate", Application: "application", Stage: "stage"}
+
+# First missing sequence number of each gap the feed has stopped at, with what was
+# current when it was first seen; SETTLED once the gap can't be filled anymore
+SETTLED = object()
+_gaps: "OrderedDict[int, object]" = OrderedDict()
+_gaps_lock = threading.Lock()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _event(entity: str, entity_id: int, operation: str, values: dict, now: datetime) -> dict:
+    return {
+        "entity": entity,
+        "entity_id": entity_id,
+        "operation": operation,
+        "payload": json.dumps(values, default=_json_default, separators=(",", ":")),
+        "created_at": now,
+    }
+
+
+def _record_flush(session: Session, flush_context):
+    """
+    Write an outbox event for every tracked row the flush inserted, changed or
+    deleted, on the flush's connection so it commits or rolls back with it.
+    Columns the database sets on update (updated_at) aren't known yet and are
+    left out of the snapshot.
+    """
+    now = datetime.now()
+    events = []
+    for operation, instances in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for instance in instances:
+            entity = TRACKED_MODELS.get(type(instance))
+            if entity is None:
+                continue
+            if operation == "updated" and not session.is_modified(instance, include_collections=False):
+                continue
+            state = inspect(instance)
+            values = {
+                attribute.key: state.dict[attribute.key]
+                for attribute in state.mapper.column_attrs if attribute.key in state.dict
+            }
+            events.append(_event(entity, state.mapper.primary_key_from_instance(instance)[0], operation, values, now))
+    if events:
+        session.connection().execute(insert(OutboxEvent.__table__), events)
+
+
+# Every session from SessionLocal records its changes; the API and the job
+# handlers import this module, which registers the listener
+event.listen(SessionLocal, "after_flush", _record_flush)
+
+
+def record_changes(db: Session, model: type, ids: Iterable[int], operation: str = "updated") -> int:
+    """
+    Write outbox events with the current columns of `model` rows changed by
+    bulk statements, which the flush listener doesn't see; the caller commits.
+    """
+    entity = TRACKED_MODELS[model]
+    key = inspect(model).primary_key[0]
+    ids = sorted(set(ids))
+    now = datetime.now()
+    events = []
+    for start in range(0, len(ids), RECORD_CHUNK_SIZE):
+        rows = db.execute(
+            select(model.__table__).where(key.in_(ids[start:start + RECORD_CHUNK_SIZE])).order_by(key)
+        )
+        events.extend(_event(entity, row[key.name], operation, dict(row), now) for row in rows.mappings())
+    if events:
+        db.execute(insert(OutboxEvent.__table__), events)
+    return len(events)
+
+
+def _first_open_gap(db: Session, gaps: List[int], now: datetime) -> Optional[int]:
+    """
+    The first of `gaps` (first missing sequence numbers, ascending) that a
+    transaction may still fill, or None. Gaps not seen before are recorded as
+    first seen now.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # A writer holds the database lock until it commits, so no event can commit
+        # below one already visible: gaps are only left by rollbacks
+        return None
+
+    oldest = None
+    current = now
+    if dialect == "postgresql":
+        # Whoever took a missing number did so before the gap was first seen, so it's
+        # settled once every transaction started by then (xid below that xmax) has ended
+        oldest, current = db.execute(
+            text("SELECT txid_snapshot_xmin(s), txid_snapshot_xmax(s) FROM txid_current_snapshot() s")
+        ).one()
+
+    first_open = None
+    with _gaps_lock:
+        for seq in gaps:
+            first_seen = _gaps.get(seq, current)
+            if first_seen is not SETTLED:
+                if oldest is not None:
+                    settled = oldest >= first_seen
+                else:
+                    settled = now - first_seen >= timedelta(seconds=OUTBOX_GAP_WAIT_SECONDS)
+                if settled:
+                    first_seen = SETTLED
+                elif first_open is None:
+                    first_open = seq
+            _gaps[seq] = first_seen
+            _gaps.move_to_end(seq)
+        while len(_gaps) > MAX_TRACKED_GAPS:
+            _gaps.popitem(last=False)
+    return first_open
+
+
+def read_changes(db: Session, after: int, limit: int, now: Optional[datetime] = None) -> Tuple[List[Row], bool]:
+    """
+    Up to `limit` events after sequence number `after`, oldest first, and
+    whether more are waiting.
+
+    Sequence numbers are taken when a row is inserted, so a transaction that
+    commits late can add an event below ones already visible. The feed stops
+    in front of a gap until it is filled or no transaction can fill it
+    anymore: at once on SQLite, where gaps are only left by rollbacks; on
+    PostgreSQL once every transaction running when the gap was first seen has
+    ended; elsewhere OUTBOX_GAP_WAIT_SECONDS after it was first seen. Gaps are
+    tracked per process, so a restarted process waits for them once more.
+    """
+    now = now or datetime.now()
+    rows = db.execute(
+        select(
+            OutboxEvent.seq, OutboxEvent.entity, OutboxEvent.entity_id,
+            OutboxEvent.operation, OutboxEvent.payload, OutboxEvent.created_at
+        )
+        .where(OutboxEvent.seq > after)
+        .order_by(OutboxEvent.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    gaps = []
+    previous = after
+    for row in rows:
+        if row.seq != previous + 1:
+            gaps.append(previous + 1)
+        previous = row.seq
+    first_open = _first_open_gap(db, gaps, now) if gaps else None
+    if first_open is not None:
+        return [row for row in rows if row.seq < first_open], False
+    return rows, has_more
+
+
+def compact_outbox(retention_days: float = OUTBOX_RETENTION_DAYS,
+                   compact_after_hours: float = OUTBOX_COMPACT_AFTER_HOURS,
+                   batch_size: int = OUTBOX_COMPACTION_BATCH_SIZE, now: Optional[datetime] = None) -> dict:
+    """
+    Delete events older than `retention_days`, and events older than
+    `compact_after_hours` that a later event for the same row supersedes.
+
+    Every event carries the whole row, so a consumer that falls behind the
+    compaction still ends up with the latest state of every row it missed.
+    Events are deleted `batch_size` at a time, each batch in its own
+    transaction.
+    """
+    now = now or datetime.now()
+    started = time.monotonic()
+    summary = {"expired": 0, "compacted": 0, "seconds": 0.0}
+
+    later = aliased(OutboxEvent)
+    superseded = exists().where(
+        later.entity == OutboxEvent.entity,
+        later.entity_id == OutboxEvent.entity_id,
+        later.seq > OutboxEvent.seq
+    )
+    passes = (
+        ("expired", OutboxEvent.created_at < now - timedelta(days=retention_days)),
+        ("compacted", and_(OutboxEvent.created_at < now - timedelta(hours=compact_after_hours), superseded)),
+    )
+
+    db = SessionLocal()
+    try:
+        for name, condition in passes:
+            last_seq = 0
+            while True:
+                seqs = [
+                    row[0] for row in db.query(OutboxEvent.seq)
+                    .filter(OutboxEvent.seq > last_seq, condition)
+                    .order_by(OutboxEvent.seq)
+                    .limit(batch_size)
+                ]
+                if not seqs:
+                    break
+                db.execute(
+                    delete(OutboxEvent).where(OutboxEvent.seq.in_(seqs))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                summary[name] += len(seqs)
+                last_seq = seqs[-1]
+    finally:
+        db.close()
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired and superseded change feed events")
+    parser.add_argument("--retention-days", type=float, default=OUTBOX_RETENTION_DAYS)
+    parser.add_argument("--compact-after-hours", type=float, default=OUTBOX_COMPACT_AFTER_HOURS)
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_COMPACTION_BATCH_SIZE)
+    args = parser.parse_args()
+    print(compact_outbox(args.retention_days, args.compact_after_hours, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# Convert the applications table to monthly range partitions when the migration runs (PostgreSQL only)
+PARTITION_APPLICATIONS = os.getenv("PARTITION_APPLICATIONS", "false").lower() in ("1", "true", "yes")
+# Monthly partitions kept ready after the current month
+APPLICATION_PARTITIONS_AHEAD = int(os.getenv("APPLICATION_PARTITIONS_AHEAD", "3"))
+
+TABLE = "applications"
+PARTITION_KEY = "application_date"
+# Catches rows outside every monthly partition, so inserts never fail for lack of one
+DEFAULT_PARTITION = f"{TABLE}_default"
+# Advisory lock taken while partitions are created, so API workers don't race each other
+PARTITION_LOCK_KEY = 7_341_905
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    """The first day of the month `months` after the one `start` is in."""
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """
+    The month as a half-open range [first day, first day of the next month).
+
+    Filtering application_date with this range, rather than extracting the
+    year and month, lets PostgreSQL skip every other monthly partition.
+    """
+    start = datetime(year, month, 1)
+    return start, add_months(start, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_y{start.year:04d}m{start.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether the applications table is a partitioned PostgreSQL table."""
+    if connection.dialect.name != "postgresql":
+        return False
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(connection: Connection, table: str = TABLE) -> List[str]:
+    return list(connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table) ORDER BY child.relname"
+    ), {"table": table}).scalars())
+
+
+def _timestamp(value: datetime) -> str:
+    # Partition bounds are DDL and can't be bound parameters
+    return f"'{value:%Y-%m-%d %H:%M:%S}'"
+
+
+def create_month_partition(connection: Connection, start: datetime, table: str = TABLE,
+                           move_from_default: bool = True):
+    """
+    Create and attach the partition for the month beginning at `start`.
+
+    Rows of that month that landed in the default partition are moved into
+    the new table first; PostgreSQL refuses to attach a partition whose
+    range still has rows in the default one.
+    """
+    name = partition_name(start)
+    end = add_months(start, 1)
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    if move_from_default:
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE {PARTITION_KEY} >= :start AND {PARTITION_KEY} < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), {"start": start, "end": end})
+    connection.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({_timestamp(start)}) TO ({_timestamp(end)})"
+    ))
+
+
+def _upcoming_months(now: datetime, months_ahead: int) -> List[datetime]:
+    first = datetime(now.year, now.month, 1)
+    return [add_months(first, offset) for offset in range(months_ahead + 1)]
+
+
+def _referencing_foreign_keys(connection: Connection) -> List[Tuple[str, str]]:
+    """(table, constraint) of the foreign keys pointing at the applications table."""
+    inspector = inspect(connection)
+    return [
+        (table, foreign_key["name"])
+        for table in inspector.get_table_names() if table != TABLE
+        for foreign_key in inspector.get_foreign_keys(table)
+        if foreign_key["referred_table"] == TABLE
+    ]
+
+
+def _replace_table(connection: Connection, staging: str, primary_key: Iterable[str]):
+    """Drop the applications table and put `staging` in its place, with its keys and indexes."""
+    foreign_keys = inspect(connection).get_foreign_keys(TABLE)
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'application_id')"), {"table": TABLE}
+    ).scalar()
+
+    # Keep the ID sequence alive while the table that owns it is dropped
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(f"DROP TABLE {TABLE}"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {TABLE}"))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.application_id"))
+
+    connection.execute(text(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({', '.join(primary_key)})"))
+    connection.execute(text(f"CREATE INDEX ix_{TABLE}_application_id ON {TABLE} (application_id)"))
+    for foreign_key in foreign_keys:
+        connection.execute(text(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {foreign_key['name']} "
+            f"FOREIGN KEY ({', '.join(foreign_key['constrained_columns'])}) "
+            f"REFERENCES {foreign_key['referred_table']} ({', '.join(foreign_key['referred_columns'])})"
+        ))
+
+
+def partition_applications(connection: Connection, months_ahead: int = APPLICATION_PARTITIONS_AHEAD,
+                           now: Optional[datetime] = None) -> bool:
+    """
+    Rebuild the applications table as a table partitioned by month of
+    application_date, in the caller's transaction. Returns False if it
+    already is partitioned.
+
+    There is a partition for every month that has applications and for the
+    next `months_ahead` months, plus a default partition. PostgreSQL can't
+    enforce a unique application_id across partitions, so the primary key
+    becomes (application_id, application_date) and foreign keys pointing at
+    applications (from experiences) are dropped; the ID sequence still hands
+    out unique IDs. The table is locked for the duration of the copy.
+    """
+    if is_partitioned(connection):
+        return False
+
+    now = now or datetime.now()
+    staging = f"{TABLE}_partitioned"
+    connection.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    connection.execute(text(
+        f"CREATE TABLE {staging} (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE ({PARTITION_KEY})"
+    ))
+    months = set(connection.execute(text(f"SELECT DISTINCT date_trunc('month', {PARTITION_KEY}) FROM {TABLE}")).scalars())
+    for start in sorted(months | set(_upcoming_months(now, months_ahead))):
+        create_month_partition(connection, start, staging, move_from_default=False)
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {staging} DEFAULT"))
+    connection.execute(text(f"INSERT INTO {staging} SELECT * FROM {TABLE}"))
+
+    for table, constraint in _referencing_foreign_keys(connection):
+        connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}"))
+    _replace_table(connection, staging, ("application_id", PARTITION_KEY))
+    return True
+
+
+def unpartition_applications(connection: Connection) -> bool:
+    """
+    Rebuild a partitioned applications table as a plain table, in the
+    caller's transaction, restoring the foreign keys that point at it.
+    Returns False if it isn't partitioned.
+    """
+    if not is_partitioned(connection):
+        return False
+
+    import app.models  # noqa: F401  (registers every table with Base.metadata)
+    from app.database.connection import Base
+
+    staging = f"{TABLE}_unpartitioned"
+    connection.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    connection.execute(text(f"CREATE TABLE {staging} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+    connection.execute(text(f"INSERT INTO {staging} SELECT * FROM {TABLE}"))
+    _replace_table(connection, staging, ("application_id",))
+
+    for table in Base.metadata.sorted_tables:
+        for foreign_key in table.foreign_key_constraints:
+            if foreign_key.referred_table.name == TABLE:
+                columns = [column.name for column in foreign_key.columns]
+                name = foreign_key.name or f"{table.name}_{'_'.join(columns)}_fkey"
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(columns)}) "
+                    f"REFERENCES {TABLE} ({', '.join(element.column.name for element in foreign_key.elements)})"
+                ))
+    return True
+
+
+def ensure_partitions(months_ahead: int = APPLICATION_PARTITIONS_AHEAD, now: Optional[datetime] = None) -> dict:
+    """
+    Create the monthly partitions for the current month and the next
+    `months_ahead` months that don't exist yet. Does nothing unless the
+    applications table is partitioned.
+    """
+    from app.database.connection import engine
+
+    now = now or datetime.now()
+    created = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            return {"partitioned": False, "created": created}
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        existing = set(list_partitions(connection))
+        for start in _upcoming_months(now, months_ahead):
+            if partition_name(start) not in existing:
+                create_month_partition(connection, start)
+                created.append(partition_name(start))
+    return {"partitioned": True, "created": created}
+
+
+def main():
+    from app.database.connection import engine
+
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of the applications table (PostgreSQL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Create partitions for the coming months")
+    ensure.add_argument("--months-ahead", type=int, default=APPLICATION_PARTITIONS_AHEAD)
+    convert = commands.add_parser("convert", help="Rebuild the applications table as a partitioned table")
+    convert.add_argument("--months-ahead", type=int, default=APPLICATION_PARTITIONS_AHEAD)
+    commands.add_parser("revert", help="Rebuild a partitioned applications table as a plain table")
+    commands.add_parser("status", help="List the partitions")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        print(ensure_partitions(months_ahead=args.months_ahead))
+        return
+    if engine.dialect.name != "postgresql":
+        parser.error("partitioning requires PostgreSQL")
+    with engine.begin() as connection:
+        if args.command == "convert":
+            print({"converted": partition_applications(connection, months_ahead=args.months_ahead)})
+        elif args.command == "revert":
+            print({"reverted": unpartition_applications(connection)})
+        else:
+            partitioned = is_partitioned(connection)
+            print({"partitioned": partitioned, "partitions": list_partitions(connection) if partitioned else []})
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,15 @@ SUCCESS_COLOR = colors.HexColor('#34a853')  # Green
 PENDING_COLOR = colors.HexColor('#ea4335')  # Red
 CURRENT_COLOR = colors.HexColor('#fbbc04')  # Yellow
 
+# Fonts used by the application PDF
+PDF_FONTS = ['Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique']
+
+def warm_up():
+    """Load the fonts and stylesheet up front so the first PDF request doesn't pay for them"""
+    for font_name in PDF_FONTS:
+        pdfmetrics.getFont(font_name)
+    getSampleStyleSheet()
+
 def format_date(date_obj):
     """Format datetime object to a readable string"""
     if not date_obj:
@@ -0,0 +1,169 @@
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Weight of each signal in an applicant's score; they are normalized to sum to 1
+RANKING_WEIGHTS = {
+    "experience": float(os.getenv("RANKING_WEIGHT_EXPERIENCE", "0.35")),
+    "rating": float(os.getenv("RANKING_WEIGHT_RATING", "0.25")),
+    "stage": float(os.getenv("RANKING_WEIGHT_STAGE", "0.15")),
+    "keywords": float(os.getenv("RANKING_WEIGHT_KEYWORDS", "0.25")),
+}
+RATING_SCALE = float(os.getenv("RANKING_RATING_SCALE", "5"))
+# Unrated applications count as average rather than as the worst
+UNRATED_SCORE = 0.5
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+STOP_WORDS = {
+    "and", "or", "the", "a", "an", "of", "in", "on", "to", "for", "with", "at", "by", "from", "as", "is",
+    "are", "be", "we", "you", "our", "your", "will", "must", "should", "have", "has", "years", "year",
+    "experience", "knowledge", "strong", "good", "skills", "ability", "plus", "etc",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+class ApplicantFeatures(NamedTuple):
+    """Per-applicant ranking signals, one array element per application."""
+    application_ids: np.ndarray
+    candidate_ids: np.ndarray
+    experience_years: np.ndarray
+    ratings: np.ndarray  # NaN when unrated
+    stage_progress: np.ndarray  # 0..1 through the role's stages
+    keyword_hits: np.ndarray  # (applications, keywords) booleans
+    keywords: List[str]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case words, keeping terms such as "c++", "c#" and "node.js" intact."""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def extract_keywords(requirements: Optional[str]) -> List[str]:
+    """The distinct, meaningful words of an opening's requirements, in order."""
+    return list(dict.fromkeys(
+        token for token in tokenize(requirements)
+        if token not in STOP_WORDS and not token.isdigit()
+    ))
+
+
+def score_applicants(features: ApplicantFeatures, experience_required: int,
+                     weights: Dict[str, float] = RANKING_WEIGHTS) -> np.ndarray:
+    """
+    Score every applicant at once; each signal is scaled to 0..1 before weighting.
+
+    Experience saturates at the opening's required years (or one year when
+    none are required), ratings are divided by RATING_SCALE and keyword
+    overlap is the fraction of requirement keywords an applicant mentions.
+    """
+    experience = np.clip(features.experience_years / max(experience_required, 1), 0.0, 1.0)
+    rating = np.where(np.isnan(features.ratings), UNRATED_SCORE,
+                      np.clip(features.ratings / RATING_SCALE, 0.0, 1.0))
+    if features.keywords:
+        keywords = features.keyword_hits.sum(axis=1, dtype=np.float64) / len(features.keywords)
+    else:
+        keywords = np.zeros(len(features.application_ids))
+
+    total_weight = sum(weights.values()) or 1.0
+    return (
+        weights["experience"] * experience
+        + weights["rating"] * rating
+        + weights["stage"] * features.stage_progress
+        + weights["keywords"] * keywords
+    ) / total_weight
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first, in O(n + k log k)."""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    # Stable sort keeps ties in application order
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def load_features(db, opening, include_rejected: bool = False, now: Optional[datetime] = None) -> ApplicantFeatures:
+    """
+    Build the ranking features for every application to an opening.
+
+    Years of experience come from the applications' maintained experience
+    summary; experiences are only read for their text (keyword matching) and
+    for applications that haven't been summarized yet.
+    """
+    from app.models.application import Application
+    from app.models.enums import ApplicationStatus
+    from app.models.experience import Experience
+    from app.utils import lookups
+    from app.utils.experience_summary import summarize
+
+    now = now or datetime.now()
+    query = db.query(
+        Application.application_id, Application.candidate_id, Application.rating, Application.current_stage,
+        Application.total_experience_years, Application.has_current_position, Application.experience_summary_at
+    ).filter(Application.opening_id == opening.opening_id)
+    if not include_rejected:
+        query = query.filter(Application.status != ApplicationStatus.REJECTED)
+    rows = query.order_by(Application.application_id).all()
+
+    count = len(rows)
+    application_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+    candidate_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+    ratings = np.fromiter((np.nan if row[2] is None else row[2] for row in rows), dtype=np.float64, count=count)
+
+    stages = lookups.get_role_stages(db, opening.role_id)
+    progress_by_stage = {stage.stage_id: (position + 1) / len(stages) for position, stage in enumerate(stages)}
+    stage_progress = np.fromiter((progress_by_stage.get(row[3], 0.0) for row in rows), dtype=np.float64, count=count)
+
+    # Summaries with a current position are as of experience_summary_at; add the time since
+    now_ts = now.timestamp()
+    experience_years = np.fromiter((np.nan if row[4] is None else row[4] for row in rows), dtype=np.float64, count=count)
+    elapsed = np.fromiter(
+        (now_ts - row[6].timestamp() if row[5] and row[6] else 0.0 for row in rows), dtype=np.float64, count=count
+    )
+    experience_years += np.clip(elapsed, 0.0, None) / SECONDS_PER_YEAR
+    missing = np.isnan(experience_years)
+
+    keywords = extract_keywords(opening.requirements)
+    keyword_columns = {keyword: column for column, keyword in enumerate(keywords)}
+    keyword_hits = np.zeros((count, len(keywords)), dtype=bool)
+
+    if keyword_columns or missing.any():
+        experience_query = db.query(
+            Experience.application_id, Experience.start_date, Experience.end_date,
+            Experience.position, Experience.description
+        )
+        if keyword_columns:
+            experience_query = experience_query.join(
+                Application, Application.application_id == Experience.application_id
+            ).filter(Application.opening_id == opening.opening_id)
+        else:
+            experience_query = experience_query.filter(
+                Experience.application_id.in_(application_ids[missing].tolist())
+            )
+
+        unsummarized = {}
+        for application_id, start, end, position, description in experience_query:
+            index = np.searchsorted(application_ids, application_id)
+            # Experiences of excluded (rejected) applications have no matching application
+            if index >= count or application_ids[index] != application_id:
+                continue
+            if missing[index]:
+                unsummarized.setdefault(index, []).append((start, end, position))
+            for token in tokenize(f"{position} {description or ''}"):
+                column = keyword_columns.get(token)
+                if column is not None:
+                    keyword_hits[index, column] = True
+
+        for index in np.flatnonzero(missing):
+            experience_years[index] = summarize(unsummarized.get(index, []), now).total_years
+
+    return ApplicantFeatures(
+        application_ids, candidate_ids, experience_years, ratings, stage_progress, keyword_hits, keywords
+    )
@@ -0,0 +1,154 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from typing import BinaryIO, List, NamedTuple, Optional
+
+# Uploaded files are stored by the SHA-256 of their content, so identical
+# uploads share one file on disk. Only the short key is kept in the database.
+STORAGE_DIR = os.getenv("STORAGE_DIR", "./storage")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "256"))
+
+CHUNK_SIZE = 64 * 1024
+
+# Types served inline; any other file is sent as a download of application/octet-stream,
+# so an uploaded HTML or SVG file can't run script on this site
+INLINE_MEDIA_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "application/pdf"}
+
+# "<sha256 hex>" optionally followed by the original file extension, e.g. "9f86d0...0a08.pdf"
+KEY_PATTERN = re.compile(r"^([0-9a-f]{64})(\.[a-z0-9]{1,10})?$")
+
+
+class StoredFile(NamedTuple):
+    key: str
+    size: int
+    created: bool
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+def is_key(value: Optional[str]) -> bool:
+    """Whether a value is a storage key (rather than e.g. a legacy URL)."""
+    return bool(value) and KEY_PATTERN.match(value) is not None
+
+
+def parse_keys(value: Optional[str]) -> List[str]:
+    """Split a comma-separated list of keys (as kept in Application.attachments)."""
+    if not value:
+        return []
+    return [key for key in (part.strip() for part in value.split(",")) if is_key(key)]
+
+
+def with_key(value: Optional[str], key: str) -> str:
+    """
+    Add a key to a comma-separated list of attachments (unless it is there
+    already). Legacy entries that aren't keys (URLs, base64 data) are kept as
+    they are.
+    """
+    if key in parse_keys(value):
+        return value
+    return f"{value},{key}" if value else key
+
+
+def without_key(value: Optional[str], key: str) -> Optional[str]:
+    """Remove a key from a comma-separated list of attachments, keeping every other entry as it is."""
+    parts = [part for part in (value or "").split(",") if part.strip() != key]
+    return ",".join(parts) or None
+
+
+def media_type_for(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class ContentStore:
+    """Content-addressed file store on the local disk."""
+
+    def __init__(self, root: str = STORAGE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Location of a blob; two levels of fan-out keep directories small."""
+        digest = KEY_PATTERN.match(key).group(1)
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def thumbnail_path(self, key: str, size: int = THUMBNAIL_SIZE) -> str:
+        digest = KEY_PATTERN.match(key).group(1)
+        return os.path.join(self.root, "thumbnails", digest[:2], f"{digest}_{size}.jpg")
+
+    def exists(self, key: str) -> bool:
+        return is_key(key) and os.path.exists(self.path(key))
+
+    def put(self, file: BinaryIO, filename: Optional[str] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredFile:
+        """
+        Store a file, hashing it while it is copied to a temporary file.
+
+        If a blob with the same content already exists the copy is discarded.
+        """
+        extension = os.path.splitext(filename or "")[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+            extension = ""
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"))
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                while True:
+                    chunk = file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"File exceeds the {max_bytes} byte limit")
+                    digest.update(chunk)
+                    temp.write(chunk)
+
+            key = digest.hexdigest() + extension
+            path = self.path(key)
+            if os.path.exists(path):
+                os.remove(temp_path)
+                return StoredFile(key, size, False)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Atomic, so concurrent uploads of the same content are harmless
+            os.replace(temp_path, path)
+            return StoredFile(key, size, True)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+_store: Optional[ContentStore] = None
+
+
+def get_store() -> ContentStore:
+    """Return the process-wide content store."""
+    global _store
+    if _store is None:
+        _store = ContentStore()
+    return _store
+
+
+def create_thumbnail(key: str, size: int = THUMBNAIL_SIZE) -> str:
+    """Write a JPEG thumbnail of an image blob and return its path. Requires Pillow."""
+    from PIL import Image
+
+    store = get_store()
+    path = store.thumbnail_path(key, size)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with Image.open(store.path(key)) as image:
+        image.thumbnail((size, size))
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(store.root, "tmp"), suffix=".jpg")
+        with os.fdopen(fd, "wb") as temp:
+            image.convert("RGB").save(temp, "JPEG", quality=85)
+    os.replace(temp_path, path)
+    return path
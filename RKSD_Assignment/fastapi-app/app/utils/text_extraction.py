@@ -0,0 +1,301 @@
+import argparse
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+# Text extraction runs in worker processes; keep this module's imports light
+# because every spawned process imports it.
+EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", "0")) or os.cpu_count() or 1
+EXTRACTION_CHUNK_SIZE = int(os.getenv("EXTRACTION_CHUNK_SIZE", "64"))
+MAX_TEXT_CHARS = int(os.getenv("EXTRACTION_MAX_TEXT_CHARS", "1000000"))
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def extract_pdf(path: str) -> str:
+    """Extract the text layer of a PDF (requires pypdf)."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_docx(path: str) -> str:
+    """Extract paragraph text from a DOCX file by streaming word/document.xml."""
+    paragraphs = []
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as document:
+        current = []
+        for event, element in ElementTree.iterparse(document, events=("end",)):
+            if element.tag == f"{WORD_NAMESPACE}t" and element.text:
+                current.append(element.text)
+            elif element.tag == f"{WORD_NAMESPACE}p":
+                paragraphs.append("".join(current))
+                current = []
+                element.clear()
+    return "\n".join(paragraphs)
+
+
+def extract_plain(path: str) -> str:
+    with open(path, encoding="utf-8", errors="replace") as file:
+        return file.read(MAX_TEXT_CHARS * 2)
+
+
+EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".docx": extract_docx,
+    ".txt": extract_plain,
+}
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalize, drop control characters and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text)
+    text = "".join(char if char.isprintable() or char.isspace() else " " for char in text)
+    return re.sub(r"\s+", " ", text).strip()[:MAX_TEXT_CHARS]
+
+
+def extract_file(path: str, extension: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract and normalize the text of one file; returns (text, error)."""
+    try:
+        return normalize_text(EXTRACTORS[extension](path)), None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_attachment_keys(db) -> Iterator[str]:
+    """Yield every distinct attachment key referenced by an application."""
+    from app.models.application import Application
+    from app.utils.storage import parse_keys
+
+    seen = set()
+    query = (
+        db.query(Application.attachments)
+        .filter(Application.attachments.isnot(None))
+        .execution_options(yield_per=1000)
+    )
+    for (attachments,) in query:
+        for key in parse_keys(attachments):
+            if key[:64] not in seen:
+                seen.add(key[:64])
+                yield key
+
+
+def _new_pool(processes: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max(processes, 1), mp_context=multiprocessing.get_context("spawn"))
+
+
+def extract_files(pool: ProcessPoolExecutor, processes: int, files: List[Tuple[str, str]],
+                  extract: Callable[[str, str], Tuple[Optional[str], Optional[str]]] = extract_file
+                  ) -> Tuple[ProcessPoolExecutor, List[Tuple[Optional[str], Optional[str]]]]:
+    """
+    Extract (path, extension) pairs in the pool; returns the pool to use from
+    now on and (text, error) per file.
+
+    A process that dies mid-file breaks the whole pool and fails every file
+    still pending in it. Those files are retried one at a time in a new pool,
+    so only a file that kills its process again is recorded as failed.
+    """
+    futures = []
+    for path, extension in files:
+        try:
+            futures.append(pool.submit(extract, path, extension))
+        except BrokenProcessPool:
+            futures.append(None)
+
+    results: List[Optional[Tuple[Optional[str], Optional[str]]]] = [None] * len(files)
+    for index, future in enumerate(futures):
+        try:
+            results[index] = future.result() if future is not None else None
+        except BrokenProcessPool:
+            pass
+
+    retry = [index for index, result in enumerate(results) if result is None]
+    broken = bool(retry)
+    for index in retry:
+        if broken:
+            pool.shutdown(wait=False)
+            pool = _new_pool(processes)
+        try:
+            results[index] = pool.submit(extract, *files[index]).result()
+            broken = False
+        except BrokenProcessPool:
+            results[index] = (None, "BrokenProcessPool: the extraction process exited while reading this file")
+            broken = True
+    if broken:
+        pool.shutdown(wait=False)
+        pool = _new_pool(processes)
+    return pool, results
+
+
+def index_texts(db, rows: List[dict]):
+    """Add extracted texts to the full-text index (PostgreSQL maintains its GIN index itself)."""
+    from sqlalchemy import text
+
+    entries = [{"content_hash": row["content_hash"], "text": row["text"]} for row in rows if row["text"]]
+    if db.get_bind().dialect.name == "sqlite" and entries:
+        db.execute(
+            text("INSERT INTO attachment_search (content_hash, text) VALUES (:content_hash, :text)"),
+            entries
+        )
+
+
+def run_extraction(keys: Optional[List[str]] = None, processes: int = EXTRACTION_PROCESSES,
+                   on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Extract the text of attachments that haven't been processed yet.
+
+    Extracts the given keys, or every attachment referenced by an application
+    when `keys` is None. Files whose content hash is already in
+    attachment_texts are skipped. Files are extracted in a process pool, one
+    chunk at a time, and each chunk is stored and indexed in one transaction;
+    a file whose extraction kills its process is stored with an error.
+    """
+    from app.database.connection import SessionLocal, insert_for
+    from app.models.attachment_text import AttachmentText
+    from app.utils.storage import get_store, media_type_for
+
+    store = get_store()
+    summary = {"extracted": 0, "failed": 0, "skipped": 0, "seconds": 0.0, "files_per_second": 0.0}
+    started = time.monotonic()
+
+    def update_throughput():
+        summary["seconds"] = round(time.monotonic() - started, 3)
+        processed = summary["extracted"] + summary["failed"]
+        summary["files_per_second"] = round(processed / max(summary["seconds"], 1e-6), 2)
+
+    if keys is not None:
+        processes = min(processes, len(keys))
+    # Always extract in child processes, so a parser crashing or leaking on a
+    # malformed file can't take down the process that runs the job
+    pool = _new_pool(processes)
+
+    db = SessionLocal()
+    # Applications are scanned on their own session so commits don't disturb the open cursor
+    scan_db = SessionLocal() if keys is None else None
+    try:
+        for chunk in _chunks(keys if keys is not None else iter_attachment_keys(scan_db), EXTRACTION_CHUNK_SIZE):
+            hashes = {key[:64] for key in chunk}
+            done = {
+                content_hash for (content_hash,) in
+                db.query(AttachmentText.content_hash).filter(AttachmentText.content_hash.in_(hashes))
+            }
+
+            todo = []
+            for key in chunk:
+                extension = os.path.splitext(key)[1]
+                if key[:64] in done or extension not in EXTRACTORS or not store.exists(key):
+                    summary["skipped"] += 1
+                    continue
+                done.add(key[:64])
+                todo.append((key, extension))
+            if not todo:
+                continue
+
+            pool, results = extract_files(pool, processes, [(store.path(key), extension) for key, extension in todo])
+
+            rows = [
+                {
+                    "content_hash": key[:64],
+                    "media_type": media_type_for(key),
+                    "text": text,
+                    "char_count": len(text or ""),
+                    "error": error,
+                }
+                for (key, _), (text, error) in zip(todo, results)
+            ]
+            # Another run may have stored some of these files meanwhile; keep its
+            # rows and index only the ones inserted here
+            inserted = {
+                content_hash for (content_hash,) in db.execute(
+                    insert_for(db, AttachmentText).on_conflict_do_nothing(index_elements=["content_hash"])
+                    .returning(AttachmentText.content_hash),
+                    rows
+                )
+            }
+            rows = [row for row in rows if row["content_hash"] in inserted]
+            index_texts(db, rows)
+            db.commit()
+
+            summary["skipped"] += len(todo) - len(rows)
+            for row in rows:
+                summary["failed" if row["error"] else "extracted"] += 1
+            update_throughput()
+            if on_progress:
+                on_progress(summary)
+    finally:
+        db.close()
+        if scan_db:
+            scan_db.close()
+        pool.shutdown()
+
+    update_throughput()
+    return summary
+
+
+def search_attachments(db, query: str, limit: int = 20) -> List[Tuple[str, str]]:
+    """Full-text search over extracted attachment text; returns (content_hash, snippet) pairs."""
+    from sqlalchemy import text
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Quote every word so user input can't inject FTS5 query syntax
+        terms = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+        if not terms:
+            return []
+        rows = db.execute(
+            text(
+                "SELECT content_hash, snippet(attachment_search, 1, '[', ']', '...', 16) "
+                "FROM attachment_search WHERE attachment_search MATCH :terms ORDER BY rank LIMIT :limit"
+            ),
+            {"terms": terms, "limit": limit}
+        )
+    elif dialect == "postgresql":
+        rows = db.execute(
+            text(
+                "SELECT content_hash, ts_headline('english', text, query, 'MaxWords=30, MinWords=10') "
+                "FROM attachment_texts, plainto_tsquery('english', :query) query "
+                "WHERE to_tsvector('english', coalesce(text, '')) @@ query "
+                "ORDER BY ts_rank(to_tsvector('english', coalesce(text, '')), query) DESC LIMIT :limit"
+            ),
+            {"query": query, "limit": limit}
+        )
+    else:
+        rows = db.execute(
+            text("SELECT content_hash, substr(text, 1, 200) FROM attachment_texts WHERE text LIKE :pattern LIMIT :limit"),
+            {"pattern": f"%{query}%", "limit": limit}
+        )
+    return [(row[0], row[1]) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract text from application attachments for search")
+    parser.add_argument("--processes", type=int, default=EXTRACTION_PROCESSES)
+    args = parser.parse_args()
+
+    summary = run_extraction(processes=args.processes, on_progress=lambda progress: print(
+        f"{progress['extracted']} extracted, {progress['failed']} failed, {progress['skipped']} skipped "
+        f"({progress['files_per_second']} files/s)"
+    ))
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
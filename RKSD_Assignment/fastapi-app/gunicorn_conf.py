@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for running the API in production.
+
+Usage:
+    gunicorn -c gunicorn_conf.py app.main:app
+
+Every setting can be overridden through the environment variables below.
+"""
+import multiprocessing
+import os
+
+# Socket
+bind = os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+backlog = int(os.getenv("BACKLOG", "2048"))
+
+# Workers - one per CPU core by default
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "app.server.ProductionUvicornWorker"
+
+# Recycle workers periodically so slow leaks (e.g. in PDF generation) can't accumulate
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+# Timeouts
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+timeout = int(os.getenv("TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+# Logging
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = os.getenv("ERROR_LOG", "-")
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Migrate the schema once in the master, before any worker is forked."""
+    from app.database.migrations import upgrade_schema
+
+    upgrade_schema()
+    # Workers inherit the environment, so they skip the startup migration
+    os.environ["DB_INIT_ON_STARTUP"] = "false"
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master; each worker opens its own."""
+    from app.database.connection import engine
+
+    engine.dispose(close=False)
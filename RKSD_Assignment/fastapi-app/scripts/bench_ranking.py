@@ -0,0 +1,60 @@
+"""
+Benchmark for opening applicant ranking.
+
+Builds random ranking features for a large number of applicants and times
+scoring all of them and selecting the top K, which is the work done by
+`GET /openings/{opening_id}/ranking` once the features are loaded.
+
+Usage:
+    python scripts/bench_ranking.py [--applicants 100000] [--keywords 20] [--top-k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.ranking import ApplicantFeatures, score_applicants, top_k  # noqa: E402
+
+
+def generate(applicants, keywords, seed=7):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(1, 6, applicants).astype(np.float64)
+    ratings[rng.random(applicants) < 0.3] = np.nan
+    return ApplicantFeatures(
+        application_ids=np.arange(1, applicants + 1, dtype=np.int64),
+        candidate_ids=np.arange(1, applicants + 1, dtype=np.int64),
+        experience_years=rng.gamma(2.0, 2.5, applicants),
+        ratings=ratings,
+        stage_progress=rng.integers(1, 6, applicants) / 5,
+        keyword_hits=rng.random((applicants, keywords)) < 0.2,
+        keywords=[f"keyword{i}" for i in range(keywords)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", type=int, default=100_000)
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    features = generate(args.applicants, args.keywords)
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        scores = score_applicants(features, experience_required=3)
+        best = top_k(scores, args.top_k)
+        timings.append(time.perf_counter() - started)
+
+    print(f"applicants: {args.applicants}, keywords: {args.keywords}, top {args.top_k}")
+    print(f"score + top-k: {min(timings) * 1000:.1f} ms (best of {args.runs})")
+    print(f"best score: {scores[best[0]]:.4f}, application {features.application_ids[best[0]]}")
+
+
+if __name__ == "__main__":
+    main()
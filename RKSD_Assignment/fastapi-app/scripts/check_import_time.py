@@ -0,0 +1,74 @@
+"""
+Import-time regression check for the API.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and fails
+if the import takes longer than the budget or pulls in a module that is meant
+to be loaded lazily (ReportLab, Alembic, NumPy).
+
+Usage:
+    python scripts/check_import_time.py [--budget-ms 2500] [--runs 3]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported when the app is imported
+LAZY_MODULES = ["reportlab", "alembic", "numpy"]
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module):
+    """Import `module` in a fresh interpreter; return {name: cumulative_us} for every import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            imports[match.group(4)] = int(match.group(2))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500")))
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N runs to reduce noise")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to print")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    imports = min(runs, key=lambda run: run.get(args.module, 0))
+    total_ms = imports.get(args.module, 0) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    print("Slowest imports (cumulative):")
+    for name, cumulative in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    for lazy in LAZY_MODULES:
+        if lazy in imports:
+            failures.append(f"'{lazy}' is imported eagerly; it should only be imported on first use")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
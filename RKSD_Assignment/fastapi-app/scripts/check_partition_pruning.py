@@ -0,0 +1,82 @@
+"""
+Check that the by-month report only scans one partition of a partitioned
+applications table.
+
+Runs EXPLAIN on the query behind `POST /applications/by-month/detailed` for
+the given month against DATABASE_URL (PostgreSQL, after
+`python -m app.utils.partitions convert` or the migration with
+PARTITION_APPLICATIONS=true) and lists the applications partitions in the
+plan. Exits with status 1 if any partition besides that month's is scanned.
+
+Usage:
+    python scripts/check_partition_pruning.py [--year 2026] [--month 10] [--status All]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, text  # noqa: E402
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.routes.application import detailed_by_month_query  # noqa: E402
+from app.schemas.application import ApplicationsByMonthRequest  # noqa: E402
+from app.utils.partitions import (  # noqa: E402
+    DEFAULT_PARTITION, is_partitioned, list_partitions, month_bounds, partition_name
+)
+
+
+def scanned_relations(plan: dict) -> list:
+    relations = [plan["Relation Name"]] if "Relation Name" in plan else []
+    for child in plan.get("Plans", []):
+        relations.extend(scanned_relations(child))
+    return relations
+
+
+def explain(db, request: ApplicationsByMonthRequest) -> list:
+    # Compiled with :name placeholders so text() can bind the query's own typed parameters
+    dialect = type(db.get_bind().dialect)(paramstyle="named")
+    compiled = detailed_by_month_query(db, request).statement.compile(dialect=dialect)
+    params = [bindparam(name, value, type_=compiled.binds[name].type) for name, value in compiled.params.items()]
+    plan = db.execute(text("EXPLAIN (FORMAT JSON) " + str(compiled)).bindparams(*params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return scanned_relations(plan[0]["Plan"])
+
+
+def main():
+    now = datetime.now()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, default=now.year)
+    parser.add_argument("--month", type=int, default=now.month)
+    parser.add_argument("--status", default="All")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db.connection()):
+            sys.exit("The applications table isn't partitioned (PostgreSQL only)")
+        partitions = set(list_partitions(db.connection()))
+        start, _ = month_bounds(args.year, args.month)
+        expected = partition_name(start) if partition_name(start) in partitions else DEFAULT_PARTITION
+
+        request = ApplicationsByMonthRequest(year=args.year, month=args.month, status_filter=args.status)
+        scanned = sorted(set(explain(db, request)) & partitions)
+        unfiltered = sorted(set(explain(db, ApplicationsByMonthRequest(status_filter=args.status))) & partitions)
+    finally:
+        db.close()
+
+    print(f"partitions: {len(partitions)}")
+    print(f"without a month: {len(unfiltered)} scanned")
+    print(f"{args.year}-{args.month:02d}: {', '.join(scanned) or 'none'} scanned (expected {expected})")
+    if scanned != [expected]:
+        print("partition pruning FAILED")
+        sys.exit(1)
+    print("partition pruning OK")
+
+
+if __name__ == "__main__":
+    main()
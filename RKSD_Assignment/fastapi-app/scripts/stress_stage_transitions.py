@@ -0,0 +1,111 @@
+"""
+Concurrency stress test for application stage transitions.
+
+Against a running API (ideally several workers), resets an application to the
+first stage of its role and then:
+
+1. sends one 'next' click per remaining stage, all at once and without
+   If-Match: every click has to be applied exactly once, so the application
+   must end on the last stage with its version raised by the number of clicks;
+2. sends the same number of 'next' clicks at once, all with the ETag read
+   before them: exactly one may succeed and the others must get 412.
+
+Any 5xx, or a lost or doubled transition, fails the run (exit status 1).
+The application is modified; use a test database.
+
+Usage:
+    python scripts/stress_stage_transitions.py --application-id 1 [--url http://localhost:8000] [--rounds 5]
+"""
+import argparse
+import sys
+import threading
+from collections import Counter
+
+import httpx
+
+
+def click_all(url: str, count: int, headers: dict) -> Counter:
+    """Send `count` 'next' clicks from as many threads, released together."""
+    barrier = threading.Barrier(count)
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def click():
+        with httpx.Client(timeout=30) as client:
+            barrier.wait()
+            response = client.post(url, json={"action": "next"}, headers=headers)
+        with lock:
+            statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=click) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def run_round(client: httpx.Client, base: str, application_id: int) -> list:
+    errors = []
+    details = client.get(f"{base}/{application_id}/details").raise_for_status().json()
+    stages = sorted(details["role_stages"], key=lambda stage: stage["stage_sequence"])
+    if len(stages) < 2:
+        sys.exit(f"The role of application {application_id} needs at least two stages")
+    clicks = len(stages) - 1
+
+    # Reset to the first stage
+    client.put(
+        f"{base}/{application_id}", json={"current_stage": stages[0]["stage_id"], "status": "pending"}
+    ).raise_for_status()
+    before = client.get(f"{base}/{application_id}").raise_for_status()
+
+    statuses = click_all(f"{base}/{application_id}/update-stage", clicks, {})
+    after = client.get(f"{base}/{application_id}").raise_for_status().json()
+    if statuses[200] != clicks:
+        errors.append(f"without If-Match: {dict(statuses)} (expected {clicks} x 200)")
+    if after["current_stage"] != stages[-1]["stage_id"] or after["status"] != "pending":
+        errors.append(f"without If-Match: ended on stage {after['current_stage']} / {after['status']}, "
+                      f"expected stage {stages[-1]['stage_id']} / pending")
+    if after["version"] != before.json()["version"] + clicks:
+        errors.append(f"without If-Match: version {before.json()['version']} -> {after['version']}, "
+                      f"expected +{clicks}")
+
+    # Same clicks again, all made against the same version
+    client.put(
+        f"{base}/{application_id}", json={"current_stage": stages[0]["stage_id"], "status": "pending"}
+    ).raise_for_status()
+    etag = client.get(f"{base}/{application_id}").raise_for_status().headers["ETag"]
+    statuses = click_all(f"{base}/{application_id}/update-stage", clicks, {"If-Match": etag})
+    after = client.get(f"{base}/{application_id}").raise_for_status().json()
+    if statuses[200] != 1 or statuses[412] != clicks - 1:
+        errors.append(f"with If-Match: {dict(statuses)} (expected 1 x 200, {clicks - 1} x 412)")
+    if after["current_stage"] != stages[1]["stage_id"]:
+        errors.append(f"with If-Match: ended on stage {after['current_stage']}, expected {stages[1]['stage_id']}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--application-id", type=int, required=True)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    base = f"{args.url.rstrip('/')}/applications"
+    failures = 0
+    with httpx.Client(timeout=30) as client:
+        for number in range(1, args.rounds + 1):
+            errors = run_round(client, base, args.application_id)
+            failures += bool(errors)
+            print(f"round {number}: {'OK' if not errors else 'FAILED'}")
+            for error in errors:
+                print(f"  {error}")
+
+    if failures:
+        print(f"{failures} of {args.rounds} rounds FAILED")
+        sys.exit(1)
+    print("stage transitions OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+# Settings are read when the app modules are imported, so point everything at a
+# scratch directory and switch off the background threads first. Admission control
+# is off too, or its rate limits would throttle the test client; the admission tests
+# build middleware of their own.
+TEST_DIR = tempfile.mkdtemp(prefix="recruitment-api-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "JOBS_DB_PATH": os.path.join(TEST_DIR, "jobs.db"),
+    "JOB_RESULTS_DIR": os.path.join(TEST_DIR, "job_results"),
+    "STORAGE_DIR": os.path.join(TEST_DIR, "storage"),
+    "JOB_WORKERS": "0",
+    "SCHEDULER_ENABLED": "false",
+    "EVENT_POLL_SECONDS": "0",
+    "PDF_WARM_UP": "false",
+    "ADMISSION_ENABLED": "false",
+})
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.database.migrations import upgrade_schema  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.application import Application  # noqa: E402
+from app.models.candidate import Candidate  # noqa: E402
+from app.models.enums import ApplicationStatus  # noqa: E402
+from app.models.experience import Experience  # noqa: E402
+from app.models.opening import Opening  # noqa: E402
+from app.models.role import Role  # noqa: E402
+from app.models.stage import Stage  # noqa: E402
+
+_candidate_numbers = itertools.count(1)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Migrate the test database and add one role with three stages and an opening."""
+    upgrade_schema()
+    db = SessionLocal()
+    try:
+        db.add(Role(role_id=1, role_name="Developer"))
+        for sequence, name in enumerate(["Screening", "Interview", "Offer"], start=1):
+            db.add(Stage(stage_id=sequence, stage_name=name, stage_sequence=sequence, role_id=1))
+        db.add(Opening(
+            opening_id=1, title="Backend Developer", description="Build APIs", requirements="python sql",
+            salary_range="100-120k", location="Remote", is_remote=True, deadline=datetime(2030, 1, 1),
+            experience_required=2, role_id=1
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_application(db):
+    """Create a candidate with one application (and one experience) and return the application ID."""
+    def make(status: ApplicationStatus = ApplicationStatus.PENDING,
+             application_date: datetime = datetime(2025, 3, 1)) -> int:
+        number = next(_candidate_numbers)
+        candidate = Candidate(candidate_name=f"Candidate {number}", email=f"candidate{number}@example.com",
+                              phone_number=f"555{number:07d}")
+        db.add(candidate)
+        db.flush()
+        application = Application(candidate_id=candidate.candidate_id, opening_id=1, role_id=1, current_stage=1,
+                                  status=status, application_date=application_date)
+        db.add(application)
+        db.flush()
+        db.add(Experience(application_id=application.application_id, company_name="Acme", position="Developer",
+                          start_date=datetime(2018, 1, 1), end_date=datetime(2022, 1, 1)))
+        db.commit()
+        return application.application_id
+
+    return make
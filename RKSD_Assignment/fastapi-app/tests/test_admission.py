@@ -0,0 +1,125 @@
+import anyio
+import httpx
+import pytest
+
+from app.middleware.admission import AdmissionMiddleware, RouteClass
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class BlockingApp:
+    """Holds every request until `release` is set."""
+
+    def __init__(self):
+        self.release = anyio.Event()
+
+    async def __call__(self, scope, receive, send):
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+def make_client(app, host: str = "10.0.0.1") -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(host, 5000)), base_url="http://test")
+
+
+async def wait_until(condition):
+    with anyio.fail_after(5):
+        while not condition():
+            await anyio.sleep(0.001)
+
+
+async def test_request_is_shed_with_503_when_the_queue_is_full():
+    app = BlockingApp()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=1, queue_depth=0)
+    middleware = AdmissionMiddleware(app, [route_class], queue_timeout=5, enabled=True)
+    responses = []
+
+    async def get(client):
+        responses.append(await client.get("/report"))
+
+    async with make_client(middleware) as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get, client)
+            await wait_until(lambda: route_class.in_flight == 1)
+            shed = await client.get("/report")
+            app.release.set()
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "2"
+    assert responses[0].status_code == 200
+    assert route_class.metrics["shed_queue_full"] == 1
+
+
+async def test_request_is_shed_with_503_after_waiting_too_long():
+    app = BlockingApp()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=1, queue_depth=5)
+    middleware = AdmissionMiddleware(app, [route_class], queue_timeout=0.05, enabled=True)
+
+    async with make_client(middleware) as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(client.get, "/report")
+            await wait_until(lambda: route_class.in_flight == 1)
+            shed = await client.get("/report")
+            app.release.set()
+
+    assert shed.status_code == 503
+    assert route_class.metrics["shed_queue_timeout"] == 1
+    assert route_class.waiting == 0
+
+
+async def test_waiting_request_runs_when_a_slot_frees_up():
+    app = BlockingApp()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=1, queue_depth=5)
+    middleware = AdmissionMiddleware(app, [route_class], queue_timeout=5, enabled=True)
+    responses = []
+
+    async def get(client):
+        responses.append(await client.get("/report"))
+
+    async with make_client(middleware) as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get, client)
+            await wait_until(lambda: route_class.in_flight == 1)
+            tasks.start_soon(get, client)
+            await wait_until(lambda: route_class.waiting == 1)
+            app.release.set()
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert route_class.metrics["queued"] == 1
+    assert route_class.in_flight == 0
+
+
+async def test_client_over_its_token_bucket_gets_429():
+    app = BlockingApp()
+    app.release.set()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=5, queue_depth=5, rate=0.001, burst=2)
+    middleware = AdmissionMiddleware(app, [route_class], enabled=True)
+
+    async with make_client(middleware) as client:
+        statuses = [(await client.get("/report")).status_code for _ in range(3)]
+        limited = await client.get("/report")
+    async with make_client(middleware, host="10.0.0.2") as other_client:
+        other = await other_client.get("/report")
+
+    assert statuses == [200, 200, 429]
+    assert int(limited.headers["retry-after"]) >= 1
+    assert other.status_code == 200
+    assert route_class.metrics["rate_limited"] == 2
+
+
+async def test_unmatched_routes_are_not_limited():
+    app = BlockingApp()
+    app.release.set()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=1, queue_depth=0, rate=0.001, burst=1)
+    middleware = AdmissionMiddleware(app, [route_class], enabled=True)
+
+    async with make_client(middleware) as client:
+        statuses = [(await client.get("/health/live")).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 200]
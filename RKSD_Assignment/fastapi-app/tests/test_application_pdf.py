@@ -0,0 +1,42 @@
+from app.jobs.handlers import application_pdf
+from app.jobs.queue import QUEUED, get_queue
+
+
+def test_pdf_is_rendered_by_a_background_job(client, make_application):
+    application_id = make_application()
+
+    response = client.get(f"/applications/{application_id}/pdf")
+
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["location"] == f"/jobs/{job_id}/result"
+    job = get_queue().get(job_id)
+    assert job["job_type"] == "application_pdf"
+    assert job["status"] == QUEUED
+    assert job["payload"] == {"application_id": application_id}
+
+
+def test_pdf_of_a_missing_application_is_404(client):
+    assert client.get("/applications/999999/pdf").status_code == 404
+    assert client.get("/applications/999999/pdf", params={"inline": True}).status_code == 404
+
+
+def test_pdf_can_still_be_rendered_inline(client, make_application):
+    application_id = make_application()
+
+    response = client.get(f"/applications/{application_id}/pdf", params={"inline": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+
+
+def test_pdf_job_writes_the_file(make_application, tmp_path):
+    application_id = make_application()
+    output_path = tmp_path / "output"
+
+    output = application_pdf({"application_id": application_id}, str(output_path))
+
+    assert output.media_type == "application/pdf"
+    assert output.filename.endswith(".pdf")
+    assert output_path.read_bytes().startswith(b"%PDF")
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+from app.database.connection import SessionLocal, engine
+from app.models.application import Application
+from app.routes import application as application_routes
+
+
+@contextmanager
+def concurrent_updates(application_id: int, times: int):
+    """
+    Bump the application's version from another connection right before the
+    next `times` commits, as a request committing first would.
+    """
+    remaining = times
+
+    def bump(session):
+        nonlocal remaining
+        if remaining > 0:
+            remaining -= 1
+            with engine.begin() as connection:
+                connection.execute(
+                    text("UPDATE applications SET version = version + 1 WHERE application_id = :id"),
+                    {"id": application_id}
+                )
+
+    event.listen(SessionLocal, "before_commit", bump)
+    try:
+        yield
+    finally:
+        event.remove(SessionLocal, "before_commit", bump)
+
+
+def current_version(db, application_id: int) -> int:
+    db.expire_all()
+    return db.get(Application, application_id).version
+
+
+def test_get_returns_the_version_as_etag(client, make_application):
+    application_id = make_application()
+
+    response = client.get(f"/applications/{application_id}")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"1"'
+
+
+def test_update_with_current_if_match_succeeds(client, make_application):
+    application_id = make_application()
+    etag = client.get(f"/applications/{application_id}").headers["etag"]
+
+    response = client.put(f"/applications/{application_id}", json={"status": "accepted"}, headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "accepted"
+    assert response.headers["etag"] == '"2"'
+
+
+def test_update_with_stale_if_match_is_refused_with_412(client, db, make_application):
+    application_id = make_application()
+    etag = client.get(f"/applications/{application_id}").headers["etag"]
+    client.put(f"/applications/{application_id}", json={"current_stage": 2})
+
+    response = client.put(f"/applications/{application_id}", json={"status": "rejected"}, headers={"If-Match": etag})
+
+    assert response.status_code == 412
+    db.expire_all()
+    assert db.get(Application, application_id).status.value == "pending"
+
+
+def test_concurrent_change_with_if_match_is_refused_with_412(client, make_application):
+    application_id = make_application()
+    etag = client.get(f"/applications/{application_id}").headers["etag"]
+
+    with concurrent_updates(application_id, times=1):
+        response = client.put(f"/applications/{application_id}", json={"status": "accepted"}, headers={"If-Match": etag})
+
+    assert response.status_code == 412
+
+
+def test_update_without_if_match_is_retried_after_a_concurrent_change(client, db, make_application):
+    application_id = make_application()
+
+    with concurrent_updates(application_id, times=2):
+        response = client.put(f"/applications/{application_id}", json={"status": "accepted"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "accepted"
+    # Two concurrent bumps and this update
+    assert current_version(db, application_id) == 4
+
+
+def test_update_gives_up_with_409_when_every_attempt_is_stale(client, db, make_application, monkeypatch):
+    monkeypatch.setattr(application_routes, "APPLICATION_UPDATE_ATTEMPTS", 3)
+    application_id = make_application()
+
+    with concurrent_updates(application_id, times=3):
+        response = client.put(f"/applications/{application_id}", json={"status": "accepted"})
+
+    assert response.status_code == 409
+    assert current_version(db, application_id) == 4
+    assert db.get(Application, application_id).status.value == "pending"
+
+
+def test_stale_write_outside_the_retry_loop_is_answered_with_409(client, make_application):
+    application_id = make_application()
+
+    # DELETE has no retry loop of its own; the StaleDataError handler answers for it
+    with concurrent_updates(application_id, times=1):
+        response = client.delete(f"/applications/{application_id}")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "The record was modified by another request, try again"
+
+
+def test_weak_if_match_never_matches(client, make_application):
+    application_id = make_application()
+
+    response = client.put(f"/applications/{application_id}", json={"status": "accepted"}, headers={"If-Match": 'W/"1"'})
+
+    assert response.status_code == 412
+
+
+def test_if_match_star_matches_any_version(client, make_application):
+    application_id = make_application()
+    client.put(f"/applications/{application_id}", json={"current_stage": 2})
+
+    response = client.put(f"/applications/{application_id}", json={"status": "accepted"}, headers={"If-Match": "*"})
+
+    assert response.status_code == 200
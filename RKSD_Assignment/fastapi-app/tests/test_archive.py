@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app.models.application import Application
+from app.models.archived_application import ArchivedApplication
+from app.models.archived_experience import ArchivedExperience
+from app.models.enums import ApplicationStatus
+from app.models.experience import Experience
+from app.models.outbox_event import OutboxEvent
+from app.utils.archive import archive_applications, archive_batch, restore_applications
+
+
+def is_live(db, application_id: int) -> bool:
+    db.expire_all()
+    return db.get(Application, application_id) is not None
+
+
+def is_archived(db, application_id: int) -> bool:
+    return db.get(ArchivedApplication, application_id) is not None
+
+
+def archive_everything_final():
+    # A cutoff in the future takes every accepted and rejected application
+    return archive_applications(older_than_days=0, now=datetime.now() + timedelta(days=1))
+
+
+def test_only_final_applications_past_the_cutoff_are_archived(db, make_application):
+    accepted = make_application(ApplicationStatus.ACCEPTED)
+    pending = make_application(ApplicationStatus.PENDING)
+
+    assert archive_applications(older_than_days=3650)["archived"] == 0
+    summary = archive_everything_final()
+
+    assert summary["archived"] >= 1
+    assert not is_live(db, accepted)
+    assert is_archived(db, accepted)
+    assert db.query(ArchivedExperience).filter(ArchivedExperience.application_id == accepted).count() == 1
+    assert db.query(Experience).filter(Experience.application_id == accepted).count() == 0
+    assert is_live(db, pending)
+
+
+def test_archived_applications_are_still_read(client, make_application):
+    application_id = make_application(ApplicationStatus.REJECTED)
+    archive_everything_final()
+
+    response = client.get(f"/applications/{application_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "rejected"
+
+    details = client.get(f"/applications/{application_id}/details")
+    assert details.status_code == 200
+    assert len(details.json()["experiences"]) == 1
+
+    report = client.post("/applications/by-month/detailed", json={"year": 2025, "month": 3}).json()
+    assert application_id in [row["application_id"] for row in report]
+    live_only = client.post("/applications/by-month/detailed", json={"year": 2025, "month": 3, "include_archived": False})
+    assert application_id not in [row["application_id"] for row in live_only.json()]
+
+
+def test_archived_applications_cannot_be_updated(client, make_application):
+    application_id = make_application(ApplicationStatus.ACCEPTED)
+    archive_everything_final()
+
+    response = client.put(f"/applications/{application_id}", json={"status": "pending"})
+
+    assert response.status_code == 404
+
+
+def test_restore_moves_applications_back(client, db, make_application):
+    application_id = make_application(ApplicationStatus.ACCEPTED)
+    archive_everything_final()
+    before = datetime.now()
+
+    summary = restore_applications([application_id, 999999])
+
+    assert summary == {"restored": [application_id], "not_archived": [999999]}
+    assert is_live(db, application_id)
+    assert not is_archived(db, application_id)
+    assert db.query(Experience).filter(Experience.application_id == application_id).count() == 1
+    # Restored applications aren't archived again until the archive period has passed
+    assert db.get(Application, application_id).updated_at >= before.replace(microsecond=0)
+    assert client.put(f"/applications/{application_id}", json={"status": "rejected"}).status_code == 200
+
+
+def test_archive_and_restore_appear_in_the_change_feed(db, make_application):
+    application_id = make_application(ApplicationStatus.ACCEPTED)
+    after = db.query(func.max(OutboxEvent.seq)).scalar()
+
+    archive_everything_final()
+    restore_applications([application_id])
+
+    operations = [
+        operation for (operation,) in db.query(OutboxEvent.operation)
+        .filter(OutboxEvent.seq > after, OutboxEvent.entity == "application", OutboxEvent.entity_id == application_id)
+        .order_by(OutboxEvent.seq)
+    ]
+    assert operations == ["deleted", "created"]
+
+
+def test_application_changed_after_it_was_selected_stays_live(db, make_application):
+    application_id = make_application(ApplicationStatus.ACCEPTED)
+    after = db.query(func.max(OutboxEvent.seq)).scalar()
+    now = datetime.now() + timedelta(days=1)
+    # A request reopens the application between the archive run's select and its move
+    application = db.get(Application, application_id)
+    application.status = ApplicationStatus.PENDING
+    db.commit()
+
+    assert archive_batch(db, [application_id], now, cutoff=now) == 0
+    db.commit()
+
+    assert is_live(db, application_id)
+    assert not is_archived(db, application_id)
+    assert db.query(Experience).filter(Experience.application_id == application_id).count() == 1
+    assert db.query(OutboxEvent).filter(
+        OutboxEvent.seq > after, OutboxEvent.entity == "application", OutboxEvent.operation == "deleted"
+    ).count() == 0
@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database.connection import engine
+from app.models.role import Role
+from app.routes import batch as batch_routes
+from app.utils.loader import Loader
+
+
+@contextmanager
+def recorded_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def batch(client, *requests):
+    response = client.post("/batch", json={"requests": list(requests)})
+    assert response.status_code == 200
+    return response.json()["responses"]
+
+
+def test_sub_requests_are_answered_in_order(client, make_application):
+    application_id = make_application()
+
+    responses = batch(
+        client,
+        {"id": "application", "path": f"/applications/{application_id}/details"},
+        {"id": "stage", "path": "/stages/2"},
+        {"id": "missing", "path": "/candidates/999999"},
+    )
+
+    assert [(response["id"], response["status"]) for response in responses] == [
+        ("application", 200), ("stage", 200), ("missing", 404)
+    ]
+    assert responses[0]["body"]["application_id"] == application_id
+    assert responses[1]["body"]["stage_name"] == "Interview"
+
+
+def test_identical_sub_requests_run_once(client):
+    with recorded_statements() as statements:
+        responses = batch(
+            client,
+            {"id": "a", "path": "/openings/?skip=0&limit=5"},
+            {"id": "b", "path": "/openings/?limit=5&skip=0"},
+        )
+
+    assert [response["status"] for response in responses] == [200, 200]
+    assert responses[0]["body"] == responses[1]["body"]
+    assert len([statement for statement in statements if "FROM openings" in statement]) == 1
+
+
+def test_lookups_by_id_are_batched_across_sub_requests(client, make_application, monkeypatch):
+    # Generous, so that slow test machines still collect both lookups
+    monkeypatch.setattr(batch_routes, "BATCH_LOADER_DELAY", 0.2)
+    ids = [make_application(), make_application()]
+
+    with recorded_statements() as statements:
+        responses = batch(client, *({"path": f"/applications/{application_id}"} for application_id in ids))
+
+    assert [response["body"]["application_id"] for response in responses] == ids
+    assert len([statement for statement in statements if "FROM applications" in statement]) == 1
+
+
+def test_only_batchable_gets_are_run(client):
+    responses = batch(
+        client,
+        {"id": "post", "method": "POST", "path": "/candidates/"},
+        {"id": "report", "path": "/applications/by-month/detailed"},
+        {"id": "stages", "path": "/stages/"},
+    )
+
+    assert [response["status"] for response in responses] == [405, 400, 200]
+    assert responses[0]["body"]["detail"] == "Only GET requests can be batched"
+
+
+def test_a_failing_sub_request_does_not_affect_the_others(client, make_application, monkeypatch):
+    application_id = make_application()
+    fetch = Loader._fetch
+
+    def fail_for_roles(self, model, keys):
+        if model is Role:
+            raise RuntimeError("role lookup failed")
+        return fetch(self, model, keys)
+
+    monkeypatch.setattr(Loader, "_fetch", fail_for_roles)
+
+    responses = batch(
+        client,
+        {"id": "role", "path": "/roles/1"},
+        {"id": "application", "path": f"/applications/{application_id}"},
+        {"id": "stages", "path": "/stages/"},
+    )
+
+    assert [response["status"] for response in responses] == [500, 200, 200]
+    assert responses[0]["body"] == {"detail": "Internal Server Error"}
+    assert responses[1]["body"]["application_id"] == application_id
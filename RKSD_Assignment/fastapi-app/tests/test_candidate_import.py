@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+
+from app.jobs.handlers import candidate_import
+from app.jobs.queue import get_queue
+from app.models.candidate import Candidate
+from app.utils.candidate_import import import_candidates
+
+
+def csv_file(rows) -> io.BytesIO:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["candidate_name", "email", "phone_number"])
+    writer.writerows(rows)
+    return io.BytesIO(text.getvalue().encode())
+
+
+def xlsx_file(rows) -> io.BytesIO:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["candidate_name", "email", "phone_number"])
+    for row in rows:
+        sheet.append(row)
+    sheet.append([None, None, None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_valid_rows_are_inserted_and_the_rest_reported(client, db):
+    db.add(Candidate(candidate_name="Existing", email="import-existing@example.com", phone_number="5551110000"))
+    db.commit()
+    upload = csv_file([
+        ["Ada", "import-ada@example.com", "5551110001"],
+        ["Bad Email", "not-an-email", "5551110002"],
+        ["Ada Again", "import-ada@example.com", "5551110003"],
+        ["Existing Email", "import-existing@example.com", "5551110004"],
+        ["Grace", "import-grace@example.com", " 5551110005 "],
+    ])
+
+    response = client.post("/candidates/import", files={"file": ("candidates.csv", upload, "text/csv")})
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["processed"], summary["inserted"], summary["rejected"]) == (5, 2, 3)
+    assert [rejection["row"] for rejection in summary["rejections"]] == [3, 4, 5]
+    assert summary["rejections"][0]["errors"][0]["field"] == "email"
+    assert summary["rejections"][1]["errors"][0]["message"] == "Duplicate email earlier in the file"
+    assert summary["rejections"][2]["errors"][0]["message"] == "A candidate with this email already exists"
+    grace = db.query(Candidate).filter(Candidate.email == "import-grace@example.com").one()
+    assert grace.phone_number == "5551110005"
+
+
+def test_rows_are_imported_in_batches():
+    upload = csv_file([[f"Batch {n}", f"import-batch{n}@example.com", f"555222000{n}"] for n in range(5)])
+    progress = []
+
+    summary = import_candidates(upload, "candidates.csv", batch_size=2, on_progress=lambda s: progress.append(dict(s)))
+
+    assert summary["inserted"] == 5
+    assert summary["batches"] == 3
+    assert [step["processed"] for step in progress] == [2, 4, 5]
+
+
+def test_xlsx_files_are_imported():
+    upload = xlsx_file([["Sheet Person", "import-sheet@example.com", 5553330001]])
+
+    summary = import_candidates(upload, "candidates.xlsx")
+
+    assert (summary["processed"], summary["inserted"], summary["rejected"]) == (1, 1, 0)
+
+
+def test_unsupported_files_are_refused(client):
+    response = client.post("/candidates/import", files={"file": ("candidates.json", b"[]", "application/json")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unsupported file type")
+
+
+def test_background_import_writes_rejected_rows_to_a_report(client, tmp_path):
+    upload = csv_file([
+        ["Background", "import-background@example.com", "5554440001"],
+        ["", "import-nameless@example.com", "5554440002"],
+    ])
+
+    response = client.post(
+        "/candidates/import", params={"background": True}, files={"file": ("candidates.csv", upload, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    job = get_queue().get(response.json()["job_id"])
+    assert job["job_type"] == "candidate_import"
+    output_path = tmp_path / "rejected.csv"
+    output = candidate_import(job["payload"], str(output_path))
+    assert output.result["inserted"] == 1
+    assert output.filename == "rejected_rows.csv"
+    report = list(csv.DictReader(io.StringIO(output_path.read_text())))
+    assert [row["row"] for row in report] == ["3"]
+    # The upload is removed once imported
+    assert not os.path.exists(get_queue().upload_path(job["payload"]["upload_id"]))
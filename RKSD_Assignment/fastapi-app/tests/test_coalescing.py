@@ -0,0 +1,148 @@
+import anyio
+import httpx
+import pytest
+
+from app.middleware.admission import RateLimitMiddleware, RouteClass
+from app.middleware.coalescing import CoalescingMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class SlowApp:
+    """Answers every request with `status` once `release` is set, counting the calls."""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.calls = 0
+        self.release = anyio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        await send({"type": "http.response.start", "status": self.status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": f"call {call}".encode()})
+
+
+def find_coalescing(app) -> CoalescingMiddleware:
+    while not isinstance(app, CoalescingMiddleware):
+        app = app.app
+    return app
+
+
+async def wait_for_flight(app, followers: int = 0):
+    """Wait until a leader is running and `followers` requests are waiting for it."""
+    coalescing = find_coalescing(app)
+    with anyio.fail_after(5):
+        while coalescing.snapshot()["in_flight"] < 1 or coalescing.snapshot()["waiting"] < followers:
+            await anyio.sleep(0.001)
+
+
+async def get_concurrently(app, count: int, slow_app: SlowApp, path: str = "/report"):
+    """Send `count` identical requests, the first one alone, and release `slow_app` once they are all in."""
+    responses = []
+
+    async def get(client):
+        responses.append(await client.get(path))
+
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get, client)
+            await wait_for_flight(app)
+            for _ in range(count - 1):
+                tasks.start_soon(get, client)
+            await wait_for_flight(app, count - 1)
+            slow_app.release.set()
+    return responses
+
+
+async def test_identical_requests_share_the_leaders_response():
+    app = SlowApp()
+    middleware = CoalescingMiddleware(app, routes=[("GET", r"^/report$")], enabled=True)
+
+    responses = await get_concurrently(middleware, 5, app)
+
+    assert app.calls == 1
+    assert [response.status_code for response in responses] == [200] * 5
+    assert {response.text for response in responses} == {"call 1"}
+    assert middleware.metrics == {"leaders": 1, "coalesced": 4, "fallbacks": 0}
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+async def test_followers_run_on_their_own_when_the_leader_is_refused_or_fails(status):
+    app = SlowApp(status)
+    middleware = CoalescingMiddleware(app, routes=[("GET", r"^/report$")], enabled=True)
+
+    responses = await get_concurrently(middleware, 3, app)
+
+    assert app.calls == 3
+    assert len({response.text for response in responses}) == 3
+    assert middleware.metrics["fallbacks"] == 2
+
+
+async def test_followers_run_on_their_own_when_the_leader_raises():
+    calls = 0
+    release = anyio.Event()
+
+    async def app(scope, receive, send):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        if calls == 1:
+            raise RuntimeError("leader failed")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = CoalescingMiddleware(app, routes=[("GET", r"^/report$")], enabled=True)
+    statuses = []
+
+    async def get(client):
+        try:
+            statuses.append((await client.get("/report")).status_code)
+        except RuntimeError:
+            statuses.append("raised")
+
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get, client)
+            await wait_for_flight(middleware)
+            tasks.start_soon(get, client)
+            await wait_for_flight(middleware, 1)
+            release.set()
+
+    assert calls == 2
+    assert sorted(statuses, key=str) == [200, "raised"]
+
+
+async def test_requests_that_join_a_flight_still_spend_rate_limit_tokens():
+    app = SlowApp()
+    route_class = RouteClass("heavy", [("GET", r"^/report$")], concurrency=10, queue_depth=10, rate=0.001, burst=2)
+    coalescing = CoalescingMiddleware(app, routes=[("GET", r"^/report$")], enabled=True)
+    middleware = RateLimitMiddleware(coalescing, [route_class], enabled=True)
+
+    responses = []
+
+    async def get(client):
+        responses.append(await client.get("/report"))
+
+    transport = httpx.ASGITransport(app=middleware, client=("10.0.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get, client)
+            await wait_for_flight(coalescing)
+            tasks.start_soon(get, client)
+            await wait_for_flight(coalescing, 1)
+            # The third request is refused before it can join the flight
+            await get(client)
+            app.release.set()
+
+    assert sorted(response.status_code for response in responses) == [200, 200, 429]
+    assert app.calls == 1
+    assert route_class.metrics["rate_limited"] == 1
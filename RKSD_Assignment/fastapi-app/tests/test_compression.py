@@ -0,0 +1,121 @@
+import gzip
+import os
+
+import pytest
+
+from app.middleware.compression import CompressionMiddleware, available_encodings, is_compressible, negotiate
+
+BODY = b'{"value": "' + b"x" * 4000 + b'"}'
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def json_app(body: bytes = BODY, status: int = 200, chunks: int = 1, headers=()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"etag", b'"v1"'), *headers]})
+        size = -(-len(body) // chunks)
+        for start in range(0, len(body), size):
+            await send({"type": "http.response.body", "body": body[start:start + size],
+                        "more_body": start + size < len(body)})
+    return app
+
+
+async def request(middleware, accept_encoding: str = "gzip"):
+    """Send a GET through the middleware and return the response headers and body messages."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await middleware(scope, None, send)
+    headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+    return headers, [message["body"] for message in messages[1:]]
+
+
+def test_encodings_are_negotiated_by_quality_then_preference():
+    assert negotiate("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate("*;q=0.1, br;q=0", ["br", "gzip"]) == "gzip"
+    assert negotiate("identity", ["gzip"]) is None
+    assert negotiate(None, ["gzip"]) is None
+    assert available_encodings(["gzip", "deflate"]) == ["gzip"]
+
+
+def test_only_textual_types_are_compressed():
+    assert is_compressible("application/json; charset=utf-8")
+    assert is_compressible("application/problem+json")
+    assert is_compressible("text/csv")
+    assert not is_compressible("text/event-stream")
+    assert not is_compressible("application/pdf")
+
+
+@pytest.mark.anyio
+async def test_complete_bodies_are_compressed_once_and_cached():
+    middleware = CompressionMiddleware(json_app(), encodings=["gzip"])
+
+    headers, [body] = await request(middleware)
+    await request(middleware)
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(body))
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"v1"'
+    assert gzip.decompress(body) == BODY
+    assert middleware.cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    middleware = CompressionMiddleware(json_app(chunks=3), encodings=["gzip"])
+
+    headers, bodies = await request(middleware)
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(bodies) == 3
+    assert all(bodies)
+    assert gzip.decompress(b"".join(bodies)) == BODY
+
+
+@pytest.mark.anyio
+async def test_small_partial_and_unaccepted_responses_pass_through():
+    cases = [
+        (json_app(b"{}"), "gzip"),
+        (json_app(status=206), "gzip"),
+        (json_app(headers=[(b"content-encoding", b"br")]), "gzip"),
+        (json_app(), "identity"),
+    ]
+
+    for app, accept_encoding in cases:
+        headers, bodies = await request(CompressionMiddleware(app, encodings=["gzip"]), accept_encoding)
+        assert headers.get("content-encoding") in (None, "br")
+        assert bodies in ([b"{}"], [BODY])
+
+
+@pytest.mark.anyio
+async def test_zero_copy_file_sends_are_read_and_compressed(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_bytes(BODY)
+
+    async def file_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        with open(path, "rb") as file:
+            await send({"type": "http.response.zerocopysend", "file": file.fileno(), "offset": 10,
+                        "count": os.path.getsize(path) - 10, "more_body": False})
+
+    headers, bodies = await request(CompressionMiddleware(file_app, encodings=["gzip"]))
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(b"".join(bodies)) == BODY[10:]
+
+
+def test_api_responses_are_compressed(client):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["paths"]
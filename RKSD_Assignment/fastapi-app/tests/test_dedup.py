@@ -0,0 +1,93 @@
+from app.models.application import Application
+from app.models.candidate import Candidate
+from app.utils import dedup
+from app.utils.dedup import find_duplicates, make_record, normalize_email, normalize_name, normalize_phone, run_dedup, score_pair
+
+
+def test_contact_details_are_normalized():
+    assert normalize_email(" Jane.Doe+jobs@GoogleMail.com ") == "janedoe@gmail.com"
+    assert normalize_email("jane.doe+jobs@example.com") == "jane.doe@example.com"
+    assert normalize_email("not an address") == ""
+    assert normalize_phone("+91 98765-43210") == normalize_phone("098765 43210") == "9876543210"
+    assert normalize_name("Doe, José") == "doe jose"
+
+
+def test_pairs_are_scored_by_shared_contacts_and_name_similarity():
+    jane = make_record(1, "Jane Doe", "jane@example.com", "5550001111")
+
+    both = score_pair(jane, make_record(2, "J. Doe", "JANE@example.com", "555-000-1111"))
+    assert both.score == 1.0 and both.reasons == ["email", "phone"]
+
+    email = score_pair(make_record(4, "Doe Jane", "jane+cv@example.com", ""), jane)
+    assert (email.candidate_id, email.duplicate_id) == (1, 4)
+    assert email.reasons == ["email", "name"]
+
+    # Relatives share a phone, but not a name
+    assert score_pair(jane, make_record(3, "Robert Smith", "bob@example.com", "5550001111")) is None
+    # A similar name alone stays below the default threshold
+    name_only = make_record(5, "Jane Doe", "other@example.com", "")
+    assert score_pair(jane, name_only) is None
+    assert score_pair(jane, name_only, min_score=0.5).reasons == ["name"]
+
+
+def test_duplicates_are_only_compared_within_blocks():
+    records = [
+        make_record(1, "Jane Doe", "jane@example.com", "5550001111"),
+        make_record(2, "Jane Doe", "jane@example.com", "5550001111"),
+        make_record(3, "Robert Smith", "bob@example.com", "5550002222"),
+        make_record(4, "Alice Jones", "alice@example.com", "5550003333"),
+    ]
+    stats = {}
+
+    pairs = list(find_duplicates(records, stats=stats))
+
+    assert [(pair.candidate_id, pair.duplicate_id) for pair in pairs] == [(1, 2)]
+    # The pair shares an email and a phone block but is scored once
+    assert stats == {"blocks": 2, "comparisons": 1}
+
+
+def test_name_blocks_are_used_below_the_name_only_score():
+    records = [make_record(1, "Jane Doe", "a@example.com", ""), make_record(2, "Doe Janet", "b@example.com", "")]
+
+    assert list(find_duplicates(records)) == []
+    assert [pair.reasons for pair in find_duplicates(records, min_score=0.5)] == [["name"]]
+
+
+def test_large_blocks_are_compared_within_a_window(monkeypatch):
+    monkeypatch.setattr(dedup, "DEDUP_MAX_BLOCK_SIZE", 3)
+    monkeypatch.setattr(dedup, "DEDUP_WINDOW", 2)
+    records = [make_record(number, f"Person {number}", "", "5550000000") for number in range(6)]
+    stats = {}
+
+    list(find_duplicates(records, min_score=0.99, stats=stats))
+
+    # Each name is only compared with the next one, instead of all 15 pairs
+    assert stats["comparisons"] == 5
+
+
+def test_suggestions_are_listed_and_merged(client, db, make_application):
+    application_id = make_application()
+    kept = db.get(Application, application_id).candidate
+    duplicate = Candidate(candidate_name=kept.candidate_name, email=kept.email.upper(), phone_number="5559990001",
+                          photo="a" * 64 + ".jpg")
+    db.add(duplicate)
+    db.commit()
+    kept_id, duplicate_id, photo = kept.candidate_id, duplicate.candidate_id, duplicate.photo
+    duplicate_application = make_application()
+    db.get(Application, duplicate_application).candidate_id = duplicate_id
+    db.commit()
+
+    run_dedup()
+    [suggestion] = client.get("/candidates/duplicates", params={"candidate_id": kept_id}).json()
+    assert suggestion["duplicate"]["candidate_id"] == duplicate_id
+    assert suggestion["reasons"] == ["email", "name"]
+
+    response = client.post(f"/candidates/{kept_id}/merge/{duplicate_id}")
+
+    assert response.status_code == 200
+    assert response.json()["photo"] == photo
+    db.expire_all()
+    assert db.get(Candidate, duplicate_id) is None
+    assert db.get(Application, duplicate_application).candidate_id == kept_id
+    assert client.get("/candidates/duplicates", params={"candidate_id": kept_id}).json() == []
+    assert client.post(f"/candidates/{kept_id}/merge/{kept_id}").status_code == 400
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from app.models.application import Application
+from app.models.experience import Experience
+from app.utils.experience_summary import (
+    SECONDS_PER_YEAR, backfill, current_total_years, months_between, refresh_summaries, summarize
+)
+
+NOW = datetime(2025, 1, 1)
+
+
+def years(start: datetime, end: datetime) -> float:
+    return round((end - start).total_seconds() / SECONDS_PER_YEAR, 4)
+
+
+def test_months_between_counts_whole_months():
+    assert months_between(datetime(2020, 1, 15), datetime(2020, 3, 15)) == 2
+    assert months_between(datetime(2020, 1, 15), datetime(2020, 3, 14)) == 1
+    assert months_between(datetime(2020, 3, 1), datetime(2020, 1, 1)) == 0
+
+
+def test_overlapping_jobs_are_merged_and_gaps_counted():
+    summary = summarize([
+        (datetime(2015, 1, 1), datetime(2017, 1, 1), "Junior"),
+        (datetime(2016, 1, 1), datetime(2018, 1, 1), "Freelance"),
+        (datetime(2019, 1, 1), datetime(2020, 1, 1), "Senior"),
+    ], NOW)
+
+    assert summary.total_years == round(years(datetime(2015, 1, 1), datetime(2018, 1, 1))
+                                        + years(datetime(2019, 1, 1), datetime(2020, 1, 1)), 4)
+    assert summary.gap_years == years(datetime(2018, 1, 1), datetime(2019, 1, 1))
+    assert summary.latest_position == "Senior"
+    assert not summary.has_current_position
+
+
+def test_current_positions_run_until_now():
+    summary = summarize([
+        (datetime(2023, 1, 1), None, "Lead"),
+        (datetime(2020, 1, 1), datetime(2024, 6, 1), "Contractor"),
+    ], NOW)
+
+    assert summary.total_years == years(datetime(2020, 1, 1), NOW)
+    assert summary.latest_position == "Lead"
+    assert summary.has_current_position
+    assert summarize([], NOW) == (0.0, 0.0, None, False)
+
+
+def test_stored_totals_count_a_current_position_up_to_now():
+    at = datetime(2024, 1, 1)
+
+    assert current_total_years(2.0, True, at, now=datetime(2025, 1, 1)) == 3.0
+    assert current_total_years(2.0, False, at, now=datetime(2025, 1, 1)) == 2.0
+    assert current_total_years(None, True, at) is None
+
+
+def test_summaries_follow_experience_changes(client, db, make_application):
+    application_id = make_application()
+
+    response = client.post("/experiences/", json={
+        "application_id": application_id, "company_name": "Globex", "position": "Lead",
+        "start_date": "2023-01-01T00:00:00", "end_date": "2024-01-01T00:00:00",
+    })
+    assert response.json()["duration"] == 12
+
+    application = db.get(Application, application_id)
+    assert application.latest_position == "Lead"
+    assert application.experience_gap_years == years(datetime(2022, 1, 1), datetime(2023, 1, 1))
+
+    client.delete(f"/experiences/{response.json()['experience_id']}")
+    db.refresh(application)
+    assert application.latest_position == "Developer"
+    assert application.experience_gap_years == 0.0
+
+
+def test_refresh_writes_summaries_and_durations_in_bulk(db, make_application):
+    ids = [make_application(), make_application()]
+
+    assert refresh_summaries(db, ids + ids, now=NOW) == 2
+    db.commit()
+
+    for application_id in ids:
+        application = db.get(Application, application_id)
+        assert application.total_experience_years == years(datetime(2018, 1, 1), datetime(2022, 1, 1))
+        assert application.experience_summary_at == NOW
+        [experience] = db.query(Experience).filter(Experience.application_id == application_id)
+        assert experience.duration == 48
+    assert refresh_summaries(db, []) == 0
+
+
+def test_backfill_can_skip_summarized_applications(db, make_application):
+    application_id = make_application()
+
+    summary = backfill(batch_size=2, only_missing=True)
+
+    assert summary["applications"] >= 1
+    assert db.get(Application, application_id).experience_summary_at is not None
+    assert backfill(only_missing=True)["applications"] == 0
@@ -0,0 +1,91 @@
+import csv
+import gzip
+import io
+from datetime import datetime
+
+import pytest
+
+from app.models.enums import ApplicationStatus
+from app.models.experience import Experience
+from app.utils.archive import archive_applications
+from app.utils.export import EXPORT_COLUMNS, iter_csv
+
+MONTH = {"year": 2032, "month": 2}
+
+
+def export(client, **params) -> list:
+    response = client.get("/applications/export", params={**MONTH, **params})
+    assert response.status_code == 200
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+
+def test_csv_export_has_one_row_per_application_with_joined_data(client, db, make_application):
+    application_id = make_application(application_date=datetime(2032, 2, 10))
+    db.add(Experience(application_id=application_id, company_name="Globex", position="Lead",
+                      start_date=datetime(2022, 2, 1), end_date=None))
+    db.commit()
+
+    response = client.get("/applications/export", params=MONTH)
+
+    assert response.headers["content-disposition"].endswith(".csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == EXPORT_COLUMNS
+    [row] = [row for row in rows if row["application_id"] == str(application_id)]
+    assert row["role_name"] == "Developer"
+    assert row["opening_title"] == "Backend Developer"
+    assert row["stage_name"] == "Screening"
+    assert row["experience_count"] == "2"
+    assert row["experiences"] == "Developer @ Acme (2018-01 - 2022-01); Lead @ Globex (2022-02 - present)"
+
+
+def test_export_filters_by_month_status_and_archive(client, make_application):
+    pending = make_application(application_date=datetime(2032, 2, 11))
+    accepted = make_application(ApplicationStatus.ACCEPTED, application_date=datetime(2032, 2, 12))
+    make_application(application_date=datetime(2032, 3, 1))
+    archive_applications(older_than_days=0, now=datetime.now().replace(year=datetime.now().year + 1))
+
+    ids = {int(row["application_id"]) for row in export(client)}
+    assert {pending, accepted} <= ids
+    assert all(row["application_date"].startswith("2032-02") for row in export(client))
+
+    assert accepted not in {int(row["application_id"]) for row in export(client, status_filter="Pending")}
+    # The accepted application was archived
+    assert accepted not in {int(row["application_id"]) for row in export(client, include_archived=False)}
+
+
+def test_gzip_export_decompresses_to_the_csv(client, make_application):
+    make_application(application_date=datetime(2032, 2, 13))
+
+    plain = client.get("/applications/export", params=MONTH)
+    compressed = client.get("/applications/export", params={**MONTH, "compress": "gzip"})
+
+    assert compressed.headers["content-disposition"].endswith(".csv.gz")
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+def test_parquet_export_reads_back(client, make_application):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    application_id = make_application(application_date=datetime(2032, 2, 14))
+
+    response = client.get("/applications/export", params={**MONTH, "format": "parquet"})
+
+    assert response.status_code == 200
+    table = pyarrow_parquet.read_table(io.BytesIO(response.content))
+    assert table.column_names == EXPORT_COLUMNS
+    assert application_id in table.column("application_id").to_pylist()
+
+
+def test_invalid_format_or_compression_is_refused(client):
+    assert client.get("/applications/export", params={"format": "xml"}).status_code == 400
+    assert client.get("/applications/export", params={"compress": "zip"}).status_code == 400
+
+
+def test_csv_is_yielded_in_chunks_of_rows():
+    rows = ([number, "x"] for number in range(5))
+
+    chunks = list(iter_csv(rows, rows_per_chunk=2))
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == ",".join(EXPORT_COLUMNS)
+    assert lines[1:] == [f"{number},x" for number in range(5)]
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+
+from app.utils.file_response import etag_matches, if_match_matches, parse_range
+from app.utils.storage import get_store
+
+
+def test_if_none_match_compares_weakly():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_if_match_compares_strongly():
+    assert if_match_matches('"4"', '"4"')
+    assert if_match_matches('"3", "4"', '"4"')
+    assert if_match_matches("*", '"4"')
+    assert not if_match_matches('W/"4"', '"4"')
+    assert not if_match_matches('"4"', 'W/"4"')
+    assert not if_match_matches('"5"', '"4"')
+    assert not if_match_matches("", '"4"')
+
+
+def test_single_ranges_are_parsed():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=90-500", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+    # Multiple ranges and other units are answered with the whole file
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+
+
+def test_unsatisfiable_ranges_are_refused():
+    for header in ("bytes=100-", "bytes=10-5", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+
+
+def test_stored_files_are_served_with_ranges_and_revalidation(client):
+    key = get_store().put(io.BytesIO(b"0123456789"), "scan.pdf").key
+
+    whole = client.get(f"/files/{key}")
+    assert whole.status_code == 200
+    assert whole.content == b"0123456789"
+    assert whole.headers["content-type"] == "application/pdf"
+    assert whole.headers["etag"] == f'"{key}"'
+
+    partial = client.get(f"/files/{key}", headers={"Range": "bytes=2-4"})
+    assert partial.status_code == 206
+    assert partial.content == b"234"
+    assert partial.headers["content-range"] == "bytes 2-4/10"
+
+    unsatisfiable = client.get(f"/files/{key}", headers={"Range": "bytes=20-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */10"
+
+    assert client.get(f"/files/{key}", headers={"If-None-Match": f'"{key}"'}).status_code == 304
+
+
+def test_files_that_could_run_script_are_downloaded(client):
+    key = get_store().put(io.BytesIO(b"<script></script>"), "page.html").key
+
+    response = client.get(f"/files/{key}")
+
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"] == f'attachment; filename="{key}"'
+    assert client.get(f"/files/{'0' * 64}.pdf").status_code == 404
@@ -0,0 +1,158 @@
+import os
+
+import pytest
+
+from app.jobs import queue as queue_module
+from app.jobs.queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "results"))
+
+
+@pytest.fixture
+def expired_leases(monkeypatch):
+    """Leases that expire as soon as they are taken, as if the worker had stopped."""
+    monkeypatch.setattr(queue_module, "JOB_LEASE_SECONDS", 0)
+
+
+def test_claim_takes_each_job_once_oldest_first(queue):
+    first = queue.enqueue("report", {"n": 1})
+    second = queue.enqueue("report", {"n": 2})
+
+    job = queue.claim({"report": 5}, "worker-1")
+    assert job["job_id"] == first
+    assert job["status"] == RUNNING
+    assert job["attempts"] == 1
+    assert job["locked_by"] == "worker-1"
+    assert job["payload"] == {"n": 1}
+
+    assert queue.claim({"report": 5}, "worker-2")["job_id"] == second
+    assert queue.claim({"report": 5}, "worker-3") is None
+
+
+def test_claim_respects_concurrency_and_job_types(queue):
+    queue.enqueue("report", {})
+    queue.enqueue("report", {})
+
+    assert queue.claim({"report": 1}, "worker-1") is not None
+    assert queue.claim({"report": 1}, "worker-2") is None
+    assert queue.claim({"other": 1}, "worker-2") is None
+
+
+def test_expired_lease_is_claimed_again_and_fences_the_old_worker(queue, expired_leases):
+    job_id = queue.enqueue("report", {})
+    queue.claim({"report": 1}, "worker-1")
+
+    job = queue.claim({"report": 1}, "worker-2")
+    assert job["job_id"] == job_id
+    assert job["attempts"] == 2
+
+    # The first worker lost the job: its progress and outcome are discarded
+    queue.set_progress(job_id, "worker-1", {"done": 1})
+    assert queue.complete(job_id, "worker-1", {"from": "worker-1"}) is False
+    assert queue.fail(job_id, "worker-1", "boom") is False
+    assert queue.get(job_id)["result"] is None
+
+    assert queue.complete(job_id, "worker-2", {"from": "worker-2"}) is True
+    job = queue.get(job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"from": "worker-2"}
+    assert job["locked_by"] is None
+
+
+def test_expired_lease_without_attempts_left_fails_the_job(queue, expired_leases):
+    job_id = queue.enqueue("report", {}, max_attempts=1)
+    queue.claim({"report": 1}, "worker-1")
+
+    assert queue.claim({"report": 1}, "worker-2") is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 1
+    assert job["error"] == "The worker running the last attempt stopped responding"
+
+
+def test_heartbeat_extends_the_lease_of_its_holder_only(queue, monkeypatch):
+    job_id = queue.enqueue("report", {})
+    monkeypatch.setattr(queue_module, "JOB_LEASE_SECONDS", 0)
+    queue.claim({"report": 1}, "worker-1")
+
+    monkeypatch.setattr(queue_module, "JOB_LEASE_SECONDS", 60)
+    assert queue.heartbeat(job_id, "worker-1") is True
+    assert queue.heartbeat(job_id, "worker-2") is False
+    assert queue.claim({"report": 1}, "worker-2") is None
+
+
+def test_failed_attempts_are_retried_until_max_attempts(queue):
+    job_id = queue.enqueue("report", {}, max_attempts=2)
+
+    queue.claim({"report": 1}, "worker-1")
+    assert queue.fail(job_id, "worker-1", "first", retry_delay=0) is True
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED
+    assert job["error"] == "first"
+
+    queue.claim({"report": 1}, "worker-1")
+    assert queue.fail(job_id, "worker-1", "second", retry_delay=0) is True
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 2
+    assert queue.claim({"report": 1}, "worker-1") is None
+
+
+def write(path: str, content: bytes):
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+def test_only_the_lease_holders_output_file_is_published(queue, expired_leases):
+    job_id = queue.enqueue("report", {})
+    queue.claim({"report": 1}, "worker-1")
+    queue.claim({"report": 1}, "worker-2")
+    stale, current = queue.attempt_path(job_id, 1), queue.attempt_path(job_id, 2)
+    write(stale, b"from worker-1")
+    write(current, b"from worker-2")
+
+    assert queue.complete(job_id, "worker-1", output_path=stale) is False
+    assert not os.path.exists(stale)
+    assert not os.path.exists(queue.result_path(job_id))
+
+    assert queue.complete(job_id, "worker-2", media_type="text/csv", output_path=current) is True
+    job = queue.get(job_id)
+    assert job["result_path"] == queue.result_path(job_id)
+    assert not os.path.exists(current)
+    with open(job["result_path"], "rb") as file:
+        assert file.read() == b"from worker-2"
+
+
+def test_failed_attempts_delete_their_output_file(queue):
+    job_id = queue.enqueue("report", {})
+    queue.claim({"report": 1}, "worker-1")
+    output_path = queue.attempt_path(job_id, 1)
+    write(output_path, b"half written")
+
+    assert queue.fail(job_id, "worker-1", "boom", retry_delay=0, output_path=output_path) is True
+    assert not os.path.exists(output_path)
+    assert queue.get(job_id)["result_path"] is None
+
+
+def test_purge_deletes_result_and_leftover_attempt_files(queue, expired_leases):
+    job_id = queue.enqueue("report", {})
+    queue.claim({"report": 1}, "worker-1")
+    queue.claim({"report": 1}, "worker-2")
+    # The first worker died mid-job and left its file behind
+    write(queue.attempt_path(job_id, 1), b"abandoned")
+    write(queue.attempt_path(job_id, 2), b"done")
+    queue.complete(job_id, "worker-2", output_path=queue.attempt_path(job_id, 2))
+
+    assert queue.purge(older_than=-1) == 1
+    assert queue.get(job_id) is None
+    assert not os.path.exists(queue.result_path(job_id))
+    assert not os.path.exists(queue.attempt_path(job_id, 1))
+
+
+def test_upload_path_stays_in_the_uploads_directory(queue):
+    assert queue.upload_path("0" * 32 + ".csv").endswith("0" * 32 + ".csv")
+    with pytest.raises(ValueError):
+        queue.upload_path("../jobs.db")
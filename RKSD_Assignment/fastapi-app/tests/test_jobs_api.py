@@ -0,0 +1,39 @@
+from app.jobs.queue import QUEUED, get_queue
+
+
+def test_job_types_leave_out_internal_types(client):
+    response = client.get("/jobs/types")
+
+    assert response.status_code == 200
+    names = {job_type["job_type"] for job_type in response.json()}
+    assert "application_pdf" in names
+    assert "candidate_import" not in names
+
+
+def test_internal_job_types_cannot_be_enqueued(client):
+    response = client.post("/jobs/", json={
+        "job_type": "candidate_import",
+        "payload": {"upload_id": "0" * 32 + ".csv", "filename": "candidates.csv"},
+    })
+
+    assert response.status_code == 400
+    allowed = response.json()["detail"].split("Must be one of: ")[1].split(", ")
+    assert "application_pdf" in allowed
+    assert "candidate_import" not in allowed
+
+
+def test_unknown_job_types_are_refused(client):
+    response = client.post("/jobs/", json={"job_type": "rm_rf", "payload": {}})
+
+    assert response.status_code == 400
+
+
+def test_public_job_types_are_enqueued(client, make_application):
+    application_id = make_application()
+
+    response = client.post("/jobs/", json={"job_type": "application_pdf", "payload": {"application_id": application_id}})
+
+    assert response.status_code == 202
+    job = get_queue().get(response.json()["job_id"])
+    assert job["status"] == QUEUED
+    assert job["payload"] == {"application_id": application_id}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.application import Application
+from app.models.role import Role
+from app.models.stage import Stage
+from app.utils import loader as loader_module
+from app.utils.loader import Loader, parse_ids
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_lookups_made_together_share_one_query_per_model(db):
+    loader = Loader(db)
+
+    role, stages, missing = await asyncio.gather(
+        loader.load(Role, 1), loader.load_many(Stage, [3, 1, 3]), loader.load(Stage, 999999)
+    )
+
+    assert role.role_name == "Developer"
+    assert [stage.stage_id for stage in stages] == [3, 1, 3]
+    assert missing is None
+    assert loader.queries == 2
+
+
+@pytest.mark.anyio
+async def test_results_and_misses_are_remembered(db):
+    loader = Loader(db)
+    await loader.load_many(Stage, [1, 999999])
+
+    assert (await loader.load(Stage, 999999)) is None
+    assert (await loader.load(Stage, 1)).stage_name == "Screening"
+    assert loader.queries == 1
+
+    loader.prime(Role, [db.get(Role, 1)])
+    assert (await loader.load(Role, 1)).role_name == "Developer"
+    assert loader.queries == 1
+
+
+@pytest.mark.anyio
+async def test_large_batches_are_split_into_chunks(db, monkeypatch):
+    monkeypatch.setattr(loader_module, "LOADER_CHUNK_SIZE", 2)
+    loader = Loader(db)
+
+    stages = await loader.load_many(Stage, [1, 2, 3])
+
+    assert [stage.stage_id for stage in stages] == [1, 2, 3]
+    assert loader.queries == 2
+
+
+@pytest.mark.anyio
+async def test_a_failed_query_fails_its_waiters(db, monkeypatch):
+    loader = Loader(db)
+    monkeypatch.setattr(loader, "_fetch", lambda model, keys: (_ for _ in ()).throw(RuntimeError("database down")))
+
+    with pytest.raises(RuntimeError, match="database down"):
+        await loader.load(Role, 1)
+
+
+def test_ids_are_parsed_in_order_without_repeats(monkeypatch):
+    assert parse_ids(None) is None
+    assert parse_ids("3, 1,,3,7") == [3, 1, 7]
+
+    with pytest.raises(HTTPException) as invalid:
+        parse_ids("1,two")
+    assert invalid.value.status_code == 400
+
+    monkeypatch.setattr(loader_module, "MULTI_GET_MAX_IDS", 2)
+    with pytest.raises(HTTPException) as too_many:
+        parse_ids("1,2,3")
+    assert too_many.value.detail == "At most 2 ids can be fetched at once"
+
+
+def test_multi_get_returns_existing_ids_in_the_order_given(client, db, make_application):
+    first, second = (db.get(Application, make_application()).candidate_id for _ in range(2))
+
+    response = client.get("/candidates/", params={"ids": f"{second},999999,{first}"})
+
+    assert response.status_code == 200
+    assert [candidate["candidate_id"] for candidate in response.json()] == [second, first]
+    assert client.get("/candidates/", params={"ids": "x"}).status_code == 400
@@ -0,0 +1,103 @@
+import itertools
+import logging
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.middleware.memory import MemoryMiddleware
+from app.routes import application as application_routes
+
+# Each test reports on a month of its own
+_months = itertools.count(1)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def month_report(make_application):
+    """A report request for a month with three applications, and their IDs."""
+    month = next(_months)
+    ids = sorted(make_application(application_date=datetime(2031, month, day)) for day in (3, 4, 5))
+    return {"year": 2031, "month": month}, ids
+
+
+async def allocating_app(scope, receive, send):
+    buffer = bytearray(2 * 1024 * 1024)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"%d" % len(buffer)})
+
+
+def report(client, body: dict):
+    response = client.post("/applications/by-month/detailed", json=body)
+    assert response.status_code == 200
+    return response
+
+
+def test_small_reports_are_built_in_one_response(client, month_report):
+    body, ids = month_report
+
+    response = report(client, body)
+
+    assert "content-length" in response.headers
+    assert sorted(row["application_id"] for row in response.json()) == ids
+
+
+def test_reports_over_the_threshold_are_streamed(client, month_report, monkeypatch):
+    body, ids = month_report
+    monkeypatch.setattr(application_routes, "REPORT_STREAM_ROWS", 2)
+
+    response = report(client, body)
+
+    assert "content-length" not in response.headers
+    assert sorted(row["application_id"] for row in response.json()) == ids
+
+
+def test_reports_at_the_threshold_are_not_streamed(client, month_report, monkeypatch):
+    body, _ = month_report
+    monkeypatch.setattr(application_routes, "REPORT_STREAM_ROWS", 3)
+
+    assert "content-length" in report(client, body).headers
+
+
+def test_reports_over_the_maximum_are_refused(client, month_report, monkeypatch):
+    body, _ = month_report
+    monkeypatch.setattr(application_routes, "REPORT_MAX_ROWS", 2)
+
+    response = client.post("/applications/by-month/detailed", json=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("The report has 3 applications")
+
+    monkeypatch.setattr(application_routes, "REPORT_MAX_ROWS", 3)
+    monkeypatch.setattr(application_routes, "REPORT_STREAM_ROWS", 2)
+    assert "content-length" not in report(client, body).headers
+
+
+@pytest.mark.anyio
+async def test_sampled_requests_over_the_soft_limit_are_recorded_and_logged(caplog):
+    middleware = MemoryMiddleware(allocating_app, sample_rate=1, soft_limit_mb=1)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test") as client:
+        with caplog.at_level(logging.WARNING, logger="app.middleware.memory"):
+            assert (await client.get("/big")).status_code == 200
+
+    [route] = middleware.top_routes(10)
+    assert route["route"] == "GET /big"
+    assert route["measured"] == 1
+    assert route["over_soft_limit"] == 1
+    assert route["max_peak_mb"] >= 2
+    assert "GET /big allocated" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_requests_are_not_measured_with_a_zero_sample_rate():
+    middleware = MemoryMiddleware(allocating_app, sample_rate=0)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test") as client:
+        assert (await client.get("/big")).status_code == 200
+
+    assert middleware.top_routes(10) == []
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.models.opening import Opening
+from app.utils.opening_expiry import expire_openings
+
+
+def add_openings(db, *deadlines, location: str = "Expiry Town") -> list:
+    openings = [
+        Opening(title="Recruiter", description="-", requirements="-", salary_range="-", location=location,
+                deadline=deadline, role_id=1)
+        for deadline in deadlines
+    ]
+    db.add_all(openings)
+    db.commit()
+    return [opening.opening_id for opening in openings]
+
+
+def test_openings_past_their_deadline_are_deactivated_in_batches(db):
+    expired = add_openings(db, datetime(2020, 1, 1), datetime(2021, 1, 1), datetime(2022, 1, 1))
+    [upcoming] = add_openings(db, datetime(2029, 1, 1))
+
+    summary = expire_openings(now=datetime(2024, 1, 1), batch_size=2)
+
+    assert (summary["expired"], summary["batches"]) == (3, 2)
+    db.expire_all()
+    assert [db.get(Opening, opening_id).is_active for opening_id in expired] == [False, False, False]
+    assert db.get(Opening, upcoming).is_active
+    assert expire_openings(now=datetime(2024, 1, 1))["expired"] == 0
+
+
+def test_active_only_leaves_out_openings_the_job_has_not_expired_yet(client, db):
+    missed, upcoming = add_openings(db, datetime(2001, 1, 1), datetime(2099, 1, 1), location="Job Board Town")
+
+    listed = client.get("/openings/", params={"active_only": True, "location": "Job Board Town"}).json()
+    by_id = client.get("/openings/", params={"active_only": True, "ids": f"{missed},{upcoming}"}).json()
+
+    assert [opening["opening_id"] for opening in listed] == [upcoming]
+    assert [opening["opening_id"] for opening in by_id] == [upcoming]
+
+
+def test_expiry_reads_the_partial_index(db):
+    query = (
+        db.query(Opening.opening_id)
+        .filter(Opening.is_active, Opening.deadline < datetime(2024, 1, 1))
+        .order_by(Opening.deadline)
+    )
+    statement = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+
+    assert "ix_openings_active_deadline" in plan
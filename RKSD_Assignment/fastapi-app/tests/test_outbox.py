@@ -0,0 +1,122 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func, update
+
+from app.models.application import Application
+from app.models.candidate import Candidate
+from app.models.outbox_event import OutboxEvent
+from app.utils.outbox import OUTBOX_GAP_WAIT_SECONDS, _first_open_gap, read_changes, record_changes
+
+
+def last_seq(db) -> int:
+    return db.query(func.max(OutboxEvent.seq)).scalar() or 0
+
+
+def changes_since(db, after: int):
+    rows, _ = read_changes(db, after, 100)
+    return [(row.entity, row.entity_id, row.operation, json.loads(row.payload)) for row in rows]
+
+
+def test_orm_writes_record_created_updated_and_deleted_events(db):
+    after = last_seq(db)
+
+    candidate = Candidate(candidate_name="Outbox Person", email="outbox@example.com", phone_number="5559990001")
+    db.add(candidate)
+    db.commit()
+    candidate.candidate_name = "Outbox Person 2"
+    db.commit()
+    candidate_id = candidate.candidate_id
+    db.delete(candidate)
+    db.commit()
+
+    changes = changes_since(db, after)
+    assert [(entity, entity_id, operation) for entity, entity_id, operation, _ in changes] == [
+        ("candidate", candidate_id, "created"),
+        ("candidate", candidate_id, "updated"),
+        ("candidate", candidate_id, "deleted"),
+    ]
+    assert changes[0][3]["candidate_name"] == "Outbox Person"
+    assert changes[1][3]["candidate_name"] == "Outbox Person 2"
+
+
+def test_rolled_back_writes_record_nothing(db):
+    after = last_seq(db)
+
+    db.add(Candidate(candidate_name="Never Saved", email="never@example.com", phone_number="5559990002"))
+    db.flush()
+    db.rollback()
+
+    assert changes_since(db, after) == []
+
+
+def test_unchanged_rows_record_nothing(db, make_application):
+    application_id = make_application()
+    after = last_seq(db)
+
+    application = db.get(Application, application_id)
+    application.rating = application.rating
+    db.commit()
+
+    assert changes_since(db, after) == []
+
+
+def test_bulk_writes_record_the_rows_current_columns(db, make_application):
+    application_ids = [make_application(), make_application()]
+    after = last_seq(db)
+
+    db.execute(
+        update(Application).where(Application.application_id.in_(application_ids)).values(rating=5)
+        .execution_options(synchronize_session=False)
+    )
+    assert record_changes(db, Application, application_ids) == 2
+    db.commit()
+
+    changes = changes_since(db, after)
+    assert sorted((entity, entity_id, operation) for entity, entity_id, operation, _ in changes) == [
+        ("application", application_id, "updated") for application_id in sorted(application_ids)
+    ]
+    assert {payload["rating"] for _, _, _, payload in changes} == {5}
+
+
+def test_change_feed_returns_events_after_a_sequence_number(client, db):
+    after = last_seq(db)
+    response = client.post("/candidates/", json={
+        "candidate_name": "Feed Person", "email": "feed@example.com", "phone_number": "5559990003"
+    })
+    assert response.status_code == 201
+
+    feed = client.get("/changes", params={"after": after}).json()
+
+    assert [(change["entity"], change["operation"]) for change in feed["changes"]] == [("candidate", "created")]
+    assert feed["next_after"] > after
+    assert client.get("/changes", params={"after": feed["next_after"]}).json()["changes"] == []
+
+
+def test_gaps_are_passed_at_once_on_sqlite(db):
+    after = last_seq(db)
+    for number in (4, 5):
+        db.add(Candidate(candidate_name=f"Gap {number}", email=f"gap{number}@example.com",
+                         phone_number=f"555999000{number}"))
+        db.commit()
+    # Compaction leaves a hole below a visible event
+    db.query(OutboxEvent).filter(OutboxEvent.seq == after + 1).delete()
+    db.commit()
+
+    rows, has_more = read_changes(db, after, 100)
+
+    assert [row.seq for row in rows] == [after + 2]
+    assert has_more is False
+
+
+def test_other_databases_wait_from_when_a_gap_was_first_seen():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+    first_seen = datetime(2030, 1, 1)
+    gap = 10 ** 9
+
+    assert _first_open_gap(db, [gap], first_seen) == gap
+    assert _first_open_gap(db, [gap], first_seen + timedelta(seconds=OUTBOX_GAP_WAIT_SECONDS / 2)) == gap
+    assert _first_open_gap(db, [gap, gap + 5], first_seen + timedelta(seconds=OUTBOX_GAP_WAIT_SECONDS)) == gap + 5
+    # Settled gaps stay settled
+    assert _first_open_gap(db, [gap], first_seen) is None
@@ -0,0 +1,89 @@
+import time
+
+import anyio
+import httpx
+import pytest
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.routes import admin as admin_routes
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+
+
+def busy_wait(seconds: float):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+async def busy_app(scope, receive, send):
+    busy_wait(0.1)
+    await anyio.to_thread.run_sync(busy_wait, 0.1)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"done"})
+
+
+@pytest.mark.anyio
+async def test_matching_requests_are_sampled_on_the_loop_and_in_the_thread_pool():
+    profiler = ProfilingMiddleware(busy_app)
+    session = profiler.start("/items/{item_id}", "get", sample_rate=1, seconds=60, interval=0.005)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=profiler), base_url="http://test") as client:
+        await client.get("/items/1")
+        await client.get("/other")
+        await client.post("/items/1")
+    await anyio.to_thread.run_sync(profiler.stop)
+
+    assert not session.running and profiler.session is None
+    assert (session.matched, session.profiled) == (1, 1)
+    stacks = session.collapsed().splitlines()
+    assert all(line.startswith("GET /items/{item_id};") for line in stacks)
+    assert any("busy_app" in line and "busy_wait" in line for line in stacks)
+    assert any(";[thread pool];" in line and "busy_wait" in line for line in stacks)
+
+
+@pytest.mark.anyio
+async def test_only_one_session_runs_at_a_time():
+    profiler = ProfilingMiddleware(busy_app)
+
+    first = profiler.start("/items", None, sample_rate=1, seconds=60, interval=0.005)
+    assert profiler.start("/items", None, sample_rate=1, seconds=60, interval=0.005) is None
+    assert await anyio.to_thread.run_sync(profiler.stop) is first
+
+    assert profiler.start("/items", None, sample_rate=1, seconds=60, interval=0.005) is not None
+    await anyio.to_thread.run_sync(profiler.stop)
+
+
+def test_the_admin_api_needs_a_token(client, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", None)
+    assert client.get("/admin/profile").status_code == 404
+
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+    assert client.get("/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_a_route_is_profiled_through_the_admin_api(client, admin):
+    assert client.post("/admin/profile", params={"route": "/nowhere"}, headers=TOKEN).status_code == 400
+    assert client.post("/admin/profile", params={"route": "/stages/", "method": "DELETE"},
+                       headers=TOKEN).status_code == 400
+
+    started = client.post("/admin/profile", params={"route": "/stages/", "interval_ms": 1}, headers=TOKEN)
+    assert started.status_code == 201
+    assert client.post("/admin/profile", params={"route": "/stages/"}, headers=TOKEN).status_code == 409
+    client.get("/stages/")
+
+    stopped = client.delete("/admin/profile", headers=TOKEN).json()
+    assert (stopped["running"], stopped["profiled_requests"]) == (False, 1)
+    profile = client.get("/admin/profile", params={"format": "json"}, headers=TOKEN).json()
+    assert profile["stack_samples"] == sum(profile["stacks"].values())
+    assert client.get("/admin/profile", headers=TOKEN).headers["content-type"].startswith("text/plain")
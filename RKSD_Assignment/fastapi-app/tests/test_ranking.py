@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.models.application import Application
+from app.models.enums import ApplicationStatus
+from app.models.experience import Experience
+from app.models.opening import Opening
+from app.utils.ranking import ApplicantFeatures, extract_keywords, score_applicants, tokenize, top_k
+
+WEIGHTS = {"experience": 1.0, "rating": 1.0, "stage": 1.0, "keywords": 1.0}
+
+
+def features(experience_years, ratings, stage_progress, keyword_hits, keywords):
+    count = len(experience_years)
+    return ApplicantFeatures(
+        np.arange(1, count + 1), np.arange(1, count + 1), np.array(experience_years, dtype=float),
+        np.array(ratings, dtype=float), np.array(stage_progress, dtype=float),
+        np.array(keyword_hits, dtype=bool).reshape(count, len(keywords)), keywords
+    )
+
+
+def test_requirement_keywords_keep_technical_terms():
+    assert tokenize("C++, C# and Node.js.") == ["c++", "c#", "and", "node.js"]
+    assert extract_keywords("5 years of Python and python, plus strong SQL") == ["python", "sql"]
+
+
+def test_each_signal_is_scaled_before_weighting():
+    scores = score_applicants(
+        features([0, 6, 1], [np.nan, 5, 10], [0, 1, 0.5], [[False, False], [True, True], [True, False]],
+                 ["python", "sql"]),
+        experience_required=2, weights=WEIGHTS
+    )
+
+    # Unrated counts as average; experience and ratings saturate at 1
+    np.testing.assert_allclose(scores, [0.125, 1.0, (0.5 + 1 + 0.5 + 0.5) / 4])
+
+
+def test_top_k_is_best_first_and_keeps_ties_in_order():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.1])
+
+    assert top_k(scores, 3).tolist() == [1, 3, 2]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert top_k(scores, 0).tolist() == []
+
+
+def test_applicants_to_an_opening_are_ranked(client, db, make_application):
+    opening = Opening(title="Data Engineer", description="Pipelines", requirements="Python, Spark and SQL",
+                      salary_range="-", location="Remote", deadline=datetime(2030, 1, 1), experience_required=4,
+                      role_id=1)
+    db.add(opening)
+    db.commit()
+    weak, strong, rejected = make_application(), make_application(), make_application(ApplicationStatus.REJECTED)
+    for application_id in (weak, strong, rejected):
+        db.get(Application, application_id).opening_id = opening.opening_id
+    db.get(Application, strong).rating = 5
+    db.get(Application, strong).current_stage = 3
+    db.add(Experience(application_id=strong, company_name="Initech", position="Data Engineer",
+                      description="Spark jobs in Python", start_date=datetime(2022, 1, 1),
+                      end_date=datetime(2024, 1, 1)))
+    db.commit()
+
+    response = client.get(f"/openings/{opening.opening_id}/ranking")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["keywords"] == ["python", "spark", "sql"]
+    assert body["total_applicants"] == 2
+    assert [applicant["application_id"] for applicant in body["applicants"]] == [strong, weak]
+    best = body["applicants"][0]
+    assert (best["rank"], best["rating"], best["stage_progress"]) == (1, 5, 1.0)
+    # Unsummarized applications have their experience summarized on the fly
+    assert best["experience_years"] == 6.0
+    assert best["matched_keywords"] == ["python", "spark"]
+
+    ranking = client.get(f"/openings/{opening.opening_id}/ranking", params={"include_rejected": True, "top_k": 1})
+    assert ranking.json()["total_applicants"] == 3
+    assert len(ranking.json()["applicants"]) == 1
+    assert client.get("/openings/999999/ranking").status_code == 404
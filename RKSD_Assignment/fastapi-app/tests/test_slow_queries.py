@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from app.database import slow_queries
+from app.database.slow_queries import SlowQueryLog, _full_scans, redact
+from app.routes import admin as admin_routes
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """A fresh log that records every statement."""
+    log = SlowQueryLog()
+    monkeypatch.setattr(slow_queries, "_log", log)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", -1)
+    return log
+
+
+def wait_for_plans(log: SlowQueryLog, records: int = 1):
+    deadline = time.monotonic() + 5
+    while log.stats()["explain_waiting"] or log.explained < records:
+        assert time.monotonic() < deadline, "EXPLAIN did not finish"
+        time.sleep(0.01)
+
+
+def test_text_parameters_are_redacted():
+    assert redact({"email": "jane@example.com", "id": 3}) == {"email": "<str:16>", "id": 3}
+    assert redact((b"\x00\x01", None)) == ["<bytes:2>", None]
+    assert redact(list(range(60)))[-1] == "... 10 more"
+
+
+def test_full_scans_are_read_from_plans():
+    assert _full_scans("sqlite", [
+        "SCAN applications", "SEARCH candidates USING INTEGER PRIMARY KEY (rowid=?)",
+        "SCAN openings USING INDEX ix_openings_active_deadline", "SCAN CONSTANT ROW", "SCAN TABLE stages",
+    ]) == ["applications", "stages"]
+    assert _full_scans("postgresql", [{"Plan": {
+        "Node Type": "Hash Join",
+        "Plans": [{"Node Type": "Seq Scan", "Relation Name": "applications"},
+                  {"Node Type": "Index Scan", "Relation Name": "candidates"}],
+    }}]) == ["applications"]
+    assert _full_scans("mysql", []) is None
+
+
+def test_slow_statements_are_recorded_with_their_caller_and_plan(client, log):
+    client.get("/experiences/", params={"limit": 1})
+    wait_for_plans(log)
+
+    [record] = [record for record in log.snapshot(10) if "FROM experiences" in record["statement"]]
+    assert record["route"] == "GET /experiences/"
+    assert record["caller"].startswith("app/routes/experience.py:")
+    assert record["plan"] and record["full_scans"] == ["experiences"]
+    assert log.snapshot(10, full_scans_only=True)
+
+
+def test_plans_are_reused_for_the_same_statement(client, log):
+    client.get("/experiences/", params={"limit": 1})
+    wait_for_plans(log)
+    client.get("/experiences/", params={"limit": 1})
+
+    records = [record for record in log.snapshot(10) if "FROM experiences" in record["statement"]]
+    assert len(records) == 2
+    assert records[0]["plan"] == records[1]["plan"]
+    assert log.explained == 1
+
+
+def test_statements_beyond_the_explain_queue_are_recorded_without_a_plan(monkeypatch):
+    log = SlowQueryLog()
+    monkeypatch.setattr(log, "_queue", slow_queries.queue.Queue(1))
+    # Keep the worker from draining the queue
+    monkeypatch.setattr(log, "_thread", object())
+
+    log.record("sqlite", "SELECT 1", (), False, 250)
+    log.record("sqlite", "SELECT 2", (), False, 250)
+    log.record("sqlite", "PRAGMA foreign_keys", (), False, 250)
+
+    newest, dropped, queued = log.snapshot(10)
+    assert dropped["explain_error"] == "Too many statements waiting for EXPLAIN"
+    assert queued["plan"] is None and queued["explain_error"] is None
+    assert newest["plan"] is None and newest["explain_error"] is None
+    assert log.stats()["explains_dropped"] == 1
+
+
+def test_the_log_is_read_and_cleared_through_the_admin_api(client, log, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+    client.get("/experiences/", params={"limit": 1})
+
+    response = client.get("/admin/slow-queries", params={"limit": 1}, headers=TOKEN)
+
+    assert response.status_code == 200
+    assert response.json()["recorded"] >= 1
+    assert len(response.json()["queries"]) == 1
+    assert client.delete("/admin/slow-queries", headers=TOKEN).status_code == 204
+    assert log.stats()["recorded"] == 0
@@ -0,0 +1,52 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from app.utils.storage import ContentStore, UploadTooLarge, parse_keys, with_key, without_key
+
+KEY = "a" * 64 + ".pdf"
+OTHER_KEY = "b" * 64
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = ContentStore(str(tmp_path))
+
+    first = store.put(io.BytesIO(b"resume"), "Resume.PDF")
+    second = store.put(io.BytesIO(b"resume"), "copy.pdf")
+
+    assert first.key == hashlib.sha256(b"resume").hexdigest() + ".pdf"
+    assert (first.created, second.created) == (True, False)
+    assert second.key == first.key
+    with open(store.path(first.key), "rb") as file:
+        assert file.read() == b"resume"
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_odd_extensions_are_dropped_from_the_key(tmp_path):
+    store = ContentStore(str(tmp_path))
+
+    assert store.put(io.BytesIO(b"x"), "notes.tar gz").key == hashlib.sha256(b"x").hexdigest()
+    assert store.put(io.BytesIO(b"y"), None).key == hashlib.sha256(b"y").hexdigest()
+
+
+def test_uploads_over_the_limit_leave_nothing_behind(tmp_path):
+    store = ContentStore(str(tmp_path))
+
+    with pytest.raises(UploadTooLarge):
+        store.put(io.BytesIO(b"x" * 10), "big.txt", max_bytes=5)
+
+    assert os.listdir(tmp_path / "tmp") == []
+    assert not store.exists(hashlib.sha256(b"x" * 10).hexdigest() + ".txt")
+
+
+def test_attachment_lists_keep_legacy_entries():
+    legacy = "https://example.com/cv.pdf"
+
+    value = with_key(legacy, KEY)
+    assert value == f"{legacy},{KEY}"
+    assert with_key(value, KEY) == value
+    assert parse_keys(f"{value}, {OTHER_KEY}") == [KEY, OTHER_KEY]
+    assert without_key(value, KEY) == legacy
+    assert without_key(KEY, KEY) is None
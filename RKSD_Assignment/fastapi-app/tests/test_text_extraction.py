@@ -0,0 +1,96 @@
+import io
+import os
+
+from app.database.connection import SessionLocal
+from app.models.attachment_text import AttachmentText
+from app.utils import text_extraction
+from app.utils.storage import get_store
+from app.utils.text_extraction import (
+    _new_pool, extract_file, extract_files, normalize_text, run_extraction, search_attachments
+)
+
+
+def crash_on_marked_files(path: str, extension: str):
+    """Extract like extract_file, but kill the process on files containing "CRASH"."""
+    with open(path, encoding="utf-8") as file:
+        if "CRASH" in file.read():
+            os._exit(1)
+    return extract_file(path, extension)
+
+
+def store_text(content: str, filename: str = "cv.txt") -> str:
+    return get_store().put(io.BytesIO(content.encode()), filename).key
+
+
+def stored_text(db, key: str) -> AttachmentText:
+    db.expire_all()
+    return db.get(AttachmentText, key[:64])
+
+
+def test_normalize_text_collapses_whitespace_and_control_characters():
+    assert normalize_text("  ﬁle\x00 name\n\n\tHERE ") == "file name HERE"
+
+
+def test_text_files_are_extracted_stored_and_indexed(db):
+    key = store_text("Senior engineer with kubernetes and terraform experience")
+
+    summary = run_extraction(keys=[key], processes=1)
+
+    assert summary["extracted"] == 1
+    row = stored_text(db, key)
+    assert row.text.startswith("Senior engineer")
+    assert row.error is None
+    assert [content_hash for content_hash, _ in search_attachments(db, "terraform")] == [key[:64]]
+
+
+def test_files_already_extracted_or_unsupported_are_skipped():
+    key = store_text("Already extracted once")
+    run_extraction(keys=[key], processes=1)
+    unsupported = store_text("not a document", "notes.xyz")
+
+    summary = run_extraction(keys=[key, unsupported, "0" * 64 + ".txt"], processes=1)
+
+    assert summary["extracted"] == 0
+    assert summary["skipped"] == 3
+
+
+def test_rows_stored_by_another_run_meanwhile_are_kept(db, monkeypatch):
+    key = store_text("Extracted by two runs at once")
+    extract = text_extraction.extract_files
+
+    def extract_while_another_run_stores(pool, processes, files):
+        other = SessionLocal()
+        try:
+            other.add(AttachmentText(content_hash=key[:64], media_type="text/plain", text="other run", char_count=9))
+            other.commit()
+        finally:
+            other.close()
+        return extract(pool, processes, files)
+
+    monkeypatch.setattr(text_extraction, "extract_files", extract_while_another_run_stores)
+
+    summary = run_extraction(keys=[key], processes=1)
+
+    assert summary["extracted"] == 0
+    assert summary["skipped"] == 1
+    assert stored_text(db, key).text == "other run"
+    assert search_attachments(db, "runs") == []
+
+
+def test_a_file_that_kills_its_process_fails_alone():
+    paths = []
+    for index, content in enumerate(["first file", "CRASH", "third file", "fourth file"]):
+        paths.append((get_store().path(store_text(f"{content} {index}")), ".txt"))
+
+    pool = _new_pool(2)
+    try:
+        pool, results = extract_files(pool, 2, paths, extract=crash_on_marked_files)
+        # The pool handed back still works
+        assert pool.submit(extract_file, paths[0][0], ".txt").result() == ("first file 0", None)
+    finally:
+        pool.shutdown()
+
+    assert results[0] == ("first file 0", None)
+    assert results[1][0] is None and results[1][1].startswith("BrokenProcessPool")
+    assert results[2] == ("third file 2", None)
+    assert results[3] == ("fourth file 3", None)